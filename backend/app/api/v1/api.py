@@ -1,9 +1,8 @@
 from fastapi import APIRouter, Depends
 from typing import Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
-from app.api.v1.endpoints import auth, users, summaries
+from app.api.v1.endpoints import analytics, auth, users, summaries
 from app.db.base import get_db
 from app.api import deps
 from app import models
@@ -19,6 +18,23 @@ api_router.include_router(users.router, prefix="/users", tags=["users"])
 # Summary routes
 api_router.include_router(summaries.router, prefix="/summaries", tags=["summaries"])
 
+# Admin analytics routes
+api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+
+def recent_summaries_query(db: Session, user_id: int):
+    """A user's 5 newest summaries: metadata and 101 characters of the text only."""
+    return db.query(
+        models.Summary.id,
+        models.Summary.status,
+        models.Summary.created_at,
+        models.Summary.completed_at,
+        models.Summary.model_used,
+        models.Summary.text_preview("original", 101).label("original_text"),
+    ).filter(
+        models.Summary.user_id == user_id
+    ).order_by(models.Summary.created_at.desc()).limit(5)
+
+
 # Home routes directly in the API file
 @api_router.get("/home", tags=["home"])
 def get_home_stats(
@@ -28,19 +44,10 @@ def get_home_stats(
     """
     Get statistics for the home dashboard.
     """
-    # Get user summary stats
-    user_stats = db.query(
-        func.count(models.Summary.id).label("total"),
-        func.sum(models.Summary.status == "completed").label("completed"),
-        func.sum(models.Summary.status == "pending").label("pending"),
-        func.sum(models.Summary.status == "processing").label("processing"),
-        func.sum(models.Summary.status == "failed").label("failed"),
-    ).filter(models.Summary.user_id == current_user.id).first()
+    # Get user summary stats (incrementally maintained counters)
+    user_stats = models.UserSummaryCounts.get(db, current_user.id)
 
-    # Get recent summaries
-    recent_summaries = db.query(models.Summary).filter(
-        models.Summary.user_id == current_user.id
-    ).order_by(models.Summary.created_at.desc()).limit(5).all()
+    recent_summaries = recent_summaries_query(db, current_user.id).all()
 
     # Convert to response format
     result = {
@@ -51,11 +58,11 @@ def get_home_stats(
             "is_active": current_user.is_active
         },
         "summaries": {
-            "total": user_stats.total or 0,
-            "completed": user_stats.completed or 0,
-            "pending": user_stats.pending or 0,
-            "processing": user_stats.processing or 0,
-            "failed": user_stats.failed or 0
+            "total": user_stats["total"],
+            "completed": user_stats["completed"],
+            "pending": user_stats["pending"],
+            "processing": user_stats["processing"],
+            "failed": user_stats["failed"]
         },
         "recent_summaries": [
             {
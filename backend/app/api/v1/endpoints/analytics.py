@@ -0,0 +1,75 @@
+from typing import Any, Optional
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app import models
+from app.api import deps
+from app.db.base import get_db
+from app.services.latency_histogram import LatencyHistogram
+
+router = APIRouter()
+
+
+@router.get("/latency", response_model=dict)
+def read_latency_percentiles(
+    db: Session = Depends(get_db),
+    start: Optional[datetime] = Query(None, description="Range start (default: 24 hours ago)"),
+    end: Optional[datetime] = Query(None, description="Range end (default: now)"),
+    model_id: Optional[str] = Query(None, description="Only this model"),
+    percentiles: str = Query("50,95,99", description="Comma-separated percentiles, e.g. 50,99,99.9"),
+    current_user: dict = Depends(deps.get_current_admin_user),
+) -> Any:
+    """
+    Get processing latency percentiles over a time range.
+
+    Merges the hourly per-model latency histograms of every hour bucket
+    that starts in [start, end), per model and overall. Percentiles are
+    accurate to about 2.5%. The current hour lags by up to one usage
+    statistics flush interval.
+    """
+    try:
+        quantiles = [float(value) for value in percentiles.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Percentiles must be numbers, e.g. 50,95,99")
+    if not quantiles or any(not 0 < quantile <= 100 for quantile in quantiles):
+        raise HTTPException(status_code=400, detail="Percentiles must be between 0 and 100")
+
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(hours=24)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    histograms = models.LatencyHistogramBin.get_merged(db, start, end, model_id)
+    overall = LatencyHistogram.merge(histograms.values())
+
+    return {
+        "start": start,
+        "end": end,
+        "overall": {
+            "count": sum(overall.values()),
+            "percentiles_ms": LatencyHistogram.percentiles(overall, quantiles),
+        },
+        "models": {
+            histogram_model_id: {
+                "count": sum(histogram.values()),
+                "percentiles_ms": LatencyHistogram.percentiles(histogram, quantiles),
+            }
+            for histogram_model_id, histogram in sorted(histograms.items())
+        },
+    }
+
+
+@router.get("/storage", response_model=dict)
+def read_storage_statistics(
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(deps.get_current_admin_user),
+) -> Any:
+    """
+    Get the effect of deduplication and compression on S3 text storage.
+
+    Compares the bytes of the texts referenced by summaries (one
+    uncompressed copy each) with the bytes actually stored.
+    """
+    return models.StoredBlob.get_stats(db)
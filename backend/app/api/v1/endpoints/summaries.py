@@ -1,24 +1,38 @@
-from typing import Any, List, Dict, Optional
+import base64
+import json
+import time
+import uuid
+from collections import Counter
+from typing import Any, List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Path
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, defer
+from sqlalchemy import desc, func, insert, tuple_, update
+from celery import group
 
 from app import models
 from app.api import deps
 from app.core.config import settings
-from app.db.base import get_db
-from app.schemas.summary import Summary, SummaryCreate, SummaryList
+from app.core.metrics import S3_CACHE_REQUESTS
+from app.core.tracing import current_trace, current_trace_id, span, start_trace
+from app.db.base import SessionLocal, get_db
+from app.schemas.summary import (
+    Summary, SummaryBatch, SummaryBatchCreate, SummaryBatchProgress, SummaryCreate, SummaryListItem, SummaryPage
+)
 from app.services.huggingface_service import HuggingFaceService
 from app.services.s3_service import S3Service
-from celery_worker import process_summary
+from app.services.single_flight import SingleFlight
+from app.services.task_router import TaskRouter
+from app.services.text_store import TextStore
+from celery_worker import process_summary, update_usage_statistics
 
 router = APIRouter()
 
 
 @router.post("/", response_model=Summary)
-def create_summary(
+async def create_summary(
     *,
     db: Session = Depends(get_db),
     summary_in: SummaryCreate = Depends(),
@@ -29,6 +43,43 @@ def create_summary(
     
     Takes text input and model parameters, processes it asynchronously,
     and returns a summary object with status "pending".
+    
+    Database, Redis and broker calls run in the threadpool; only direct
+    processing (waiting on the inference API) runs on the event loop.
+    """
+    process_directly = settings.PROCESS_DIRECTLY or not settings.REDIS_URL
+    summary, lane, queue_options = await run_in_threadpool(
+        _create_pending_summary, db, summary_in, current_user, process_directly
+    )
+    
+    # During development: for testing without Celery, process in-process
+    try:
+        # For development/testing without Celery
+        if process_directly:
+            await process_summary_directly(db, summary)
+        else:
+            # Normal async processing with Celery, in the summary's lane
+            await run_in_threadpool(enqueue_summary, summary, lane, queue_options)
+    except Exception as e:
+        # Fall back to async processing
+        print(f"Error in direct processing: {e}")
+        await run_in_threadpool(enqueue_summary, summary, lane, queue_options)
+    
+    # Load what the commits expired here, not while serializing on the loop
+    await run_in_threadpool(db.refresh, summary)
+    return summary
+
+
+def _create_pending_summary(db: Session,
+                            summary_in: SummaryCreate,
+                            current_user: models.User,
+                            process_directly: bool) -> Tuple[models.Summary, str, Optional[Dict[str, Any]]]:
+    """
+    Charge the user and create a pending summary (blocking: run in the threadpool).
+    
+    Returns:
+        The summary, its lane and the lane slot reserved for it (None when
+        processing directly)
     """
     # Check if user has enough credits
     if current_user.credits <= 0:
@@ -45,109 +96,486 @@ def create_summary(
             detail=f"Invalid model ID. Choose from: {valid_models}"
         )
     
-    # Deduct credits
-    current_user.credits -= 1
-    current_user.api_calls_count += 1
-    current_user.last_api_call = datetime.utcnow()
-    db.add(current_user)
-    
-    # Create summary
-    summary = models.Summary(
-        user_id=current_user.id,
-        original_text=summary_in.original_text,
-        status="pending",
-        model_used=summary_in.model_id,
-        max_length=summary_in.max_length,
-        min_length=summary_in.min_length,
+    # Route by input size; refuse before charging if the user's lane is full
+    lane = TaskRouter.route(
+        summary_in.original_text, HuggingFaceService.MODELS[summary_in.model_id], summary_in.model_id
     )
-    db.add(summary)
-    db.commit()
-    db.refresh(summary)
+    queue_options = None
+    if not process_directly:
+        queue_options = TaskRouter.acquire(lane, current_user.id)
+        if queue_options is None:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many summaries waiting to be processed. Try again later.",
+            )
     
-    # During development: for testing without Celery, process synchronously
     try:
-        # For development/testing without Celery
-        process_directly = settings.PROCESS_DIRECTLY or not settings.REDIS_URL
-        if process_directly:
-            # Process directly (synchronously) - only for testing/development
-            from app.services.huggingface_service import HuggingFaceService
-            
-            # Update status
-            summary.status = "processing"
-            summary.processing_started_at = datetime.utcnow()
+        # Deduct credits
+        current_user.credits -= 1
+        current_user.api_calls_count += 1
+        current_user.last_api_call = datetime.utcnow()
+        db.add(current_user)
+        
+        # Create summary
+        summary = models.Summary(
+            user_id=current_user.id,
+            original_text=summary_in.original_text,
+            original_preview=TextStore.preview(summary_in.original_text),
+            status="pending",
+            model_used=summary_in.model_id,
+            max_length=summary_in.max_length,
+            min_length=summary_in.min_length,
+            trace_id=current_trace_id(),
+        )
+        db.add(summary)
+        models.UserSummaryCounts.summary_added(db, summary)
+        with span("db", operation="create"):
             db.commit()
-            
-            # Call Hugging Face API
-            result = HuggingFaceService.get_summary(
-                text=summary.original_text,
-                model_id=summary.model_used,
-                max_length=summary.max_length,
-                min_length=summary.min_length
+            db.refresh(summary)
+    except Exception:
+        if queue_options is not None:
+            TaskRouter.release(lane, current_user.id)
+        raise
+    return summary, lane, queue_options
+
+
+def enqueue_summary(summary: models.Summary, lane: str, queue_options: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Send a summary to its Celery lane with the user's fair-share priority.
+    
+    queue_options are those of the lane slot TaskRouter.acquire reserved
+    for it; without them a slot is counted regardless of the user's cap,
+    since the summary is already paid for.
+    """
+    if queue_options is None:
+        queue_options = TaskRouter.acquire(lane, summary.user_id, capped=False)
+    process_summary.apply_async(
+        args=[summary.id],
+        # The worker frees the user's lane slot when it picks the task up
+        kwargs={"lane": lane, "user_id": summary.user_id},
+        # The task continues this request's trace and times its queueing
+        headers={"trace_id": summary.trace_id, "enqueued_at": time.time()},
+        **queue_options
+    )
+
+
+@router.post("/batch", response_model=SummaryBatch, status_code=202)
+def create_summary_batch(
+    *,
+    db: Session = Depends(get_db),
+    batch_in: SummaryBatchCreate,
+    background_tasks: BackgroundTasks,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Create several summaries at once.
+    
+    All items are validated before anything is charged. One credit per
+    item is reserved in a single conditional update, the summaries are
+    inserted with one bulk INSERT and enqueued as one Celery group. Returns
+    the summary IDs in item order and a batch ID for
+    GET /summaries/batch/{batch_id}.
+    """
+    items = batch_in.items
+    if len(items) > settings.SUMMARY_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch can have at most {settings.SUMMARY_BATCH_MAX_ITEMS} items.",
+        )
+    
+    # Validate every item and route it by input size
+    errors = []
+    lanes = []
+    for index, item in enumerate(items):
+        if item.model_id not in HuggingFaceService.MODELS:
+            valid_models = ", ".join(HuggingFaceService.MODELS.keys())
+            errors.append({"index": index, "error": f"Invalid model ID. Choose from: {valid_models}"})
+            continue
+        lanes.append(TaskRouter.route(item.original_text, HuggingFaceService.MODELS[item.model_id], item.model_id))
+    if errors:
+        raise HTTPException(status_code=400, detail=errors)
+    
+    # Reserve the lane slots before charging; refuse if the batch does not fit
+    process_directly = settings.PROCESS_DIRECTLY or not settings.REDIS_URL
+    lane_options: Dict[str, List[Dict[str, Any]]] = {}
+    if not process_directly:
+        for lane, count in Counter(lanes).items():
+            options = TaskRouter.acquire_many(lane, current_user.id, count)
+            if options is None:
+                release_lane_slots(lane_options, current_user.id)
+                raise HTTPException(
+                    status_code=429,
+                    detail=f"Too many summaries waiting to be processed in the {lane} lane. Try again later.",
+                )
+            lane_options[lane] = options
+    
+    try:
+        summary_ids, batch_id, trace_id = _insert_summary_batch(db, items, current_user.id)
+    except Exception:
+        release_lane_slots(lane_options, current_user.id)
+        raise
+    
+    if process_directly:
+        # For development/testing without Celery: after the response
+        background_tasks.add_task(process_batch_directly, summary_ids)
+    else:
+        try:
+            enqueue_summary_batch(summary_ids, lanes, current_user.id, trace_id, lane_options)
+        except Exception as e:
+            print(f"Error enqueueing batch {batch_id}: {e}")
+            # Usually nothing was sent; tasks that were release their slot again
+            release_lane_slots(lane_options, current_user.id)
+            _cancel_summary_batch(db, summary_ids, current_user.id, f"Could not be queued: {e}")
+            raise HTTPException(
+                status_code=503,
+                detail="Could not queue the summaries; their credits were refunded. Try again later.",
             )
-            
-            # Update summary
-            if not result.get("success"):
-                summary.status = "failed"
-                summary.error_message = result.get("error", "Unknown error")
-            else:
-                summary.summary_text = result.get("summary", "")
-                summary.status = "completed"
-                summary.completed_at = datetime.utcnow()
-                
-                # Update statistics if available
-                if "stats" in result:
-                    stats = result["stats"]
-                    summary.processing_time_ms = stats.get("processing_time_ms")
-                    summary.original_tokens = stats.get("input_tokens")
-                    summary.summary_tokens = stats.get("output_tokens")
-            
-            db.commit()
-        else:
-            # Normal async processing with Celery
-            process_summary.delay(summary.id)
-    except Exception as e:
-        # Fall back to async processing
-        print(f"Error in direct processing: {e}")
-        process_summary.delay(summary.id)
     
-    return summary
+    return {"batch_id": batch_id, "summary_ids": summary_ids}
 
 
-@router.get("/", response_model=List[Summary])
-def read_summaries(
+def _insert_summary_batch(db: Session, items: List[SummaryCreate], user_id: int) -> Tuple[List[int], str, Optional[str]]:
+    """Charge the user for a batch and create its summaries in one commit."""
+    # Reserve credits: one conditional update, so concurrent requests cannot overdraw
+    reserved = db.execute(
+        update(models.User)
+        .where(models.User.id == user_id, models.User.credits >= len(items))
+        .values(
+            credits=models.User.credits - len(items),
+            api_calls_count=func.coalesce(models.User.api_calls_count, 0) + len(items),
+            last_api_call=datetime.utcnow(),
+        )
+        .returning(models.User.id)
+    ).first()
+    if reserved is None:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail=f"Not enough credits to create {len(items)} summaries.",
+        )
+    
+    # Create the summaries, returning their IDs in item order
+    batch_id = uuid.uuid4().hex
+    trace_id = current_trace_id()
+    with span("db", operation="create_batch"):
+        summary_ids = db.execute(
+            insert(models.Summary).returning(models.Summary.id, sort_by_parameter_order=True),
+            [
+                {
+                    "user_id": user_id,
+                    "original_text": item.original_text,
+                    "original_preview": TextStore.preview(item.original_text),
+                    "status": "pending",
+                    "model_used": item.model_id,
+                    "max_length": item.max_length,
+                    "min_length": item.min_length,
+                    "trace_id": trace_id,
+                    "batch_id": batch_id,
+                }
+                for item in items
+            ],
+        ).scalars().all()
+        models.UserSummaryCounts.summaries_added(db, user_id, "pending", len(items))
+        db.commit()
+    return summary_ids, batch_id, trace_id
+
+
+@router.get("/batch/{batch_id}", response_model=SummaryBatchProgress)
+def read_summary_batch(
+    *,
     db: Session = Depends(get_db),
-    skip: int = Query(0, ge=0, description="Skip records"),
-    limit: int = Query(20, ge=1, le=100, description="Limit records"),
-    status: Optional[str] = Query(None, description="Filter by status"),
-    sort_by: str = Query("created_at", description="Sort field (created_at, status)"),
-    sort_desc: bool = Query(True, description="Sort descending"),
+    batch_id: str = Path(..., description="The batch ID returned by POST /summaries/batch"),
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Retrieve a list of summaries for the current user.
+    Get the progress of a batch: how many of its summaries are in each status.
+    
+    Users can only see their own batches. Admins can see all.
+    """
+    query = db.query(models.Summary.status, func.count(models.Summary.id)).filter(
+        models.Summary.batch_id == batch_id
+    )
+    if current_user.role != "admin":
+        query = query.filter(models.Summary.user_id == current_user.id)
+    counts = dict(query.group_by(models.Summary.status).all())
+    if not counts:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    
+    total = sum(counts.values())
+    return {
+        "batch_id": batch_id,
+        "total": total,
+        **{status: counts.get(status, 0) for status in models.UserSummaryCounts.STATUSES},
+        "done": counts.get("completed", 0) + counts.get("failed", 0) == total,
+    }
+
+
+def _cancel_summary_batch(db: Session, summary_ids: List[int], user_id: int, error: str) -> None:
+    """
+    Fail the summaries of a batch that could not be enqueued and refund
+    their credits. Summaries a worker has already taken are left to it.
+    """
+    db.rollback()
+    cancelled = db.execute(
+        update(models.Summary)
+        .where(models.Summary.id.in_(summary_ids), models.Summary.status == "pending")
+        .values(status="failed", error_message=error, completed_at=datetime.utcnow())
+        .returning(models.Summary.id)
+    ).scalars().all()
+    if cancelled:
+        db.execute(
+            update(models.User)
+            .where(models.User.id == user_id)
+            .values(credits=models.User.credits + len(cancelled))
+        )
+        models.UserSummaryCounts.summaries_status_changed(db, user_id, "pending", "failed", len(cancelled))
+    db.commit()
+
+
+def release_lane_slots(lane_options: Dict[str, List[Dict[str, Any]]], user_id: int) -> None:
+    """Give back lane slots reserved with TaskRouter.acquire_many for tasks that were not sent."""
+    for lane, options in lane_options.items():
+        TaskRouter.release(lane, user_id, len(options))
+
+
+def enqueue_summary_batch(summary_ids: List[int],
+                          lanes: List[str],
+                          user_id: int,
+                          trace_id: Optional[str],
+                          lane_options: Dict[str, List[Dict[str, Any]]]) -> None:
+    """Send a batch's summaries to their reserved lane slots as one Celery group."""
+    options = {lane: iter(lane_option_list) for lane, lane_option_list in lane_options.items()}
+    enqueued_at = time.time()
+    group(
+        process_summary.signature(
+            args=[summary_id],
+            kwargs={"lane": lane, "user_id": user_id},
+            headers={"trace_id": trace_id, "enqueued_at": enqueued_at},
+            **next(options[lane])
+        )
+        for summary_id, lane in zip(summary_ids, lanes)
+    ).apply_async()
+
+
+async def process_batch_directly(summary_ids: List[int]) -> None:
+    """
+    Process a batch's summaries one by one inside the API process without
+    Celery, each in its own trace, with a session of its own (the
+    request's is closed by then).
+    """
+    db = SessionLocal()
+    try:
+        for summary_id in summary_ids:
+            summary = await run_in_threadpool(db.get, models.Summary, summary_id)
+            if summary is None:
+                continue
+            with start_trace(summary.trace_id, "summary.direct"):
+                try:
+                    await process_summary_directly(db, summary)
+                except Exception as e:
+                    print(f"Error in direct processing of summary {summary_id}: {e}")
+                    await run_in_threadpool(db.rollback)
+                    models.UserSummaryCounts.set_status(db, summary, "failed")
+                    summary.error_message = str(e)
+                    await run_in_threadpool(db.commit)
+    finally:
+        db.close()
+
+
+async def process_summary_directly(db: Session, summary: models.Summary) -> None:
+    """
+    Process a summary inside the API process without Celery.
+    
+    Waiting on the inference API happens on the event loop (async HTTP
+    client, asyncio.sleep backoff), so in-flight summaries do not hold
+    threadpool threads. Only the short DB commits run in the threadpool.
+    """
+    start_time = time.time()
+    
+    # Update status
+    models.UserSummaryCounts.set_status(db, summary, "processing")
+    summary.processing_started_at = datetime.utcnow()
+    with span("db", operation="start"):
+        await run_in_threadpool(db.commit)
+    
+    # Call Hugging Face API. Concurrent requests for the same text and
+    # parameters share a single inference call.
+    request_key = HuggingFaceService.request_key(
+        summary.original_text, summary.model_used, summary.max_length, summary.min_length
+    )
+    with span("inference", model=summary.model_used):
+        result = await SingleFlight.arun(request_key, lambda: HuggingFaceService.aget_summary(
+            text=summary.original_text,
+            model_id=summary.model_used,
+            max_length=summary.max_length,
+            min_length=summary.min_length
+        ))
+    
+    # Update summary
+    if not result.get("success"):
+        models.UserSummaryCounts.set_status(db, summary, "failed")
+        summary.error_message = result.get("error", "Unknown error")
+    else:
+        summary.summary_text = result.get("summary", "")
+        summary.summary_preview = TextStore.preview(summary.summary_text)
+        models.UserSummaryCounts.set_status(db, summary, "completed")
+        summary.completed_at = datetime.utcnow()
+        
+        # Update statistics if available
+        if "stats" in result:
+            stats = result["stats"]
+            summary.processing_time_ms = stats.get("processing_time_ms")
+            summary.original_tokens = stats.get("input_tokens")
+            summary.summary_tokens = stats.get("output_tokens")
+    
+    if summary.processing_time_ms is None:
+        summary.processing_time_ms = int((time.time() - start_time) * 1000)
     
-    Can be filtered by status and sorted by different fields.
+    # Usage statistics and latency histogram, as for Celery tasks
+    try:
+        served_without_api = result.get("cached", False) or result.get("coalesced", False)
+        with span("stats"):
+            await run_in_threadpool(
+                update_usage_statistics, db, summary, result.get("success", False), served_without_api
+            )
+    except Exception as stats_error:
+        print(f"Error updating statistics: {stats_error}")
+    
+    # Processed in this request: no queueing and no blob storage
+    trace = current_trace()
+    if trace is not None:
+        summary.queued_ms = 0
+        summary.db_ms = trace.total_ms("db")
+        summary.inference_ms = trace.total_ms("inference")
+        summary.storage_ms = 0
+        summary.stats_ms = trace.total_ms("stats")
+    
+    await run_in_threadpool(db.commit)
+
+
+SORT_FIELDS = ("created_at", "status", "processing_time_ms")
+
+
+def summary_listing_query(db: Session,
+                          user_id: int,
+                          status: Optional[str] = None,
+                          sort_by: str = "created_at",
+                          sort_desc: bool = True,
+                          after: Optional[Tuple[datetime, int]] = None):
+    """
+    Query of a page of a user's summary listing, without offset or limit.
+    
+    Rows are (summary, original preview, summary preview). Large text
+    columns are never loaded; previews are cut in the database. Sorted by
+    created_at, id breaks ties and after is the (created_at, id) keyset
+    position the page starts after.
     """
-    # Build query
-    query = db.query(models.Summary).filter(models.Summary.user_id == current_user.id)
+    preview_chars = settings.SUMMARY_PREVIEW_CHARS
+    query = db.query(
+        models.Summary,
+        models.Summary.text_preview("original", preview_chars + 1).label("original_preview"),
+        models.Summary.text_preview("summary", preview_chars + 1).label("summary_preview"),
+    ).options(
+        defer(models.Summary.original_text),
+        defer(models.Summary.summary_text),
+        defer(models.Summary.original_preview),
+        defer(models.Summary.summary_preview),
+    ).filter(models.Summary.user_id == user_id)
     
-    # Apply status filter if provided
     if status:
         query = query.filter(models.Summary.status == status)
     
+    sort_column = getattr(models.Summary, sort_by)
+    if sort_by == "created_at":
+        if after:
+            position = tuple_(models.Summary.created_at, models.Summary.id)
+            query = query.filter(position < after if sort_desc else position > after)
+        order = [sort_column, models.Summary.id]
+    else:
+        order = [sort_column]
+    return query.order_by(*[desc(column) if sort_desc else column for column in order])
+
+
+@router.get("/", response_model=SummaryPage)
+def read_summaries(
+    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    skip: int = Query(0, ge=0, description="Skip records (deprecated: use cursor)"),
+    limit: int = Query(20, ge=1, le=100, description="Limit records"),
+    status: Optional[str] = Query(None, description="Filter by status"),
+    sort_by: str = Query("created_at", description="Sort field (created_at, status, processing_time_ms)"),
+    sort_desc: bool = Query(True, description="Sort descending"),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Retrieve a page of summaries for the current user.
+    
+    Can be filtered by status and sorted by different fields. Items carry
+    text previews instead of the full texts (see GET /summaries/{id}).
+    Sorted by created_at, pages are read by cursor: pass next_cursor to
+    get the following page, which costs the same however deep it is.
+    """
     # Apply sorting
-    if sort_by not in ["created_at", "status", "processing_time_ms"]:
+    if sort_by not in SORT_FIELDS:
         sort_by = "created_at"
-        
-    if sort_desc:
-        query = query.order_by(desc(getattr(models.Summary, sort_by)))
-    else:
-        query = query.order_by(getattr(models.Summary, sort_by))
     
-    # Apply pagination
-    summaries = query.offset(skip).limit(limit).all()
+    keyset = sort_by == "created_at"
+    if cursor and not keyset:
+        raise HTTPException(status_code=400, detail="cursor is only supported when sorting by created_at")
+    
+    after = _decode_cursor(cursor) if cursor else None
+    query = summary_listing_query(db, current_user.id, status, sort_by, sort_desc, after)
+    
+    if skip and not cursor:
+        query = query.offset(skip)
+    rows = query.limit(limit).all()
+    
+    preview_chars = settings.SUMMARY_PREVIEW_CHARS
+    items = [
+        SummaryListItem(
+            id=summary.id,
+            user_id=summary.user_id,
+            status=summary.status,
+            model_used=summary.model_used,
+            created_at=summary.created_at,
+            completed_at=summary.completed_at,
+            processing_time_ms=summary.processing_time_ms,
+            original_tokens=summary.original_tokens,
+            summary_tokens=summary.summary_tokens,
+            error_message=summary.error_message,
+            original_preview=_preview(original_preview, preview_chars),
+            summary_preview=_preview(summary_preview, preview_chars),
+        )
+        for summary, original_preview, summary_preview in rows
+    ]
+    
+    next_cursor = None
+    if keyset and len(rows) == limit:
+        last = rows[-1][0]
+        next_cursor = _encode_cursor(last.created_at, last.id)
     
-    return summaries
+    return SummaryPage(items=items, next_cursor=next_cursor)
+
+
+def _preview(text: Optional[str], length: int) -> Optional[str]:
+    """Cut a text fetched as length + 1 characters, marking truncation."""
+    if text is None or len(text) <= length:
+        return text
+    return text[:length] + "..."
+
+
+def _encode_cursor(created_at: datetime, summary_id: int) -> str:
+    payload = json.dumps([created_at.isoformat(), summary_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, summary_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(summary_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 
 @router.get("/count", response_model=Dict[str, Any])
@@ -157,31 +585,10 @@ def get_summary_counts(
 ) -> Any:
     """
     Get counts of summaries by status for the current user.
-    """
-    # Get total counts
-    counts = db.query(
-        models.Summary.status,
-        func.count(models.Summary.id).label("count")
-    ).filter(
-        models.Summary.user_id == current_user.id
-    ).group_by(
-        models.Summary.status
-    ).all()
-    
-    # Convert to dict
-    result = {
-        "total": 0,
-        "pending": 0,
-        "processing": 0,
-        "completed": 0,
-        "failed": 0
-    }
     
-    for status, count in counts:
-        result[status] = count
-        result["total"] += count
-    
-    return result
+    Read from the user's incrementally maintained counters.
+    """
+    return models.UserSummaryCounts.get(db, current_user.id)
 
 
 @router.get("/models", response_model=Dict[str, Any])
@@ -206,8 +613,9 @@ def read_summary(
     Get a summary by ID.
     
     Returns the full summary object including the original text,
-    summarized text, and processing details. Can optionally fetch the 
-    full content from S3 if available.
+    summarized text, and processing details with the time spent in each
+    stage (latency). Can optionally fetch the full content from S3 if
+    available.
     """
     # Get summary from database
     summary = db.query(models.Summary).filter(models.Summary.id == summary_id).first()
@@ -218,21 +626,27 @@ def read_summary(
     if summary.user_id != current_user.id and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
+    # Load texts moved to the text store
+    TextStore.rehydrate(summary)
+    
     # If summary has an S3 location and we want to use it, fetch from S3
+    # whatever the database is missing
     if use_s3 and summary.s3_location and summary.status == "completed":
-        try:
-            # Get the full summary data from S3
-            s3_data = S3Service.get_summary(summary.s3_location)
-            
-            # If we got data from S3, update the summary object with any missing details
-            if s3_data and "summary_text" in s3_data:
-                if not summary.summary_text and s3_data["summary_text"]:
-                    summary.summary_text = s3_data["summary_text"]
+        if summary.summary_text:
+            S3_CACHE_REQUESTS.labels(result="skipped").inc()
+        else:
+            try:
+                # Get the summary data from S3 (through the S3 object cache)
+                s3_data = S3Service.get_summary(summary.s3_location, include_original_text=False)
                 
-                # We could also update other fields if needed
-        except Exception as e:
-            # Log the error but continue with the database version
-            print(f"Warning: Could not fetch summary from S3: {e}")
+                # If we got data from S3, update the summary object with any missing details
+                if s3_data and s3_data.get("summary_text"):
+                    summary.summary_text = s3_data["summary_text"]
+                    
+                    # We could also update other fields if needed
+            except Exception as e:
+                # Log the error but continue with the database version
+                print(f"Warning: Could not fetch summary from S3: {e}")
     
     return summary
 
@@ -315,12 +729,16 @@ def delete_summary(
     # If the summary has an S3 location, delete it from S3 too
     if summary.s3_location:
         try:
-            S3Service.delete_summary(summary.s3_location)
+            S3Service.delete_summary(summary.s3_location, db=db)
         except Exception as e:
             # Log the error but continue with database deletion
             print(f"Warning: Failed to delete from S3: {e}")
     
+    # Delete texts moved to the text store
+    TextStore.delete_texts(summary)
+    
     # Delete the summary from the database
+    models.UserSummaryCounts.summary_deleted(db, summary)
     db.delete(summary)
     db.commit()
     
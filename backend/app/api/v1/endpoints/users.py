@@ -69,29 +69,13 @@ def read_user_stats(
     db: Session = Depends(deps.get_db),
     current_user: dict = Depends(deps.get_current_active_user),
 ) -> Any:
-    from sqlalchemy.sql import text
-    
-    # Using raw SQL for AWS compatibility
     user_id = current_user["id"]
     
-    # Get summary counts with raw SQL
-    total_query = text("""
-        SELECT COUNT(*) FROM summaries 
-        WHERE user_id = :user_id
-    """)
-    total_summaries = db.execute(total_query, {"user_id": user_id}).scalar() or 0
-    
-    pending_query = text("""
-        SELECT COUNT(*) FROM summaries 
-        WHERE user_id = :user_id AND status = 'pending'
-    """)
-    pending_summaries = db.execute(pending_query, {"user_id": user_id}).scalar() or 0
-    
-    completed_query = text("""
-        SELECT COUNT(*) FROM summaries 
-        WHERE user_id = :user_id AND status = 'completed'
-    """)
-    completed_summaries = db.execute(completed_query, {"user_id": user_id}).scalar() or 0
+    # One primary-key lookup of the user's summary counters
+    counts = models.UserSummaryCounts.get(db, user_id)
+    total_summaries = counts["total"]
+    pending_summaries = counts["pending"]
+    completed_summaries = counts["completed"]
     
     return {
         "total_summaries": total_summaries,
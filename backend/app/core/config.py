@@ -26,10 +26,105 @@ class Settings(BaseSettings):
 
     # Hugging Face API
     HUGGINGFACE_API_KEY: str = ""
+    # Point at mock_inference_server.py (e.g. http://localhost:8001/models) to run offline
+    HUGGINGFACE_API_BASE_URL: str = "https://api-inference.huggingface.co/models"
+
+    # Summarization backends: set to "mock" to serve every remote model
+    # from the in-process mock backend
+    INFERENCE_BACKEND: str = ""
+    MOCK_LATENCY_MS: int = 300
+    MOCK_LOADING_RATE: float = 0.0
+    MOCK_ERROR_RATE: float = 0.0
+    MOCK_BATCH_ITEM_LATENCY_MS: int = 20  # Extra latency per additional input of a batch
+
+    # Directory with <model_id>/tokenizer.json files; token counts are
+    # approximated when a model's tokenizer is not available
+    TOKENIZER_DIR: str = ""
+
+    # Local extractive engine
+    LOCAL_FALLBACK_MODEL: str = "textrank-local"  # Empty to disable fallback
+    EXTRACTIVE_PREFILTER_TOKENS: int = 6000  # Pre-cut longer inputs locally; 0 disables
 
     # Redis settings
     REDIS_URL: str = "redis://localhost:6379/0"
 
+    # Inference HTTP client (pooled, keep-alive)
+    HTTP_POOL_CONNECTIONS: int = 10  # Number of per-host pools
+    HTTP_POOL_MAXSIZE: int = 10  # Keep-alive connections per model host
+    HTTP_CONNECT_TIMEOUT: float = 3.05
+    HTTP_READ_TIMEOUT: float = 30.0
+    ASYNC_HTTP_MAX_CONNECTIONS: int = 200  # In-flight requests per API process
+
+    # Resilience: retries, retry budget and per-model circuit breaker
+    RETRY_BACKOFF_MAX_SECONDS: float = 20.0
+    RETRY_BUDGET_RATIO: float = 0.2  # Retries allowed per request in a window
+    RETRY_BUDGET_MIN_PER_WINDOW: int = 10
+    RETRY_BUDGET_WINDOW_SECONDS: int = 10
+    TASK_RETRY_BACKOFF_SECONDS: float = 5.0
+    CIRCUIT_BREAKER_ENABLED: bool = True
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RESET_TIMEOUT_SECONDS: int = 30
+    CIRCUIT_FALLBACK_MODEL: str = "textrank-local"  # Empty to fail fast
+
+    # Task routing: length-aware queues with per-user fairness
+    QUEUE_FAST_MAX_TOKENS: int = 300  # Texts up to this size go to the fast lane
+    QUEUE_FAIR_SHARE: int = 5  # A user's tasks drop one priority level per this many waiting
+    QUEUE_USER_MAX_PENDING: int = 100  # Waiting tasks allowed per user and lane
+    SUMMARY_BATCH_MAX_ITEMS: int = 500  # Texts per POST /summaries/batch
+
+    # Usage statistics are buffered in Redis and written in bulk this often
+    USAGE_STATS_FLUSH_INTERVAL_SECONDS: int = 30
+
+    # Per-user summary counters are recounted from the summaries this often
+    SUMMARY_COUNTS_RECONCILE_INTERVAL_SECONDS: int = 3600
+
+    # Infrastructure sampler (CPU, RSS, in-flight requests, queue depth)
+    INFRA_SAMPLER_ENABLED: bool = True
+    INFRA_SAMPLE_INTERVAL_SECONDS: float = 15.0
+
+    # Prometheus: Celery workers serve /metrics on this port (the API serves
+    # it on its own port); set PROMETHEUS_MULTIPROC_DIR for multi-process runs
+    CELERY_METRICS_PORT: int = 9808
+
+    # Print every finished trace (all spans) as one JSON line
+    TRACE_LOG_SPANS: bool = False
+
+    # Characters of each text returned by summary listings
+    SUMMARY_PREVIEW_CHARS: int = 200
+
+    # Micro-batching: queued summaries with the same model and lengths share
+    # one inference request (a batch size of 1 disables batching)
+    INFERENCE_BATCH_SIZE: int = 1
+    INFERENCE_BATCH_WINDOW_MS: int = 50  # Max wait for a batch to fill
+    INFERENCE_BATCH_FLUSH_GRACE_MS: int = 5000  # Re-arm the flush if it has not run by then
+
+    # Model warm-keeper: keep-alive inferences before hosted models unload
+    MODEL_WARMER_ENABLED: bool = True
+    MODEL_IDLE_TIMEOUT_SECONDS: int = 900  # Idle time after which the provider unloads a model
+    MODEL_WARM_INTERVAL_SECONDS: int = 60  # How often the beat task checks
+    MODEL_WARM_MARGIN_SECONDS: int = 180  # Warm this long before the idle timeout
+    MODEL_COLD_START_THRESHOLD_MS: int = 5000  # Keep-alive slower than this was a cold start
+    MODEL_LATENCY_SAMPLE_SIZE: int = 1000  # Recent calls kept per model for p99
+
+    # Long-document (map-reduce) summarization
+    LONG_DOCUMENT_MODE: bool = True
+    CHUNK_OVERLAP_SENTENCES: int = 1
+    CHUNK_MAX_CONCURRENCY: int = 4
+    CHUNK_MAX_REDUCE_ROUNDS: int = 3
+
+    # Summary result cache (in-process LRU + Redis)
+    SUMMARY_CACHE_ENABLED: bool = True
+    SUMMARY_CACHE_REDIS_ENABLED: bool = True
+    SUMMARY_CACHE_TTL_SECONDS: int = 86400
+    SUMMARY_CACHE_LOCAL_MAXSIZE: int = 1024
+    SUMMARY_CACHE_REDIS_MAXSIZE: int = 100000
+
+    # Single-flight coalescing of identical in-flight requests
+    SINGLE_FLIGHT_ENABLED: bool = True
+    SINGLE_FLIGHT_LOCK_TTL_SECONDS: int = 300
+    SINGLE_FLIGHT_WAIT_SECONDS: int = 300
+    SINGLE_FLIGHT_RESULT_TTL_SECONDS: int = 60
+
     # Development settings
     PROCESS_DIRECTLY: bool = True
 
@@ -45,6 +140,32 @@ class Settings(BaseSettings):
     AWS_SECRET_ACCESS_KEY: Optional[str] = None
     AWS_REGION: Optional[str] = None
     S3_BUCKET_NAME: Optional[str] = None
+    S3_COMPRESSION_LEVEL: int = 6  # gzip level of stored objects (1 fastest - 9 smallest)
+    S3_MAX_POOL_CONNECTIONS: int = 32  # Per process; at least S3_IO_MAX_WORKERS
+    S3_MAX_ATTEMPTS: int = 3  # botocore "standard" retries, including the first attempt
+    S3_CONNECT_TIMEOUT_SECONDS: float = 2.0
+    S3_READ_TIMEOUT_SECONDS: float = 10.0
+    S3_IO_MAX_WORKERS: int = 16  # Threads for background and parallel S3 calls
+    S3_BACKGROUND_UPLOADS: bool = True  # Workers upload summaries after the task, off its latency
+    S3_BLOB_GC_INTERVAL_SECONDS: int = 3600  # Sweep deleting texts no summary references
+    S3_BLOB_GC_BATCH_SIZE: int = 1000
+
+    # Read-through cache of S3 objects (in-process LRU + Redis), keyed by S3 key
+    S3_CACHE_ENABLED: bool = True
+    S3_CACHE_REDIS_ENABLED: bool = True
+    S3_CACHE_TTL_SECONDS: int = 3600
+    S3_CACHE_REVALIDATE_SECONDS: int = 300  # Conditional GET (If-None-Match) after this long
+    S3_CACHE_LOCAL_MAXSIZE: int = 256
+    S3_CACHE_MAX_OBJECT_BYTES: int = 262144  # Larger objects are not cached
+
+    # Tiered text storage: long texts of completed summaries move from the
+    # summaries table to a blob store ("s3", "local", or empty to disable)
+    TEXT_STORE_BACKEND: str = ""
+    TEXT_STORE_LOCAL_DIR: str = "./text_store"  # Root of the "local" backend
+    TEXT_STORE_MIN_CHARS: int = 2000  # Shorter texts stay in the database
+    TEXT_STORE_OFFLOAD_AFTER_SECONDS: int = 3600  # Keep fresh results in the database this long
+    TEXT_STORE_SWEEP_INTERVAL_SECONDS: int = 300
+    TEXT_STORE_SWEEP_BATCH_SIZE: int = 200
 
     class Config:
         env_file = ".env"
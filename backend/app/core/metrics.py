@@ -0,0 +1,141 @@
+"""
+Prometheus metrics.
+
+Set PROMETHEUS_MULTIPROC_DIR (an empty, writable directory, before the
+process starts) when running several uvicorn workers or Celery worker
+processes: each process then writes its samples to files in that
+directory and every scrape aggregates all of them. Without it, metrics
+are per process.
+
+API processes expose /metrics. Celery workers have no HTTP server of
+their own, so the worker's main process serves the aggregated metrics of
+its children on CELERY_METRICS_PORT.
+"""
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    start_http_server,
+)
+from prometheus_client import multiprocess
+
+# Buckets in seconds: HTTP and S3 calls are fast, inference and tasks slow
+FAST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOW_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=FAST_BUCKETS,
+)
+INFERENCE_DURATION = Histogram(
+    "inference_request_duration_seconds",
+    "Latency of single inference API calls",
+    ["model", "outcome"],
+    buckets=SLOW_BUCKETS,
+)
+INFERENCE_RETRIES = Counter(
+    "inference_retries_total",
+    "Inference calls retried after a failure or a loading model",
+    ["model"],
+)
+INFERENCE_LOADING = Counter(
+    "inference_model_loading_total",
+    "503 model-loading responses from the inference API",
+    ["model"],
+)
+S3_OPERATION_DURATION = Histogram(
+    "s3_operation_duration_seconds",
+    "Latency of S3 operations",
+    ["operation", "outcome"],
+    buckets=FAST_BUCKETS,
+)
+S3_CACHE_REQUESTS = Counter(
+    "s3_cache_requests_total",
+    "S3 object reads by how they were served: local or redis (cache hit), "
+    "revalidated (304), miss (full GET) or skipped (database had the data)",
+    ["result"],
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to get a connection from the database pool",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+CELERY_TASK_DURATION = Histogram(
+    "celery_task_duration_seconds",
+    "Celery task run time",
+    ["task", "state"],
+    buckets=SLOW_BUCKETS,
+)
+
+
+def is_multiprocess() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def render_latest() -> bytes:
+    """Current metrics in the Prometheus text format, across processes if enabled."""
+    if is_multiprocess():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest()
+
+
+def start_metrics_server(port: int) -> None:
+    """Serve the aggregated metrics of this process and its children over HTTP."""
+    if is_multiprocess():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        start_http_server(port, registry=registry)
+    else:
+        start_http_server(port)
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop a dead process's live gauges (multiprocess mode only)."""
+    if is_multiprocess():
+        multiprocess.mark_process_dead(pid)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency per route template.
+
+    The route label is the matched path template (e.g. /summaries/{summary_id}),
+    never the raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the shared scope
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status["code"]),
+            ).observe(time.perf_counter() - start)
+
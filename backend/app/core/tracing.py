@@ -0,0 +1,138 @@
+"""
+Lightweight request tracing.
+
+A trace is a trace id plus the spans (name, start, duration, attributes)
+recorded while handling one summary. The current trace lives in a
+context variable, so code anywhere below the API handler or Celery task
+can add spans without passing it around; with no active trace, recording
+a span is a no-op.
+
+The trace id starts in create_summary (taken from an incoming
+X-Trace-Id header, or new), is stored on the summary row and travels to
+the Celery task in its message headers. Per-stage totals are stored on
+the summary (see Summary.latency); with TRACE_LOG_SPANS the full span
+list of each trace is printed as one JSON line.
+"""
+import json
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.core.config import settings
+
+TRACE_HEADER = "X-Trace-Id"
+
+# Stages of a summary's life, stored as <stage>_ms on the summary
+STAGES = ("queued", "db", "inference", "storage", "stats")
+
+
+class Trace:
+    """The spans recorded under one trace id."""
+
+    def __init__(self, trace_id: Optional[str] = None, name: str = ""):
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.name = name
+        self.started_at = time.time()
+        self.spans: List[Dict[str, Any]] = []
+
+    def add_span(self, name: str, started_at: float, ended_at: Optional[float] = None, **attributes) -> None:
+        ended_at = time.time() if ended_at is None else ended_at
+        self.spans.append({
+            "name": name,
+            "offset_ms": round((started_at - self.started_at) * 1000, 1),
+            "duration_ms": round((ended_at - started_at) * 1000, 1),
+            **attributes,
+        })
+
+    def total_ms(self, name: str, summary_id: Optional[int] = None) -> int:
+        """
+        Total duration of the spans with this name.
+
+        Spans tagged with a summary_id only count towards that summary;
+        untagged spans (e.g. one batched inference call) count for all.
+        """
+        return int(round(sum(
+            span["duration_ms"] for span in self.spans
+            if span["name"] == name and span.get("summary_id", summary_id) == summary_id
+        )))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"trace_id": self.trace_id, "name": self.name, "spans": self.spans}
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def current_trace_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.trace_id if trace else None
+
+
+@contextmanager
+def start_trace(trace_id: Optional[str] = None, name: str = "") -> Iterator[Trace]:
+    """Make a trace current for the duration of the block."""
+    trace = Trace(trace_id, name)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        if settings.TRACE_LOG_SPANS:
+            print(json.dumps(trace.to_dict()))
+
+
+def record_span(name: str, started_at: float, **attributes) -> None:
+    """Add a span that started at started_at (time.time()) and ends now to the current trace."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_span(name, started_at, **attributes)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[None]:
+    """Record the block as a span of the current trace."""
+    started_at = time.time()
+    try:
+        yield
+    finally:
+        record_span(name, started_at, **attributes)
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware running each HTTP request under a trace.
+
+    Continues the trace id of an incoming X-Trace-Id header (or starts a
+    new one) and returns it in the X-Trace-Id response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        header = TRACE_HEADER.lower().encode()
+        trace_id = next(
+            (value.decode("latin-1") for name, value in scope["headers"] if name == header), None
+        )
+        # Only accept ids that are safe to log and to echo back
+        if trace_id and not (len(trace_id) <= 64 and trace_id.isascii() and trace_id.replace("-", "").isalnum()):
+            trace_id = None
+
+        with start_trace(trace_id, name=f"{scope['method']} {scope['path']}") as trace:
+            async def send_with_trace_id(message):
+                if message["type"] == "http.response.start":
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [(header, trace.trace_id.encode())]
+                await send(message)
+
+            await self.app(scope, receive, send_with_trace_id)
@@ -1,11 +1,26 @@
+import time
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from app.core.config import settings
+from app.core.metrics import DB_POOL_CHECKOUT_WAIT
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each connection checkout waits."""
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
 
 # Always use PostgreSQL for this application
 engine = create_engine(
     settings.DATABASE_URL,
+    poolclass=TimedQueuePool,
     pool_size=10,
     max_overflow=20,
     pool_timeout=30,
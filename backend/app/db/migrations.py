@@ -0,0 +1,234 @@
+"""
+Versioned schema migrations.
+
+Each migration has a version number and is applied once, in order; the
+versions applied so far are recorded in the schema_migrations table.
+Every migration is idempotent (IF NOT EXISTS), so databases whose schema
+was patched by the earlier ad-hoc checks in init_db are brought under
+version control without changes.
+
+Processes starting at the same time (several uvicorn workers) take a
+PostgreSQL advisory lock, so only one of them migrates.
+
+To change the schema, append a Migration with the next version; never
+edit or reorder applied ones.
+"""
+from typing import Callable, List, Sequence, Union
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+LOCK_NAME = "summarease_schema_migrations"
+
+
+class Migration:
+    """
+    One schema change.
+
+    Args:
+        version: Position in the migration sequence
+        description: What the migration does
+        steps: SQL statements, or a function taking the connection
+        transactional: Run in one transaction. Set to False for statements
+            that cannot run in a transaction (CREATE INDEX CONCURRENTLY).
+    """
+
+    def __init__(self,
+                 version: int,
+                 description: str,
+                 steps: Union[Sequence[str], Callable[[Connection], None]],
+                 transactional: bool = True):
+        self.version = version
+        self.description = description
+        self.steps = steps
+        self.transactional = transactional
+
+    def apply(self, conn: Connection) -> None:
+        if callable(self.steps):
+            self.steps(conn)
+            return
+        for statement in self.steps:
+            conn.execute(text(statement))
+
+
+def create_index_concurrently(name: str, definition: str) -> Callable[[Connection], None]:
+    """
+    Build an index without blocking writes to the table.
+
+    A concurrent build that was interrupted leaves an invalid index
+    behind, which IF NOT EXISTS would keep; it is dropped and rebuilt.
+    """
+    def apply(conn: Connection) -> None:
+        is_valid = conn.execute(
+            text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+            {"name": name}
+        ).scalar()
+        if is_valid is False:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}"))
+    return apply
+
+
+def _create_summary_listing_indexes(conn: Connection) -> None:
+    # Listings: WHERE user_id = ? ORDER BY created_at DESC, id DESC (keyset)
+    create_index_concurrently(
+        "ix_summaries_user_created", "ON summaries (user_id, created_at DESC, id DESC)"
+    )(conn)
+    # Status counts per user: index-only scans
+    create_index_concurrently(
+        "ix_summaries_user_status", "ON summaries (user_id, status)"
+    )(conn)
+    # Both start with user_id, which makes the single-column index redundant
+    conn.execute(text("DROP INDEX CONCURRENTLY IF EXISTS ix_summaries_user_id"))
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Create users and summaries tables", [
+        # The column structure used in AWS RDS
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id SERIAL PRIMARY KEY,
+            email VARCHAR UNIQUE,
+            username VARCHAR,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS summaries (
+            id SERIAL PRIMARY KEY,
+            user_id INTEGER REFERENCES users(id),
+            title VARCHAR,
+            original_text TEXT,
+            summary_text TEXT,
+            original_file_path VARCHAR,
+            status VARCHAR DEFAULT 'pending',
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+            updated_at TIMESTAMP WITH TIME ZONE
+        )
+        """,
+    ]),
+    Migration(2, "Add users.username", [
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS username VARCHAR",
+    ]),
+    Migration(3, "Add usage_statistics.cache_hits", [
+        "ALTER TABLE usage_statistics ADD COLUMN IF NOT EXISTS cache_hits INTEGER DEFAULT 0",
+    ]),
+    Migration(4, "Add usage_statistics.bucket_start", [
+        "ALTER TABLE usage_statistics ADD COLUMN IF NOT EXISTS bucket_start TIMESTAMP WITH TIME ZONE",
+        # One row per hour: the target of the statistics upsert
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_usage_statistics_bucket_start ON usage_statistics (bucket_start)",
+    ]),
+    Migration(5, "Add usage_statistics.infra_samples", [
+        "ALTER TABLE usage_statistics ADD COLUMN IF NOT EXISTS infra_samples INTEGER DEFAULT 0",
+    ]),
+    Migration(6, "Add summary tracing columns", [
+        "ALTER TABLE summaries ADD COLUMN IF NOT EXISTS trace_id VARCHAR",
+        "CREATE INDEX IF NOT EXISTS ix_summaries_trace_id ON summaries (trace_id)",
+        "ALTER TABLE summaries ADD COLUMN IF NOT EXISTS queued_ms INTEGER",
+        "ALTER TABLE summaries ADD COLUMN IF NOT EXISTS db_ms INTEGER",
+        "ALTER TABLE summaries ADD COLUMN IF NOT EXISTS inference_ms INTEGER",
+        "ALTER TABLE summaries ADD COLUMN IF NOT EXISTS storage_ms INTEGER",
+        "ALTER TABLE summaries ADD COLUMN IF NOT EXISTS stats_ms INTEGER",
+    ]),
+    Migration(7, "Add composite indexes for per-user summary queries",
+              _create_summary_listing_indexes, transactional=False),
+    Migration(8, "Add per-user summary status counters", [
+        """
+        CREATE TABLE IF NOT EXISTS user_summary_counts (
+            user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+            total INTEGER NOT NULL DEFAULT 0,
+            pending INTEGER NOT NULL DEFAULT 0,
+            processing INTEGER NOT NULL DEFAULT 0,
+            completed INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+        )
+        """,
+        # Backfill from the existing summaries
+        """
+        INSERT INTO user_summary_counts (user_id, total, pending, processing, completed, failed)
+        SELECT user_id,
+               COUNT(*),
+               COUNT(*) FILTER (WHERE status = 'pending'),
+               COUNT(*) FILTER (WHERE status = 'processing'),
+               COUNT(*) FILTER (WHERE status = 'completed'),
+               COUNT(*) FILTER (WHERE status = 'failed')
+        FROM summaries
+        WHERE user_id IS NOT NULL
+        GROUP BY user_id
+        ON CONFLICT (user_id) DO NOTHING
+        """,
+    ]),
+    Migration(9, "Add tiered text storage columns", [
+        "ALTER TABLE summaries ADD COLUMN IF NOT EXISTS original_preview TEXT",
+        "ALTER TABLE summaries ADD COLUMN IF NOT EXISTS original_sha256 VARCHAR(64)",
+        "ALTER TABLE summaries ADD COLUMN IF NOT EXISTS original_text_key VARCHAR",
+        "ALTER TABLE summaries ADD COLUMN IF NOT EXISTS summary_preview TEXT",
+        "ALTER TABLE summaries ADD COLUMN IF NOT EXISTS summary_sha256 VARCHAR(64)",
+        "ALTER TABLE summaries ADD COLUMN IF NOT EXISTS summary_text_key VARCHAR",
+    ]),
+    Migration(10, "Add index for the text offload sweep", create_index_concurrently(
+        "ix_summaries_unswept",
+        "ON summaries (completed_at) WHERE status = 'completed' AND original_sha256 IS NULL"
+    ), transactional=False),
+    Migration(11, "Add reference counts of content-addressed S3 texts", [
+        """
+        CREATE TABLE IF NOT EXISTS stored_blobs (
+            sha256 VARCHAR(64) PRIMARY KEY,
+            refcount INTEGER NOT NULL DEFAULT 0,
+            size_bytes INTEGER DEFAULT 0,
+            stored_bytes INTEGER DEFAULT 0,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+        )
+        """,
+    ]),
+    Migration(12, "Add summaries.batch_id", [
+        "ALTER TABLE summaries ADD COLUMN IF NOT EXISTS batch_id VARCHAR",
+    ]),
+    Migration(13, "Add index for batch progress", create_index_concurrently(
+        "ix_summaries_batch_id", "ON summaries (batch_id) WHERE batch_id IS NOT NULL"
+    ), transactional=False),
+    Migration(14, "Add index for unreferenced S3 texts", create_index_concurrently(
+        "ix_stored_blobs_unreferenced", "ON stored_blobs (sha256) WHERE refcount = 0"
+    ), transactional=False),
+]
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """
+    Apply all pending migrations in order.
+
+    Returns:
+        The versions applied by this call
+    """
+    applied = []
+    # Session-level lock and non-transactional migrations need autocommit
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+        lock_conn.execute(text("SELECT pg_advisory_lock(hashtext(:name))"), {"name": LOCK_NAME})
+        try:
+            lock_conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    description VARCHAR,
+                    applied_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+                )
+            """))
+            done = {row[0] for row in lock_conn.execute(text("SELECT version FROM schema_migrations"))}
+
+            for migration in MIGRATIONS:
+                if migration.version in done:
+                    continue
+                print(f"Applying migration {migration.version}: {migration.description}")
+                record = text("INSERT INTO schema_migrations (version, description) VALUES (:version, :description)")
+                values = {"version": migration.version, "description": migration.description}
+                if migration.transactional:
+                    with engine.begin() as conn:
+                        migration.apply(conn)
+                        conn.execute(record, values)
+                else:
+                    migration.apply(lock_conn)
+                    lock_conn.execute(record, values)
+                applied.append(migration.version)
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(hashtext(:name))"), {"name": LOCK_NAME})
+    return applied
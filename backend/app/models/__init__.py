@@ -1,5 +1,8 @@
 from app.models.user import User
 from app.models.summary import Summary
 from app.models.usage_statistics import UsageStatistics
+from app.models.latency_histogram import LatencyHistogramBin
+from app.models.user_summary_counts import UserSummaryCounts
+from app.models.stored_blob import StoredBlob
 
 # Import all models here to make them available through the models module
\ No newline at end of file
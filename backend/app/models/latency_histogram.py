@@ -0,0 +1,79 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class LatencyHistogramBin(Base):
+    """
+    One bin of an hourly, per-model latency histogram.
+
+    Histograms (see LatencyHistogram) are stored as one row per non-empty
+    bin, so merging across hours and models is a SUM ... GROUP BY.
+    """
+    __tablename__ = "latency_histogram_bins"
+    __table_args__ = (
+        UniqueConstraint("bucket_start", "model_id", "bin_index", name="uq_latency_histogram_bin"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    bucket_start = Column(DateTime(timezone=True), index=True)  # Start of the hour (UTC)
+    model_id = Column(String, index=True)
+    bin_index = Column(Integer)
+    count = Column(Integer, default=0)
+
+    @classmethod
+    def upsert_counts(cls, db, bucket_start: datetime, histograms: Dict[str, Dict[int, int]]) -> None:
+        """
+        Add per-model histograms to an hour bucket in one statement.
+
+        Args:
+            db: Database session
+            bucket_start: Start of the hour bucket (UTC)
+            histograms: {model_id: {bin: count}}
+
+        Does not commit.
+        """
+        rows = [
+            {"bucket_start": bucket_start, "model_id": model_id, "bin_index": index, "count": count}
+            for model_id, histogram in histograms.items()
+            for index, count in histogram.items()
+            if count
+        ]
+        if not rows:
+            return
+
+        statement = insert(cls.__table__).values(rows)
+        statement = statement.on_conflict_do_update(
+            constraint="uq_latency_histogram_bin",
+            set_={"count": cls.__table__.c["count"] + statement.excluded["count"]}
+        )
+        db.execute(statement)
+
+    @classmethod
+    def get_merged(cls,
+                   db,
+                   start: datetime,
+                   end: datetime,
+                   model_id: Optional[str] = None) -> Dict[str, Dict[int, int]]:
+        """
+        Histograms per model merged over the hour buckets in [start, end).
+
+        Returns:
+            {model_id: {bin: count}}
+        """
+        query = db.query(
+            cls.model_id, cls.bin_index, func.sum(cls.count)
+        ).filter(
+            cls.bucket_start >= start,
+            cls.bucket_start < end
+        )
+        if model_id:
+            query = query.filter(cls.model_id == model_id)
+
+        histograms: Dict[str, Dict[int, int]] = {}
+        for row_model_id, index, count in query.group_by(cls.model_id, cls.bin_index):
+            histograms.setdefault(row_model_id, {})[index] = int(count)
+        return histograms
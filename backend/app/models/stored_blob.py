@@ -0,0 +1,108 @@
+from typing import Any, Dict, List
+
+from sqlalchemy import Column, Integer, String, DateTime, Index, delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class StoredBlob(Base):
+    """
+    Reference count of a content-addressed S3 blob (see S3Service.store_blob).
+
+    A text is uploaded by the transaction that takes its first reference,
+    or the first one after the count dropped to zero. Dropping the last
+    reference only sets the count to zero: the blob is deleted after
+    commit, by the S3Service.collect_unreferenced_blobs sweep, which holds
+    the row lock while it deletes the blob and the row. So a blob is never
+    deleted while a transaction references it again, and a rolled-back
+    release never loses a blob.
+    """
+    __tablename__ = "stored_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    refcount = Column(Integer, default=0, nullable=False)
+    size_bytes = Column(Integer, default=0)  # Uncompressed
+    stored_bytes = Column(Integer, default=0)  # Compressed, as stored in S3
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    @classmethod
+    def acquire(cls, db, sha256: str, size_bytes: int, stored_bytes: int) -> bool:
+        """
+        Add a reference to a blob. Does not commit.
+
+        Returns:
+            True if the blob is new or was unreferenced (it may have been
+            collected already) and must be uploaded
+        """
+        table = cls.__table__
+        statement = insert(table).values(
+            sha256=sha256, refcount=1, size_bytes=size_bytes, stored_bytes=stored_bytes
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.sha256],
+            set_={"refcount": table.c.refcount + 1}
+        ).returning(table.c.refcount)
+        return db.execute(statement).scalar() == 1
+
+    @classmethod
+    def release(cls, db, sha256: str) -> None:
+        """Drop a reference to a blob. Does not commit."""
+        table = cls.__table__
+        db.execute(
+            update(table).where(table.c.sha256 == sha256, table.c.refcount > 0)
+            .values(refcount=table.c.refcount - 1)
+        )
+
+    @classmethod
+    def mark_unreferenced(cls, conn, sha256s: List[str]) -> None:
+        """
+        Record blobs uploaded by a transaction that rolled back, so the
+        sweep deletes them unless another transaction references them.
+        """
+        table = cls.__table__
+        conn.execute(
+            insert(table).on_conflict_do_nothing(index_elements=[table.c.sha256]),
+            [{"sha256": sha256, "refcount": 0} for sha256 in sha256s]
+        )
+
+    @classmethod
+    def lock_unreferenced(cls, db, limit: int) -> List[str]:
+        """Lock up to limit unreferenced blobs that no other transaction holds."""
+        table = cls.__table__
+        return db.execute(
+            select(table.c.sha256).where(table.c.refcount == 0)
+            .limit(limit).with_for_update(skip_locked=True)
+        ).scalars().all()
+
+    @classmethod
+    def remove(cls, db, sha256s: List[str]) -> None:
+        """Delete the rows of collected blobs (locked by lock_unreferenced). Does not commit."""
+        table = cls.__table__
+        db.execute(delete(table).where(table.c.sha256.in_(sha256s), table.c.refcount == 0))
+
+    @classmethod
+    def get_stats(cls, db) -> Dict[str, Any]:
+        """Bytes referenced by summaries versus bytes actually stored."""
+        blobs, references, logical_bytes, unique_bytes, stored_bytes = db.query(
+            func.count(cls.sha256),
+            func.coalesce(func.sum(cls.refcount), 0),
+            func.coalesce(func.sum(cls.size_bytes * cls.refcount), 0),
+            func.coalesce(func.sum(cls.size_bytes), 0),
+            func.coalesce(func.sum(cls.stored_bytes), 0),
+        ).filter(cls.refcount > 0).one()
+        return {
+            "blobs": blobs,
+            "references": int(references),
+            "logical_bytes": int(logical_bytes),  # One uncompressed copy per reference
+            "unique_bytes": int(unique_bytes),  # After deduplication
+            "stored_bytes": int(stored_bytes),  # After deduplication and compression
+            "reduction_ratio": round(int(logical_bytes) / int(stored_bytes), 2) if stored_bytes else None,
+        }
+
+
+# Blobs waiting for the sweep (migration 14)
+Index(
+    "ix_stored_blobs_unreferenced",
+    StoredBlob.sha256,
+    postgresql_where=StoredBlob.refcount == 0,
+)
@@ -1,5 +1,8 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float, Index
 from sqlalchemy.sql import func
+from sqlalchemy.sql.functions import coalesce
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 from app.services.huggingface_service import HuggingFaceService
@@ -8,18 +11,29 @@ class Summary(Base):
     __tablename__ = "summaries"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))  # Indexed by the composite indexes below
     
     # Text content
     original_text = Column(Text)
     summary_text = Column(Text, nullable=True)
     
+    # Tiered storage (see TextStore): previews and hashes of the texts, and
+    # the blob keys of texts moved out of this table (the text is then NULL)
+    original_preview = Column(Text, nullable=True)
+    original_sha256 = Column(String(64), nullable=True)
+    original_text_key = Column(String, nullable=True)
+    summary_preview = Column(Text, nullable=True)
+    summary_sha256 = Column(String(64), nullable=True)
+    summary_text_key = Column(String, nullable=True)
+    
     # Status tracking
     status = Column(String, default="pending", index=True)
     error_message = Column(String, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    # Set in Python, with microseconds: SQLite's CURRENT_TIMESTAMP has whole
+    # seconds, which breaks keyset comparisons against bound datetimes
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=func.now(), index=True)
     processing_started_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
     
@@ -31,6 +45,16 @@ class Summary(Base):
     
     # API tracking
     api_request_id = Column(String, nullable=True)
+    trace_id = Column(String, nullable=True, index=True)
+    batch_id = Column(String, nullable=True)  # Submitted with POST /summaries/batch
+    
+    # Latency breakdown (see app.core.tracing). db_ms covers the commits
+    # before the one that stores these fields.
+    queued_ms = Column(Integer, nullable=True)
+    db_ms = Column(Integer, nullable=True)
+    inference_ms = Column(Integer, nullable=True)
+    storage_ms = Column(Integer, nullable=True)
+    stats_ms = Column(Integer, nullable=True)
     
     # Cloud storage
     s3_location = Column(String, nullable=True)
@@ -43,6 +67,23 @@ class Summary(Base):
     # Relationships
     user = relationship("User", backref="summaries")
     
+    @classmethod
+    def text_preview(cls, field: str, length: int):
+        """
+        SQL expression for the first length characters of a text.
+        
+        Reads the preview column when set, so offloaded texts (and the
+        TOAST storage of large ones) are never touched.
+        
+        Args:
+            field: "original" or "summary"
+            length: Number of characters (at most SUMMARY_PREVIEW_CHARS + 1)
+        """
+        return coalesce(
+            func.substr(getattr(cls, f"{field}_preview"), 1, length),
+            func.substr(getattr(cls, f"{field}_text"), 1, length),
+        )
+    
     @property
     def processing_time_seconds(self):
         """Get processing time in seconds."""
@@ -50,6 +91,21 @@ class Summary(Base):
             return self.processing_time_ms / 1000
         return None
         
+    @property
+    def latency(self):
+        """Get the per-stage latency breakdown, if the summary was traced."""
+        stages = {
+            "queued_ms": self.queued_ms,
+            "db_ms": self.db_ms,
+            "inference_ms": self.inference_ms,
+            "storage_ms": self.storage_ms,
+            "stats_ms": self.stats_ms,
+        }
+        if all(value is None for value in stages.values()):
+            return None
+        stages["total_ms"] = sum(value or 0 for value in stages.values())
+        return stages
+        
     @property
     def is_complete(self):
         """Check if the summary is complete."""
@@ -75,4 +131,22 @@ class Summary(Base):
         """Get a display name for the model used."""
         if self.model_used in HuggingFaceService.MODELS:
             return HuggingFaceService.MODELS[self.model_used]["name"]
-        return self.model_used
\ No newline at end of file
+        return self.model_used
+
+
+# Per-user queries (see migration 7): keyset listings and status counts
+Index("ix_summaries_user_created", Summary.user_id, Summary.created_at.desc(), Summary.id.desc())
+Index("ix_summaries_user_status", Summary.user_id, Summary.status)
+
+# Summaries of a batch, for its progress (migration 13)
+Index(
+    "ix_summaries_batch_id",
+    Summary.batch_id,
+    postgresql_where=Summary.batch_id.isnot(None),
+)
+
+# Completed summaries the TextStore offload sweep has not seen yet (migration 10)
+Index(
+    "ix_summaries_unswept", Summary.completed_at,
+    postgresql_where=(Summary.status == "completed") & Summary.original_sha256.is_(None)
+)
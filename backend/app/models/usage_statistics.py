@@ -1,7 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float
+from datetime import datetime
+from typing import Dict, Any
+
+from sqlalchemy import Column, Integer, String, DateTime, Float, case
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.sql import func
 from app.db.base import Base
 
+def _greater(a, b):
+    """The larger of two values; SQLite has no GREATEST()."""
+    return case((a > b, a), else_=b)
+
 class UsageStatistics(Base):
     """
     Model for tracking API usage and costs for billing and analytics purposes.
@@ -18,11 +26,13 @@ class UsageStatistics(Base):
     # Time tracking
     date = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     hour = Column(Integer, index=True)  # Hour of day (0-23) for hourly stats
+    bucket_start = Column(DateTime(timezone=True), unique=True, index=True)  # Start of the hour (UTC)
     
     # Usage counts
     total_requests = Column(Integer, default=0)
     successful_requests = Column(Integer, default=0)
     failed_requests = Column(Integer, default=0)
+    cache_hits = Column(Integer, default=0)  # Served from SummaryCache, no API call
     
     # Performance metrics
     avg_processing_time_ms = Column(Float, default=0.0)
@@ -33,8 +43,9 @@ class UsageStatistics(Base):
     huggingface_api_cost = Column(Float, default=0.0)
     
     # Infrastructure stats for cost estimation
-    cpu_usage_percent = Column(Float, default=0.0)
-    memory_usage_mb = Column(Float, default=0.0)
+    cpu_usage_percent = Column(Float, default=0.0)  # Mean per-process CPU over the samples
+    memory_usage_mb = Column(Float, default=0.0)  # Peak per-process RSS
+    infra_samples = Column(Integer, default=0)  # InfraSampler samples behind the two above
     
     # Scaling metrics
     peak_concurrent_requests = Column(Integer, default=0)
@@ -65,4 +76,88 @@ class UsageStatistics(Base):
             db.commit()
             db.refresh(record)
             
-        return record
\ No newline at end of file
+        return record
+    
+    @classmethod
+    def upsert_hourly(cls, db, bucket_start: datetime, counters: Dict[str, Any]) -> None:
+        """
+        Add counters to the record of an hour bucket in one statement.
+        
+        Inserts the record or, if it exists, adds to it atomically in the
+        database (INSERT ... ON CONFLICT DO UPDATE), so concurrent writers
+        neither lose updates nor create duplicate rows. Does not commit.
+        
+        Args:
+            db: Database session
+            bucket_start: Start of the hour bucket (UTC)
+            counters: requests, successes, failures, cache_hits, tokens,
+                cost, latency_sum_ms and max_latency_ms for the bucket, and
+                infrastructure samples: infra_samples, cpu_percent_sum,
+                memory_mb_max, peak_concurrent_max and queue_depth_max
+        """
+        requests = int(counters.get("requests", 0))
+        samples = int(counters.get("infra_samples", 0))
+        if not requests and not samples:
+            return
+        
+        values = {
+            "date": bucket_start,
+            "hour": bucket_start.hour,
+            "bucket_start": bucket_start,
+            "total_requests": requests,
+            "successful_requests": int(counters.get("successes", 0)),
+            "failed_requests": int(counters.get("failures", 0)),
+            "cache_hits": int(counters.get("cache_hits", 0)),
+            "avg_processing_time_ms": float(counters.get("latency_sum_ms", 0)) / requests if requests else 0.0,
+            "max_processing_time_ms": float(counters.get("max_latency_ms", 0)),
+            "total_tokens_processed": int(counters.get("tokens", 0)),
+            "huggingface_api_cost": float(counters.get("cost", 0.0)),
+            "infra_samples": samples,
+            "cpu_usage_percent": float(counters.get("cpu_percent_sum", 0.0)) / samples if samples else 0.0,
+            "memory_usage_mb": float(counters.get("memory_mb_max", 0.0)),
+            "peak_concurrent_requests": int(counters.get("peak_concurrent_max", 0)),
+            "queue_depth": int(counters.get("queue_depth_max", 0)),
+        }
+        
+        statement = insert(cls.__table__).values(**values)
+        existing = cls.__table__.c
+        new = statement.excluded
+        total_requests = func.coalesce(existing.total_requests, 0) + new.total_requests
+        total_samples = func.coalesce(existing.infra_samples, 0) + new.infra_samples
+        statement = statement.on_conflict_do_update(
+            index_elements=[existing.bucket_start],
+            set_={
+                "total_requests": total_requests,
+                "successful_requests": func.coalesce(existing.successful_requests, 0) + new.successful_requests,
+                "failed_requests": func.coalesce(existing.failed_requests, 0) + new.failed_requests,
+                "cache_hits": func.coalesce(existing.cache_hits, 0) + new.cache_hits,
+                # Request-weighted average of the stored and the new average
+                "avg_processing_time_ms": func.coalesce(
+                    (
+                        func.coalesce(existing.avg_processing_time_ms, 0) * func.coalesce(existing.total_requests, 0)
+                        + new.avg_processing_time_ms * new.total_requests
+                    ) / func.nullif(total_requests, 0),
+                    existing.avg_processing_time_ms
+                ),
+                "max_processing_time_ms": _greater(
+                    func.coalesce(existing.max_processing_time_ms, 0), new.max_processing_time_ms
+                ),
+                "total_tokens_processed": func.coalesce(existing.total_tokens_processed, 0) + new.total_tokens_processed,
+                "huggingface_api_cost": func.coalesce(existing.huggingface_api_cost, 0) + new.huggingface_api_cost,
+                # Sample-weighted CPU average; peaks for the rest
+                "infra_samples": total_samples,
+                "cpu_usage_percent": func.coalesce(
+                    (
+                        func.coalesce(existing.cpu_usage_percent, 0) * func.coalesce(existing.infra_samples, 0)
+                        + new.cpu_usage_percent * new.infra_samples
+                    ) / func.nullif(total_samples, 0),
+                    existing.cpu_usage_percent
+                ),
+                "memory_usage_mb": _greater(func.coalesce(existing.memory_usage_mb, 0), new.memory_usage_mb),
+                "peak_concurrent_requests": _greater(
+                    func.coalesce(existing.peak_concurrent_requests, 0), new.peak_concurrent_requests
+                ),
+                "queue_depth": _greater(func.coalesce(existing.queue_depth, 0), new.queue_depth),
+            }
+        )
+        db.execute(statement)
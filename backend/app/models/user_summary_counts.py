@@ -0,0 +1,179 @@
+from typing import Dict, List, Optional
+
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, event, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class UserSummaryCounts(Base):
+    """
+    Per-user summary counts by status, maintained incrementally.
+
+    Status changes go through set_status / summary_added / summary_deleted,
+    which collect deltas on the session; the deltas are applied in one
+    upsert right before the session commits, in the same transaction as the
+    summary rows, so the counter rows are locked only for the commit.
+    reconcile() recounts from the summaries table to correct any drift
+    (e.g. a task updating a summary deleted meanwhile).
+    """
+    __tablename__ = "user_summary_counts"
+
+    STATUSES = ("pending", "processing", "completed", "failed")
+    _DELTAS_KEY = "user_summary_count_deltas"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total = Column(Integer, default=0, nullable=False)
+    pending = Column(Integer, default=0, nullable=False)
+    processing = Column(Integer, default=0, nullable=False)
+    completed = Column(Integer, default=0, nullable=False)
+    failed = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    @classmethod
+    def set_status(cls, db: Session, summary, status: str) -> None:
+        """Set a summary's status and count the change for its user."""
+        previous = summary.status
+        summary.status = status
+        if previous != status:
+            cls._add_deltas(db, summary.user_id, previous, status)
+
+    @classmethod
+    def summary_added(cls, db: Session, summary) -> None:
+        """Count a new summary (in its initial status) for its user."""
+        cls._add_deltas(db, summary.user_id, None, summary.status)
+
+    @classmethod
+    def summaries_added(cls, db: Session, user_id: int, status: str, count: int) -> None:
+        """Count count new summaries of a user in one status (bulk inserts)."""
+        cls._add_deltas(db, user_id, None, status, count)
+
+    @classmethod
+    def summaries_status_changed(cls, db: Session, user_id: int, previous: str, status: str, count: int) -> None:
+        """Count count summaries of a user moving from one status to another (bulk updates)."""
+        cls._add_deltas(db, user_id, previous, status, count)
+
+    @classmethod
+    def summary_deleted(cls, db: Session, summary) -> None:
+        """Uncount a deleted summary for its user."""
+        cls._add_deltas(db, summary.user_id, summary.status, None)
+
+    @classmethod
+    def _add_deltas(cls, db: Session, user_id: int, previous: Optional[str], status: Optional[str],
+                    count: int = 1) -> None:
+        deltas = db.info.setdefault(cls._DELTAS_KEY, {}).setdefault(user_id, {})
+        if previous is None:
+            deltas["total"] = deltas.get("total", 0) + count
+        if status is None:
+            deltas["total"] = deltas.get("total", 0) - count
+        if previous in cls.STATUSES:
+            deltas[previous] = deltas.get(previous, 0) - count
+        if status in cls.STATUSES:
+            deltas[status] = deltas.get(status, 0) + count
+
+    @classmethod
+    def apply_pending_deltas(cls, db: Session) -> None:
+        """Upsert the deltas collected on a session (called before commit)."""
+        pending = db.info.pop(cls._DELTAS_KEY, None)
+        if not pending:
+            return
+
+        # One row per user, in user order so concurrent commits lock alike
+        rows = []
+        for user_id in sorted(user_id for user_id in pending if user_id is not None):
+            deltas = pending[user_id]
+            if not any(deltas.values()):
+                continue
+            rows.append({
+                "user_id": user_id,
+                **{column: deltas.get(column, 0) for column in ("total",) + cls.STATUSES},
+            })
+        if not rows:
+            return
+
+        table = cls.__table__
+        statement = insert(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={
+                **{
+                    column: table.c[column] + statement.excluded[column]
+                    for column in ("total",) + cls.STATUSES
+                },
+                "updated_at": func.now(),
+            }
+        )
+        db.execute(statement)
+
+    @classmethod
+    def get(cls, db: Session, user_id: int) -> Dict[str, int]:
+        """Counts of a user's summaries: total and per status."""
+        row = db.get(cls, user_id)
+        if row is None:
+            return {"total": 0, **{status: 0 for status in cls.STATUSES}}
+        return {"total": row.total, **{status: getattr(row, status) for status in cls.STATUSES}}
+
+    @classmethod
+    def reconcile(cls, db: Session, batch_size: int = 500) -> int:
+        """
+        Recount every user's summaries and correct drifted counters.
+
+        Works in batches of users: each batch locks the users' counter rows
+        first, so transitions committing meanwhile are either counted by
+        the recount or applied on top of the corrected value.
+
+        Returns:
+            Number of users whose counters were corrected
+        """
+        from app.models.summary import Summary
+
+        corrected = 0
+        after_user_id = 0
+        while True:
+            user_ids: List[int] = db.execute(
+                select(Summary.user_id).where(Summary.user_id > after_user_id)
+                .union(select(cls.user_id).where(cls.user_id > after_user_id))
+                .order_by("user_id").limit(batch_size)
+            ).scalars().all()
+            if not user_ids:
+                return corrected
+            after_user_id = user_ids[-1]
+
+            stored = {
+                row.user_id: row
+                for row in db.query(cls).filter(cls.user_id.in_(user_ids))
+                .order_by(cls.user_id).with_for_update().populate_existing()
+            }
+            actual = {user_id: dict.fromkeys(("total",) + cls.STATUSES, 0) for user_id in user_ids}
+            for user_id, status, count in db.query(
+                Summary.user_id, Summary.status, func.count(Summary.id)
+            ).filter(Summary.user_id.in_(user_ids)).group_by(Summary.user_id, Summary.status):
+                actual[user_id]["total"] += count
+                if status in cls.STATUSES:
+                    actual[user_id][status] = count
+
+            for user_id, counts in actual.items():
+                row = stored.get(user_id)
+                if row is None:
+                    if counts["total"]:
+                        # A transition may create the row meanwhile; the next run checks it
+                        db.execute(
+                            insert(cls.__table__).values(user_id=user_id, **counts)
+                            .on_conflict_do_nothing(index_elements=[cls.__table__.c.user_id])
+                        )
+                        corrected += 1
+                elif any(getattr(row, column) != value for column, value in counts.items()):
+                    for column, value in counts.items():
+                        setattr(row, column, value)
+                    corrected += 1
+            db.commit()
+
+
+@event.listens_for(Session, "before_commit")
+def _apply_user_summary_count_deltas(session: Session) -> None:
+    UserSummaryCounts.apply_pending_deltas(session)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_user_summary_count_deltas(session: Session, previous_transaction) -> None:
+    session.info.pop(UserSummaryCounts._DELTAS_KEY, None)
@@ -16,6 +16,31 @@ class SummaryCreate(SummaryBase):
     max_length: Optional[int] = Field(150, ge=50, le=500)
     min_length: Optional[int] = Field(None, ge=20, le=200)
 
+class SummaryBatchCreate(BaseModel):
+    """
+    Schema for submitting several summaries at once.
+    """
+    items: list[SummaryCreate] = Field(..., min_length=1)
+
+class SummaryBatch(BaseModel):
+    """
+    Schema for a submitted batch: the summary IDs, in item order.
+    """
+    batch_id: str
+    summary_ids: list[int]
+
+class SummaryBatchProgress(BaseModel):
+    """
+    Schema for the progress of a batch: its summaries by status.
+    """
+    batch_id: str
+    total: int
+    pending: int = 0
+    processing: int = 0
+    completed: int = 0
+    failed: int = 0
+    done: bool
+
 class SummaryUpdate(BaseModel):
     """
     Schema for updating a summary. Admin only.
@@ -23,6 +48,17 @@ class SummaryUpdate(BaseModel):
     status: Optional[str] = None
     summary_text: Optional[str] = None
 
+class SummaryLatency(BaseModel):
+    """
+    Schema for the time a summary spent in each processing stage.
+    """
+    queued_ms: Optional[int] = None
+    db_ms: Optional[int] = None
+    inference_ms: Optional[int] = None
+    storage_ms: Optional[int] = None
+    stats_ms: Optional[int] = None
+    total_ms: int = 0
+
 class SummaryInDBBase(SummaryBase):
     """
     Base schema for summary from database.
@@ -47,7 +83,37 @@ class Summary(SummaryInDBBase):
     """
     summary_text: Optional[str] = None
     error_message: Optional[str] = None
+    trace_id: Optional[str] = None
+    batch_id: Optional[str] = None
+    latency: Optional[SummaryLatency] = None
     
+class SummaryListItem(BaseModel):
+    """
+    Schema for a summary in listings: metadata and text previews only.
+    """
+    id: int
+    user_id: int
+    status: str
+    model_used: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+    processing_time_ms: Optional[int] = None
+    original_tokens: Optional[int] = None
+    summary_tokens: Optional[int] = None
+    error_message: Optional[str] = None
+    original_preview: Optional[str] = None
+    summary_preview: Optional[str] = None
+
+class SummaryPage(BaseModel):
+    """
+    Schema for one page of a summary listing.
+    
+    next_cursor is passed as cursor to get the following page; it is
+    null on the last page.
+    """
+    items: list[SummaryListItem]
+    next_cursor: Optional[str] = None
+
 class SummaryList(BaseModel):
     """
     Schema for list of summaries response with pagination.
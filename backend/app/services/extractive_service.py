@@ -0,0 +1,223 @@
+import re
+import time
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from app.services.text_chunking import split_sentences
+from app.services.token_counter import TokenCounter
+
+_WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9']*")
+
+# Small English stopword list; enough to keep function words from
+# dominating sentence similarity
+_STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been
+before being below between both but by can could did do does doing down during
+each few for from further had has have having he her here hers herself him
+himself his how i if in into is it its itself just me more most my myself no
+nor not now of off on once only or other our ours ourselves out over own same
+she should so some such than that the their theirs them themselves then there
+these they this those through to too under until up very was we were what when
+where which while who whom why will with would you your yours yourself
+yourselves also said says may might must shall
+""".split())
+
+
+class _SparseFeatures(NamedTuple):
+    """Sentence-by-term matrix in coordinate form, one entry per nonzero."""
+
+    rows: np.ndarray
+    cols: np.ndarray
+    values: np.ndarray
+    shape: Tuple[int, int]
+
+    def dot(self, vector: np.ndarray) -> np.ndarray:
+        """X @ vector"""
+        return np.bincount(self.rows, weights=self.values * vector[self.cols], minlength=self.shape[0])
+
+    def transpose_dot(self, vector: np.ndarray) -> np.ndarray:
+        """X.T @ vector"""
+        return np.bincount(self.cols, weights=self.values * vector[self.rows], minlength=self.shape[1])
+
+
+class ExtractiveSummarizer:
+    """
+    Local extractive summarization engine (TextRank over TF-IDF vectors).
+
+    Runs in-process with NumPy and no network access. Sentences are ranked
+    by their centrality in the sentence similarity graph and the top ones
+    are returned in document order, within max_length tokens.
+    """
+
+    MODEL_NAME = "TextRank (local)"
+
+    DAMPING = 0.85
+    MAX_ITERATIONS = 100
+    TOLERANCE = 1e-6
+    MAX_FEATURES = 4096  # Vocabulary cap, by document frequency
+
+    @classmethod
+    def summarize(cls,
+                  text: str,
+                  max_length: int = 150,
+                  min_length: Optional[int] = None,
+                  token_model: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Summarize text by selecting its most central sentences.
+
+        Args:
+            text: The text to summarize
+            max_length: Maximum length of the summary in tokens
+            min_length: Minimum length of the summary in tokens
+            token_model: Model whose tokens the lengths and stats count
+                (see TokenCounter); the generic approximator by default
+
+        Returns:
+            Dict in the same format as HuggingFaceService.get_summary
+        """
+        start_time = time.time()
+        sentences = split_sentences(text)
+        if not sentences:
+            return {"success": False, "error": "No sentences found in text"}
+
+        scores = cls.rank_sentences(sentences)
+        lengths = TokenCounter.count_batch(sentences, token_model, add_special_tokens=False)
+        summary_text = cls._select(sentences, lengths, scores, max_length, min_length)
+
+        return {
+            "success": True,
+            "summary": summary_text,
+            "model": cls.MODEL_NAME,
+            "stats": {
+                "input_tokens": TokenCounter.count(text, token_model),
+                "output_tokens": TokenCounter.count(summary_text, token_model),
+                "processing_time_ms": int((time.time() - start_time) * 1000)
+            }
+        }
+
+    @classmethod
+    def rank_sentences(cls, sentences: List[str]) -> np.ndarray:
+        """
+        Score sentences by TextRank centrality.
+
+        Args:
+            sentences: The sentences to rank
+
+        Returns:
+            Array of scores, one per sentence (sums to 1)
+        """
+        n = len(sentences)
+        if n == 1:
+            return np.ones(1)
+
+        features = cls._tfidf(sentences)
+
+        # Cosine similarity graph without self-loops, applied matrix-free:
+        # S @ w = X @ (X.T @ w) - self_similarity * w
+        self_similarity = (np.bincount(features.rows, minlength=n) > 0).astype(np.float64)
+
+        def similarity_dot(weights: np.ndarray) -> np.ndarray:
+            return features.dot(features.transpose_dot(weights)) - self_similarity * weights
+
+        degree = similarity_dot(np.ones(n))
+        dangling = degree <= 1e-12
+        safe_degree = np.where(dangling, 1.0, degree)
+
+        scores = np.full(n, 1.0 / n)
+        for _ in range(cls.MAX_ITERATIONS):
+            weights = np.where(dangling, 0.0, scores / safe_degree)
+            new_scores = (
+                (1.0 - cls.DAMPING) / n
+                + cls.DAMPING * similarity_dot(weights)
+                + cls.DAMPING * scores[dangling].sum() / n
+            )
+            if np.abs(new_scores - scores).sum() < cls.TOLERANCE:
+                scores = new_scores
+                break
+            scores = new_scores
+
+        return scores / scores.sum()
+
+    @classmethod
+    def _tfidf(cls, sentences: List[str]) -> _SparseFeatures:
+        """
+        Build L2-normalized TF-IDF sentence vectors.
+
+        Sparse: memory grows with the number of words, not with sentences
+        times vocabulary.
+        """
+        tokenized = [
+            [word for word in _WORD_PATTERN.findall(sentence.lower()) if word not in _STOPWORDS]
+            for sentence in sentences
+        ]
+
+        # Document frequency, then cap the vocabulary to the most common terms
+        document_frequency: Dict[str, int] = {}
+        for words in tokenized:
+            for word in set(words):
+                document_frequency[word] = document_frequency.get(word, 0) + 1
+        vocabulary_terms = sorted(document_frequency, key=document_frequency.get, reverse=True)
+        vocabulary = {term: i for i, term in enumerate(vocabulary_terms[:cls.MAX_FEATURES])}
+
+        n = len(sentences)
+        n_terms = max(len(vocabulary), 1)
+        rows = []
+        cols = []
+        for row, words in enumerate(tokenized):
+            for word in words:
+                col = vocabulary.get(word)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+
+        # Term frequencies: count the occurrences of each (sentence, term)
+        keys, term_frequency = np.unique(
+            np.array(rows, dtype=np.int64) * n_terms + np.array(cols, dtype=np.int64),
+            return_counts=True
+        )
+        rows = keys // n_terms
+        cols = keys % n_terms
+
+        df = np.array(
+            [document_frequency[term] for term in vocabulary_terms[:cls.MAX_FEATURES]] or [0],
+            dtype=np.float64
+        )
+        idf = np.log((1.0 + n) / (1.0 + df)) + 1.0
+
+        values = term_frequency * idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=values ** 2, minlength=n))
+        return _SparseFeatures(rows, cols, values / norms[rows], (n, n_terms))
+
+    @staticmethod
+    def _select(sentences: List[str],
+                lengths: List[int],
+                scores: np.ndarray,
+                max_length: int,
+                min_length: Optional[int]) -> str:
+        """Pick top-ranked sentences within max_length tokens, in document order."""
+        selected = []
+        total = 0
+
+        for index in np.argsort(-scores, kind="stable"):
+            if total + lengths[index] <= max_length:
+                selected.append(index)
+                total += lengths[index]
+            if total >= max_length:
+                break
+
+        if not selected:
+            # Even the best sentence is too long: truncate it
+            best = sentences[int(np.argmax(scores))].split()
+            return " ".join(best[:max_length])
+
+        # Pad up to min_length with the next-best sentences if needed
+        if min_length and total < min_length:
+            for index in np.argsort(-scores, kind="stable"):
+                if index not in selected:
+                    selected.append(index)
+                    total += lengths[index]
+                    if total >= min_length:
+                        break
+
+        return " ".join(sentences[i] for i in sorted(selected))
@@ -0,0 +1,189 @@
+import os
+import threading
+from typing import Dict, Any, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.core.config import settings
+
+
+class InferenceHTTPClient:
+    """
+    Process-wide pooled HTTP client for inference API calls.
+
+    A single keep-alive `requests.Session` is shared by every caller in the
+    process, so repeated calls to the same model host reuse established
+    TCP+TLS connections instead of paying the handshake on every attempt.
+    The session is recreated after a fork (e.g. in Celery prefork children).
+    """
+
+    _session: Optional[requests.Session] = None
+    _adapter: Optional[HTTPAdapter] = None
+    _pid: Optional[int] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def init(cls,
+             pool_connections: int = None,
+             pool_maxsize: int = None) -> requests.Session:
+        """
+        Create (or recreate) the pooled session for the current process.
+
+        Args:
+            pool_connections: Number of per-host pools to keep
+            pool_maxsize: Maximum keep-alive connections per host
+
+        Returns:
+            The shared session
+        """
+        with cls._lock:
+            if cls._session is not None:
+                cls._session.close()
+
+            adapter = HTTPAdapter(
+                pool_connections=pool_connections or settings.HTTP_POOL_CONNECTIONS,
+                pool_maxsize=pool_maxsize or settings.HTTP_POOL_MAXSIZE,
+                pool_block=False,
+                max_retries=0,  # Retries are handled by the callers
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+
+            cls._session = session
+            cls._adapter = adapter
+            cls._pid = os.getpid()
+            return session
+
+    @classmethod
+    def get_session(cls) -> requests.Session:
+        """Get the shared session, creating it lazily if needed."""
+        if cls._session is None or cls._pid != os.getpid():
+            return cls.init()
+        return cls._session
+
+    @classmethod
+    def close(cls) -> None:
+        """Close the shared session and its pooled connections."""
+        with cls._lock:
+            if cls._session is not None:
+                cls._session.close()
+            cls._session = None
+            cls._adapter = None
+            cls._pid = None
+
+    @classmethod
+    def post(cls, url: str, **kwargs) -> requests.Response:
+        """
+        POST through the pooled session with separate connect/read timeouts.
+
+        Args:
+            url: The URL to post to
+            **kwargs: Passed through to `requests.Session.post`
+
+        Returns:
+            The HTTP response
+        """
+        kwargs.setdefault("timeout", (settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT))
+        return cls.get_session().post(url, **kwargs)
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        """
+        Get connection-reuse counters per host.
+
+        `connections_opened` counts new TCP connections; every request beyond
+        that was served on a reused keep-alive connection.
+        """
+        hosts = {}
+        adapter = cls._adapter
+        if adapter is not None and cls._pid == os.getpid():
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                host = f"{pool.scheme}://{pool.host}:{pool.port}"
+                hosts[host] = {
+                    "requests": pool.num_requests,
+                    "connections_opened": pool.num_connections,
+                    "connections_reused": max(pool.num_requests - pool.num_connections, 0),
+                }
+
+        total_requests = sum(h["requests"] for h in hosts.values())
+        total_reused = sum(h["connections_reused"] for h in hosts.values())
+        return {
+            "pid": os.getpid(),
+            "initialized": adapter is not None,
+            "total_requests": total_requests,
+            "total_reused": total_reused,
+            "reuse_ratio": round(total_reused / total_requests, 3) if total_requests else 0.0,
+            "hosts": hosts,
+        }
+
+
+class AsyncInferenceHTTPClient:
+    """
+    Process-wide pooled asyncio HTTP client for inference API calls.
+
+    Used by the async summary pipeline in the API process. Requests waiting
+    on the inference API only hold a connection, not a thread, so a single
+    process can keep hundreds of summarizations in flight.
+    """
+
+    _client: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def init(cls,
+             max_connections: int = None,
+             max_keepalive_connections: int = None) -> httpx.AsyncClient:
+        """
+        Create the shared async client for the current process.
+
+        Args:
+            max_connections: Maximum concurrent connections across hosts
+            max_keepalive_connections: Maximum idle keep-alive connections
+
+        Returns:
+            The shared client
+        """
+        if cls._client is None:
+            cls._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections or settings.ASYNC_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=max_keepalive_connections or settings.HTTP_POOL_MAXSIZE,
+                ),
+                timeout=httpx.Timeout(
+                    settings.HTTP_READ_TIMEOUT,
+                    connect=settings.HTTP_CONNECT_TIMEOUT,
+                ),
+            )
+        return cls._client
+
+    @classmethod
+    def get_client(cls) -> httpx.AsyncClient:
+        """Get the shared client, creating it lazily if needed."""
+        return cls._client or cls.init()
+
+    @classmethod
+    async def close(cls) -> None:
+        """Close the shared client and its pooled connections."""
+        if cls._client is not None:
+            await cls._client.aclose()
+        cls._client = None
+
+    @classmethod
+    async def post(cls, url: str, **kwargs) -> httpx.Response:
+        """
+        POST through the shared async client.
+
+        Args:
+            url: The URL to post to
+            **kwargs: Passed through to `httpx.AsyncClient.post`
+
+        Returns:
+            The HTTP response
+        """
+        return await cls.get_client().post(url, **kwargs)
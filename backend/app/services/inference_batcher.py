@@ -0,0 +1,124 @@
+from typing import List, Optional, Tuple
+
+import redis
+
+from app.core.config import settings
+
+# Queue an id; flush now if it fills a batch, otherwise start the window
+# timer unless one is already running. Returns the flush delay in ms, or -1
+# if a flush is already scheduled.
+_ENQUEUE_SCRIPT = """
+local size = redis.call('RPUSH', KEYS[1], ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+if size % tonumber(ARGV[2]) == 0 then
+    redis.call('SET', KEYS[2], 1, 'PX', ARGV[4])
+    return 0
+end
+if redis.call('SET', KEYS[2], 1, 'NX', 'PX', ARGV[4]) then
+    return tonumber(ARGV[3])
+end
+return -1
+"""
+
+# Take up to N ids. The flush flag is cleared so the next id starts a new
+# window; if ids are left over, the caller flushes again right away.
+_POP_SCRIPT = """
+local ids = redis.call('LRANGE', KEYS[1], 0, tonumber(ARGV[1]) - 1)
+redis.call('LTRIM', KEYS[1], #ids, -1)
+local remaining = redis.call('LLEN', KEYS[1])
+if remaining > 0 then
+    redis.call('SET', KEYS[2], 1, 'PX', ARGV[2])
+else
+    redis.call('DEL', KEYS[2])
+end
+return {ids, remaining}
+"""
+
+
+class InferenceBatcher:
+    """
+    Groups pending summaries into batched inference requests.
+
+    Summaries for the same model and length parameters are queued in a
+    Redis list. A batch is flushed when it reaches INFERENCE_BATCH_SIZE
+    items or INFERENCE_BATCH_WINDOW_MS after its first item, whichever
+    comes first; the caller schedules the flush task with the returned
+    delay. A flag key with a TTL guarantees that a lost flush is retried
+    by the next enqueue.
+    """
+
+    KEY_PREFIX = "inference_batch:"
+
+    _redis_client: Optional[redis.Redis] = None
+
+    @classmethod
+    def _get_redis(cls) -> Optional[redis.Redis]:
+        if not settings.REDIS_URL:
+            return None
+        if cls._redis_client is None:
+            cls._redis_client = redis.Redis.from_url(settings.REDIS_URL)
+        return cls._redis_client
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return settings.INFERENCE_BATCH_SIZE > 1
+
+    @classmethod
+    def batch_key(cls, model_id: str, max_length: Optional[int], min_length: Optional[int]) -> str:
+        """Queue key; only summaries with identical parameters share a request."""
+        return f"{cls.KEY_PREFIX}{model_id}:{max_length or 0}:{min_length or 0}"
+
+    @staticmethod
+    def _flag_ttl_ms() -> int:
+        # Long enough for the flush task to be picked up after the window
+        return settings.INFERENCE_BATCH_WINDOW_MS + settings.INFERENCE_BATCH_FLUSH_GRACE_MS
+
+    @classmethod
+    def enqueue(cls, batch_key: str, summary_id: int) -> Optional[int]:
+        """
+        Queue a summary for batched inference.
+
+        Args:
+            batch_key: Key from batch_key()
+            summary_id: The summary to queue
+
+        Returns:
+            Milliseconds after which the caller must run the flush, -1 if a
+            flush is already scheduled, or None if the summary could not be
+            queued (process it on its own)
+        """
+        client = cls._get_redis()
+        if client is None:
+            return None
+
+        try:
+            return int(client.eval(
+                _ENQUEUE_SCRIPT, 2, batch_key, batch_key + ":flush",
+                summary_id,
+                settings.INFERENCE_BATCH_SIZE,
+                settings.INFERENCE_BATCH_WINDOW_MS,
+                cls._flag_ttl_ms(),
+                3600,
+            ))
+        except redis.RedisError as e:
+            print(f"Warning: Could not queue summary {summary_id} for batching: {e}")
+            return None
+
+    @classmethod
+    def pop_batch(cls, batch_key: str) -> Tuple[List[int], int]:
+        """
+        Take the next batch off a queue.
+
+        Returns:
+            Tuple of (summary ids, number of ids still queued)
+        """
+        client = cls._get_redis()
+        if client is None:
+            return [], 0
+
+        ids, remaining = client.eval(
+            _POP_SCRIPT, 2, batch_key, batch_key + ":flush",
+            settings.INFERENCE_BATCH_SIZE,
+            cls._flag_ttl_ms(),
+        )
+        return [int(summary_id) for summary_id in ids], int(remaining)
@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
+
+import psutil
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.models.usage_statistics import UsageStatistics
+from app.services.task_router import TaskRouter
+from app.services.usage_stats_buffer import UsageStatsBuffer
+
+
+class InfraSampler:
+    """
+    Samples infrastructure metrics in the background of each process.
+
+    Every INFRA_SAMPLE_INTERVAL_SECONDS a daemon thread reads this
+    process's CPU percent and RSS, the peak number of in-flight requests
+    (API) or tasks (worker) since the last sample, and the Celery queue
+    depth, and adds them to the hour's usage statistics through
+    UsageStatsBuffer. The hourly record keeps the mean CPU percent per
+    process and the maxima of the others.
+
+    Overhead is measured from the sampler thread's own CPU time and
+    reported by get_stats.
+    """
+
+    _thread: Optional[threading.Thread] = None
+    _stop = threading.Event()
+    _pid: Optional[int] = None
+    _process: Optional[psutil.Process] = None
+
+    _lock = threading.Lock()
+    _in_flight = 0
+    _peak_in_flight = 0
+
+    _started_at = 0.0
+    _sampler_cpu_seconds = 0.0
+    _samples = 0
+    _last_sample: Dict[str, Any] = {}
+
+    @classmethod
+    def request_started(cls) -> None:
+        with cls._lock:
+            cls._in_flight += 1
+            if cls._in_flight > cls._peak_in_flight:
+                cls._peak_in_flight = cls._in_flight
+
+    @classmethod
+    def request_finished(cls) -> None:
+        with cls._lock:
+            cls._in_flight -= 1
+
+    @classmethod
+    def start(cls) -> None:
+        """Start the sampler thread of this process (no-op if running)."""
+        if not settings.INFRA_SAMPLER_ENABLED:
+            return
+        # Threads do not survive fork: a forked worker starts its own
+        if cls._thread is not None and cls._thread.is_alive() and cls._pid == os.getpid():
+            return
+
+        cls._pid = os.getpid()
+        cls._process = psutil.Process(cls._pid)
+        cls._process.cpu_percent(None)  # First call only sets the baseline
+        cls._started_at = time.time()
+        cls._sampler_cpu_seconds = 0.0
+        cls._samples = 0
+        cls._stop = threading.Event()
+        cls._thread = threading.Thread(target=cls._run, name="infra-sampler", daemon=True)
+        cls._thread.start()
+
+    @classmethod
+    def stop(cls) -> None:
+        if cls._thread is not None:
+            cls._stop.set()
+            cls._thread.join(timeout=1)
+            cls._thread = None
+
+    @classmethod
+    def _run(cls) -> None:
+        while not cls._stop.wait(settings.INFRA_SAMPLE_INTERVAL_SECONDS):
+            thread_start = time.thread_time()
+            try:
+                cls.sample()
+            except Exception as e:
+                print(f"Warning: Infrastructure sample failed: {e}")
+            cls._sampler_cpu_seconds += time.thread_time() - thread_start
+
+    @classmethod
+    def sample(cls) -> Dict[str, Any]:
+        """Take one sample and add it to the hour's statistics."""
+        with cls._lock:
+            peak = cls._peak_in_flight
+            cls._peak_in_flight = cls._in_flight
+
+        queue_depth = sum(lane["depth"] for lane in TaskRouter.get_queue_depths().values())
+        sample = {
+            "cpu_percent": cls._process.cpu_percent(None),
+            "memory_mb": cls._process.memory_info().rss / (1024 * 1024),
+            "peak_concurrent": peak,
+            "queue_depth": queue_depth,
+        }
+        if not UsageStatsBuffer.record_infra_sample(sample):
+            cls._write_directly(sample)
+        cls._samples += 1
+        cls._last_sample = sample
+        return sample
+
+    @staticmethod
+    def _write_directly(sample: Dict[str, Any]) -> None:
+        db = SessionLocal()
+        try:
+            bucket_start = UsageStatsBuffer.bucket_start(UsageStatsBuffer.current_bucket())
+            UsageStatistics.upsert_hourly(db, bucket_start, UsageStatsBuffer.infra_counters(sample))
+            db.commit()
+        finally:
+            db.close()
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        """Latest sample, current in-flight count and the sampler's own overhead."""
+        elapsed = time.time() - cls._started_at if cls._started_at else 0
+        return {
+            "enabled": cls._thread is not None,
+            "in_flight": cls._in_flight,
+            "samples": cls._samples,
+            "last_sample": cls._last_sample,
+            # Sampler CPU time as a share of one core over the process lifetime
+            "overhead_percent": round(100 * cls._sampler_cpu_seconds / elapsed, 4) if elapsed else 0.0,
+        }
+
+
+class InFlightRequestsMiddleware:
+    """
+    ASGI middleware counting in-flight HTTP requests for InfraSampler.
+
+    Plain ASGI rather than BaseHTTPMiddleware, so it adds two counter
+    updates per request and nothing else.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        InfraSampler.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            InfraSampler.request_finished()
@@ -0,0 +1,161 @@
+import time
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import redis
+
+from app.core.config import settings
+
+
+class ModelWarmer:
+    """
+    Keeps remote inference models warm and measures cold starts.
+
+    Hosted models are unloaded after an idle period, and the next call
+    gets 503 "loading" responses until the model is back. HuggingFaceService
+    reports every successful call here, and its `warm_idle_models` (run
+    periodically by Celery beat) sends a tiny inference to each model that
+    has been idle close to MODEL_IDLE_TIMEOUT_SECONDS.
+
+    Per model, Redis keeps the last successful call, cold-start counters
+    and a capped sample of recent call latencies flagged as cold or warm,
+    so p99 with and without cold starts can be compared.
+    """
+
+    KEY_PREFIX = "model_warmth:"
+    LATENCY_KEY_PREFIX = "model_latency:"
+    LOCK_KEY_PREFIX = "model_warmer:lock:"
+
+    _redis_client: Optional[redis.Redis] = None
+
+    @classmethod
+    def _get_redis(cls) -> Optional[redis.Redis]:
+        if not settings.REDIS_URL:
+            return None
+        if cls._redis_client is None:
+            cls._redis_client = redis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_timeout=0.5,
+                socket_connect_timeout=0.5,
+            )
+        return cls._redis_client
+
+    @classmethod
+    def record_success(cls, model_id: str, latency_ms: int, cold_start_ms: int = 0, warmup: bool = False) -> None:
+        """
+        Record a successful inference call.
+
+        Args:
+            model_id: The model that answered
+            latency_ms: End-to-end time of the call, including loading waits
+            cold_start_ms: Time spent waiting for the model to load (0 if warm)
+            warmup: Whether this was a keep-alive call from the warmer
+        """
+        client = cls._get_redis()
+        if client is None:
+            return
+
+        now = time.time()
+        key = cls.KEY_PREFIX + model_id
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.hset(key, "last_success_at", now)
+            pipe.hincrby(key, "warmups" if warmup else "calls", 1)
+            if cold_start_ms:
+                pipe.hincrby(key, "cold_starts", 1)
+                pipe.hincrby(key, "cold_start_ms_total", int(cold_start_ms))
+                pipe.hset(key, "last_cold_start_at", now)
+            if not warmup:
+                # Latency sample: "<ms>:<1 if cold else 0>"
+                latency_key = cls.LATENCY_KEY_PREFIX + model_id
+                pipe.lpush(latency_key, f"{int(latency_ms)}:{1 if cold_start_ms else 0}")
+                pipe.ltrim(latency_key, 0, settings.MODEL_LATENCY_SAMPLE_SIZE - 1)
+            pipe.execute()
+        except redis.RedisError as e:
+            print(f"Warning: Could not record model warmth for {model_id}: {e}")
+
+    @classmethod
+    def get_idle_models(cls, model_ids: List[str]) -> List[str]:
+        """Models whose last successful call is old enough to need warming."""
+        client = cls._get_redis()
+        if client is None:
+            return []
+
+        threshold = settings.MODEL_IDLE_TIMEOUT_SECONDS - settings.MODEL_WARM_MARGIN_SECONDS
+        now = time.time()
+        try:
+            pipe = client.pipeline(transaction=False)
+            for model_id in model_ids:
+                pipe.hget(cls.KEY_PREFIX + model_id, "last_success_at")
+            last_success = pipe.execute()
+        except redis.RedisError as e:
+            print(f"Warning: Could not read model warmth: {e}")
+            return []
+
+        return [
+            model_id for model_id, last in zip(model_ids, last_success)
+            if last is None or now - float(last) >= threshold
+        ]
+
+    @classmethod
+    def try_lock(cls, model_id: str) -> bool:
+        """
+        Claim the right to warm a model for one warm interval.
+
+        Keeps concurrent beat/worker instances from warming the same model twice.
+        """
+        client = cls._get_redis()
+        if client is None:
+            return False
+        try:
+            return bool(client.set(cls.LOCK_KEY_PREFIX + model_id, 1, nx=True, ex=settings.MODEL_WARM_INTERVAL_SECONDS))
+        except redis.RedisError:
+            return False
+
+    @classmethod
+    def get_stats(cls, model_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Warmth and cold-start statistics per model.
+
+        p99_warm_ms is the p99 latency of calls that did not hit a cold
+        start, i.e. what p99 would be if warming avoided them all.
+        """
+        client = cls._get_redis()
+        if client is None:
+            return {}
+
+        try:
+            pipe = client.pipeline(transaction=False)
+            for model_id in model_ids:
+                pipe.hgetall(cls.KEY_PREFIX + model_id)
+                pipe.lrange(cls.LATENCY_KEY_PREFIX + model_id, 0, -1)
+            replies = pipe.execute()
+        except redis.RedisError:
+            return {}
+
+        now = time.time()
+        stats = {}
+        for index, model_id in enumerate(model_ids):
+            raw, samples = replies[2 * index], replies[2 * index + 1]
+            values = {key.decode("utf-8"): float(value) for key, value in raw.items()}
+            cold_starts = int(values.get("cold_starts", 0))
+
+            model_stats = {
+                "idle_seconds": int(now - values["last_success_at"]) if "last_success_at" in values else None,
+                "calls": int(values.get("calls", 0)),
+                "warmups": int(values.get("warmups", 0)),
+                "cold_starts": cold_starts,
+                "avg_cold_start_ms": int(values.get("cold_start_ms_total", 0) / cold_starts) if cold_starts else 0,
+            }
+
+            if samples:
+                pairs = np.array([sample.split(b":") for sample in samples], dtype=np.int64)
+                latencies, cold = pairs[:, 0], pairs[:, 1].astype(bool)
+                model_stats["sample_size"] = len(latencies)
+                model_stats["cold_start_rate"] = round(float(cold.mean()), 4)
+                model_stats["p99_ms"] = int(np.percentile(latencies, 99))
+                if (~cold).any():
+                    model_stats["p99_warm_ms"] = int(np.percentile(latencies[~cold], 99))
+
+            stats[model_id] = model_stats
+        return stats
@@ -0,0 +1,316 @@
+import random
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+import redis
+
+from app.core.config import settings
+
+
+def backoff_delay(attempt: int, base: float, cap: Optional[float] = None) -> float:
+    """
+    Exponential backoff with full jitter.
+
+    Args:
+        attempt: Zero-based retry number
+        base: Delay scale in seconds
+        cap: Maximum delay in seconds (defaults to RETRY_BACKOFF_MAX_SECONDS)
+
+    Returns:
+        Seconds to wait, uniformly drawn from [0, min(cap, base * 2**attempt)]
+    """
+    cap = settings.RETRY_BACKOFF_MAX_SECONDS if cap is None else cap
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+_redis_client: Optional[redis.Redis] = None
+
+
+def _get_redis() -> Optional[redis.Redis]:
+    global _redis_client
+    if not settings.REDIS_URL:
+        return None
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5,
+        )
+    return _redis_client
+
+
+# Allow a retry while retries stay under ratio * requests in this window
+_ACQUIRE_RETRY_SCRIPT = """
+local requests = tonumber(redis.call('HGET', KEYS[1], 'requests') or '0')
+local retries = tonumber(redis.call('HGET', KEYS[1], 'retries') or '0')
+local allowed = math.max(tonumber(ARGV[2]), math.floor(requests * tonumber(ARGV[1])))
+if retries < allowed then
+    redis.call('HINCRBY', KEYS[1], 'retries', 1)
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+class RetryBudget:
+    """
+    Global retry budget shared by all processes.
+
+    Retries are allowed only while they stay below a fraction of the
+    requests made in the current time window (with a small floor), so
+    during an upstream outage retries cannot multiply the load. State
+    lives in Redis, with an in-process fallback when Redis is unavailable.
+    """
+
+    KEY_PREFIX = "retry_budget:"
+
+    _local: Dict[int, Dict[str, int]] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def _window(cls) -> int:
+        return int(time.time() // settings.RETRY_BUDGET_WINDOW_SECONDS)
+
+    @classmethod
+    def record_request(cls) -> None:
+        """Count a first attempt against the current window."""
+        window = cls._window()
+        client = _get_redis()
+        if client is not None:
+            try:
+                key = f"{cls.KEY_PREFIX}{window}"
+                pipe = client.pipeline()
+                pipe.hincrby(key, "requests", 1)
+                pipe.expire(key, settings.RETRY_BUDGET_WINDOW_SECONDS * 2)
+                pipe.execute()
+                return
+            except redis.RedisError:
+                pass
+
+        with cls._lock:
+            counters = cls._local_window(window)
+            counters["requests"] += 1
+
+    @classmethod
+    def try_acquire_retry(cls) -> bool:
+        """
+        Take one retry from the budget.
+
+        Returns:
+            True if the retry may proceed, False if the budget is spent
+        """
+        window = cls._window()
+        client = _get_redis()
+        if client is not None:
+            try:
+                return bool(client.eval(
+                    _ACQUIRE_RETRY_SCRIPT, 1, f"{cls.KEY_PREFIX}{window}",
+                    settings.RETRY_BUDGET_RATIO,
+                    settings.RETRY_BUDGET_MIN_PER_WINDOW,
+                    settings.RETRY_BUDGET_WINDOW_SECONDS * 2,
+                ))
+            except redis.RedisError:
+                pass
+
+        with cls._lock:
+            counters = cls._local_window(window)
+            allowed = max(settings.RETRY_BUDGET_MIN_PER_WINDOW,
+                          int(counters["requests"] * settings.RETRY_BUDGET_RATIO))
+            if counters["retries"] < allowed:
+                counters["retries"] += 1
+                return True
+            return False
+
+    @classmethod
+    def _local_window(cls, window: int) -> Dict[str, int]:
+        if window not in cls._local:
+            cls._local.clear()
+            cls._local[window] = {"requests": 0, "retries": 0}
+        return cls._local[window]
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        """Requests and retries in the current window."""
+        window = cls._window()
+        counters = {"requests": 0, "retries": 0}
+        client = _get_redis()
+        try:
+            if client is None:
+                raise redis.RedisError("Redis not configured")
+            values = client.hgetall(f"{cls.KEY_PREFIX}{window}")
+            counters = {key.decode("utf-8"): int(value) for key, value in values.items()}
+        except redis.RedisError:
+            with cls._lock:
+                counters = dict(cls._local.get(window, counters))
+        return {
+            "window_seconds": settings.RETRY_BUDGET_WINDOW_SECONDS,
+            "ratio": settings.RETRY_BUDGET_RATIO,
+            "requests": counters.get("requests", 0),
+            "retries": counters.get("retries", 0),
+        }
+
+
+# Open -> half-open after the reset timeout lets a single probe through;
+# a stale probe (no outcome within the timeout) is replaced by a new one
+_ALLOW_REQUEST_SCRIPT = """
+local state = redis.call('HGET', KEYS[1], 'state') or 'closed'
+if state == 'closed' then
+    return 1
+end
+local now = tonumber(ARGV[1])
+local timeout = tonumber(ARGV[2])
+if state == 'open' then
+    local opened_at = tonumber(redis.call('HGET', KEYS[1], 'opened_at') or '0')
+    if now - opened_at >= timeout then
+        redis.call('HSET', KEYS[1], 'state', 'half_open', 'probe_started_at', ARGV[1])
+        return 1
+    end
+    return 0
+end
+local probe_started_at = tonumber(redis.call('HGET', KEYS[1], 'probe_started_at') or '0')
+if now - probe_started_at >= timeout then
+    redis.call('HSET', KEYS[1], 'probe_started_at', ARGV[1])
+    return 1
+end
+return 0
+"""
+
+# Consecutive failures open the circuit; a failed probe re-opens it
+_RECORD_FAILURE_SCRIPT = """
+local state = redis.call('HGET', KEYS[1], 'state') or 'closed'
+if state == 'open' then
+    return 'open'
+end
+local failures = redis.call('HINCRBY', KEYS[1], 'failures', 1)
+if state == 'half_open' or failures >= tonumber(ARGV[1]) then
+    redis.call('HSET', KEYS[1], 'state', 'open', 'opened_at', ARGV[2], 'failures', 0)
+    return 'open'
+end
+return 'closed'
+"""
+
+
+class CircuitBreaker:
+    """
+    Per-model circuit breaker (closed, open, half-open).
+
+    After CIRCUIT_FAILURE_THRESHOLD consecutive failed calls to a model the
+    circuit opens and requests fail fast (or go to a fallback model) for
+    CIRCUIT_RESET_TIMEOUT_SECONDS. Then a single probe request is let
+    through: success closes the circuit, failure opens it again. State is
+    shared through Redis so every worker and API process sees it.
+    """
+
+    KEY_PREFIX = "circuit:"
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    _local: Dict[str, Dict[str, Any]] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def allow_request(cls, model_id: str) -> bool:
+        """Whether a call to the model may proceed now."""
+        if not settings.CIRCUIT_BREAKER_ENABLED:
+            return True
+
+        now = time.time()
+        client = _get_redis()
+        if client is not None:
+            try:
+                return bool(client.eval(
+                    _ALLOW_REQUEST_SCRIPT, 1, cls.KEY_PREFIX + model_id,
+                    now, settings.CIRCUIT_RESET_TIMEOUT_SECONDS,
+                ))
+            except redis.RedisError:
+                pass
+
+        with cls._lock:
+            state = cls._local.setdefault(model_id, {"state": cls.CLOSED, "failures": 0})
+            if state["state"] == cls.CLOSED:
+                return True
+            started = state.get("opened_at", 0) if state["state"] == cls.OPEN else state.get("probe_started_at", 0)
+            if now - started >= settings.CIRCUIT_RESET_TIMEOUT_SECONDS:
+                state["state"] = cls.HALF_OPEN
+                state["probe_started_at"] = now
+                return True
+            return False
+
+    @classmethod
+    def record_success(cls, model_id: str) -> None:
+        """Close the circuit after a successful call."""
+        if not settings.CIRCUIT_BREAKER_ENABLED:
+            return
+
+        client = _get_redis()
+        if client is not None:
+            try:
+                client.delete(cls.KEY_PREFIX + model_id)
+                return
+            except redis.RedisError:
+                pass
+
+        with cls._lock:
+            cls._local.pop(model_id, None)
+
+    @classmethod
+    def record_failure(cls, model_id: str) -> str:
+        """
+        Count a failed call.
+
+        Returns:
+            The circuit state after the failure
+        """
+        if not settings.CIRCUIT_BREAKER_ENABLED:
+            return cls.CLOSED
+
+        now = time.time()
+        client = _get_redis()
+        if client is not None:
+            try:
+                state = client.eval(
+                    _RECORD_FAILURE_SCRIPT, 1, cls.KEY_PREFIX + model_id,
+                    settings.CIRCUIT_FAILURE_THRESHOLD, now,
+                )
+                return state.decode("utf-8") if isinstance(state, bytes) else state
+            except redis.RedisError:
+                pass
+
+        with cls._lock:
+            state = cls._local.setdefault(model_id, {"state": cls.CLOSED, "failures": 0})
+            if state["state"] == cls.OPEN:
+                return cls.OPEN
+            state["failures"] += 1
+            if state["state"] == cls.HALF_OPEN or state["failures"] >= settings.CIRCUIT_FAILURE_THRESHOLD:
+                state.update({"state": cls.OPEN, "opened_at": now, "failures": 0})
+            return state["state"]
+
+    @classmethod
+    def get_state(cls, model_id: str) -> Dict[str, Any]:
+        """Current state of a model's circuit."""
+        values: Dict[str, Any] = {}
+        client = _get_redis()
+        try:
+            if client is None:
+                raise redis.RedisError("Redis not configured")
+            raw = client.hgetall(cls.KEY_PREFIX + model_id)
+            values = {key.decode("utf-8"): value.decode("utf-8") for key, value in raw.items()}
+        except redis.RedisError:
+            with cls._lock:
+                values = dict(cls._local.get(model_id, {}))
+
+        state = values.get("state", cls.CLOSED)
+        result = {"state": state, "failures": int(values.get("failures", 0))}
+        if state == cls.OPEN:
+            remaining = settings.CIRCUIT_RESET_TIMEOUT_SECONDS - (time.time() - float(values.get("opened_at", 0)))
+            result["retry_in_seconds"] = max(int(remaining), 0)
+        return result
+
+    @classmethod
+    def get_all_states(cls, model_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Circuit state per model, e.g. for /health."""
+        return {model_id: cls.get_state(model_id) for model_id in model_ids}
@@ -0,0 +1,63 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from app.core.config import settings
+from s3_utils import make_s3_client
+
+
+class S3IO:
+    """
+    Process-wide S3 client and I/O executor.
+
+    One boto3 client (thread-safe, with a connection pool of
+    S3_MAX_POOL_CONNECTIONS and S3_MAX_ATTEMPTS retries) is shared by every
+    caller in the process, together with a thread pool of S3_IO_MAX_WORKERS
+    for S3 calls that should not block the caller: background uploads and
+    concurrent multi-gets. The pool is sized to the workers, so no call
+    waits for a connection. Both are recreated after a fork (e.g. in
+    Celery prefork children).
+    """
+
+    _client = None
+    _executor: Optional[ThreadPoolExecutor] = None
+    _pid: Optional[int] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _ensure(cls) -> None:
+        if cls._pid == os.getpid():
+            return
+        with cls._lock:
+            if cls._pid == os.getpid():
+                return
+            # Inherited from the parent: its threads and sockets are not ours
+            cls._client = make_s3_client()
+            cls._executor = ThreadPoolExecutor(
+                max_workers=settings.S3_IO_MAX_WORKERS,
+                thread_name_prefix="s3-io",
+            )
+            cls._pid = os.getpid()
+
+    @classmethod
+    def client(cls):
+        """Get the shared client, creating it lazily if needed."""
+        cls._ensure()
+        return cls._client
+
+    @classmethod
+    def submit(cls, fn: Callable, *args, **kwargs) -> Future:
+        """Run a (blocking) S3 call on the I/O executor."""
+        cls._ensure()
+        return cls._executor.submit(fn, *args, **kwargs)
+
+    @classmethod
+    def shutdown(cls, wait: bool = True) -> None:
+        """Finish (or drop) the calls still queued, e.g. uploads before a worker exits."""
+        with cls._lock:
+            if cls._executor is not None and cls._pid == os.getpid():
+                cls._executor.shutdown(wait=wait)
+            cls._client = None
+            cls._executor = None
+            cls._pid = None
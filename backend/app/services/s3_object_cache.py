@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import redis
+
+from app.core.config import settings
+
+# (checked_at, etag, body): when the entry was last fetched or revalidated
+CacheEntry = Tuple[float, str, bytes]
+
+
+class S3ObjectCache:
+    """
+    Read-through cache of S3 objects for S3Service, keyed by S3 key.
+
+    Like SummaryCache there are two tiers: a bounded in-process LRU and a
+    shared Redis tier with a TTL. Every entry keeps the object's ETag and
+    the time it was last checked against S3, so S3Service can revalidate
+    entries older than S3_CACHE_REVALIDATE_SECONDS with a conditional GET
+    (If-None-Match), which transfers nothing if the object is unchanged.
+    Objects larger than S3_CACHE_MAX_OBJECT_BYTES are not cached.
+    """
+
+    KEY_PREFIX = "s3_cache:"
+
+    _local: "OrderedDict[str, CacheEntry]" = OrderedDict()
+    _lock = threading.Lock()
+    _redis: Optional[redis.Redis] = None
+
+    @classmethod
+    def _get_redis(cls) -> Optional[redis.Redis]:
+        if not settings.S3_CACHE_REDIS_ENABLED or not settings.REDIS_URL:
+            return None
+        if cls._redis is None:
+            cls._redis = redis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_timeout=0.5,
+                socket_connect_timeout=0.5,
+            )
+        return cls._redis
+
+    @classmethod
+    def _set_local(cls, key: str, entry: CacheEntry) -> None:
+        with cls._lock:
+            cls._local[key] = entry
+            cls._local.move_to_end(key)
+            while len(cls._local) > settings.S3_CACHE_LOCAL_MAXSIZE:
+                cls._local.popitem(last=False)
+
+    @staticmethod
+    def is_fresh(entry: CacheEntry) -> bool:
+        """Whether an entry may be served without revalidating it."""
+        return entry[0] + settings.S3_CACHE_REVALIDATE_SECONDS > time.time()
+
+    @classmethod
+    def get(cls, key: str) -> Tuple[Optional[CacheEntry], Optional[str]]:
+        """
+        Look up an object, checking the local tier before Redis.
+
+        Args:
+            key: S3 key of the object
+
+        Returns:
+            The entry and the tier it was found in ("local" or "redis"),
+            or (None, None) on a miss
+        """
+        if not settings.S3_CACHE_ENABLED:
+            return None, None
+
+        with cls._lock:
+            entry = cls._local.get(key)
+            if entry is not None:
+                if entry[0] + settings.S3_CACHE_TTL_SECONDS > time.time():
+                    cls._local.move_to_end(key)
+                    return entry, "local"
+                del cls._local[key]
+
+        client = cls._get_redis()
+        if client is None:
+            return None, None
+        try:
+            values = client.hgetall(cls.KEY_PREFIX + key)
+        except Exception as e:
+            print(f"Warning: S3 cache lookup failed: {e}")
+            return None, None
+        if not values:
+            return None, None
+
+        entry = (float(values[b"checked_at"]), values[b"etag"].decode("utf-8"), values[b"body"])
+        cls._set_local(key, entry)
+        return entry, "redis"
+
+    @classmethod
+    def set(cls, key: str, etag: str, body: bytes) -> None:
+        """
+        Store an object just fetched or revalidated from S3 in both tiers.
+
+        Args:
+            key: S3 key of the object
+            etag: ETag S3 returned with it
+            body: The object's (decompressed) content
+        """
+        if not settings.S3_CACHE_ENABLED or not etag or len(body) > settings.S3_CACHE_MAX_OBJECT_BYTES:
+            return
+
+        checked_at = time.time()
+        cls._set_local(key, (checked_at, etag, body))
+
+        client = cls._get_redis()
+        if client is None:
+            return
+        try:
+            pipe = client.pipeline()
+            pipe.hset(cls.KEY_PREFIX + key, mapping={"checked_at": checked_at, "etag": etag, "body": body})
+            pipe.expire(cls.KEY_PREFIX + key, settings.S3_CACHE_TTL_SECONDS)
+            pipe.execute()
+        except Exception as e:
+            print(f"Warning: S3 cache store failed: {e}")
+
+    @classmethod
+    def invalidate(cls, key: str) -> None:
+        """Drop an object from both tiers (other processes' LRUs revalidate it)."""
+        with cls._lock:
+            cls._local.pop(key, None)
+
+        client = cls._get_redis()
+        if client is None:
+            return
+        try:
+            client.delete(cls.KEY_PREFIX + key)
+        except Exception as e:
+            print(f"Warning: S3 cache invalidation failed: {e}")
+
+    @classmethod
+    def clear_local(cls) -> None:
+        """Empty the in-process tier."""
+        with cls._lock:
+            cls._local.clear()
@@ -1,9 +1,29 @@
+import gzip
+import hashlib
 import json
 import time
 import uuid
-from typing import Dict, Any, Optional
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
 
-from s3_utils import s3_client, S3_BUCKET_NAME
+from botocore.exceptions import ClientError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import S3_CACHE_REQUESTS, S3_OPERATION_DURATION
+from app.models.stored_blob import StoredBlob
+from app.services.s3_object_cache import S3ObjectCache
+from app.services.s3_io import S3IO
+from s3_utils import S3_BUCKET_NAME
+
+# Content-addressed texts: blobs/<first two hex digits>/<sha256>.txt.gz
+BLOB_PREFIX = "blobs/"
+
+# Session.info keys of the S3 changes that wait for the transaction's outcome
+PENDING_UPLOADS = "s3_pending_uploads"
+PENDING_DELETES = "s3_pending_deletes"
 
 class S3Service:
     """
@@ -12,53 +32,399 @@ class S3Service:
     This service provides methods for storing and retrieving summaries
     from Amazon S3 storage, which allows for cost-effective storage
     of summary data especially when dealing with large volumes.
+    
+    Objects are stored gzip-compressed (Content-Encoding: gzip) and texts
+    are stored once per content (store_blob), however many summaries
+    refer to them.
+    
+    Given a database session, S3 changes follow its transaction: objects
+    are deleted only once it commits, and objects it uploaded are removed
+    if it rolls back (texts through collect_unreferenced_blobs).
     """
     
     @staticmethod
-    def store_summary(summary_id: int, content: Dict[str, Any]) -> Optional[str]:
+    @contextmanager
+    def _timed(operation: str):
+        """Record the latency and outcome of an S3 call."""
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            yield
+            outcome = "success"
+        finally:
+            S3_OPERATION_DURATION.labels(operation=operation, outcome=outcome).observe(time.perf_counter() - start)
+    
+    @staticmethod
+    def _compress(data: bytes) -> bytes:
+        # mtime=0: identical content gives identical objects
+        return gzip.compress(data, compresslevel=settings.S3_COMPRESSION_LEVEL, mtime=0)
+    
+    @staticmethod
+    def _get_object(key: str) -> bytes:
+        """
+        Download an object, decompressing it if it was stored gzip-encoded.
+        
+        Reads through S3ObjectCache. A cached object is served without
+        contacting S3 while fresh (always, for content-addressed texts,
+        which never change), and revalidated with a conditional GET after.
+        """
+        entry, tier = S3ObjectCache.get(key)
+        if entry is not None and (S3Service._blob_hash(key) is not None or S3ObjectCache.is_fresh(entry)):
+            S3_CACHE_REQUESTS.labels(result=tier).inc()
+            return entry[2]
+        
+        params = {'Bucket': S3_BUCKET_NAME, 'Key': key}
+        if entry is not None:
+            params['IfNoneMatch'] = entry[1]
+        try:
+            with S3Service._timed("get"):
+                try:
+                    response = S3IO.client().get_object(**params)
+                except ClientError as e:
+                    if entry is None or e.response.get('Error', {}).get('Code') not in ('304', 'NotModified'):
+                        raise
+                    response = None
+                else:
+                    body = response['Body'].read()
+        except ClientError:
+            if entry is not None:
+                S3ObjectCache.invalidate(key)
+            raise
+        
+        if response is None:
+            S3_CACHE_REQUESTS.labels(result="revalidated").inc()
+            S3ObjectCache.set(key, entry[1], entry[2])
+            return entry[2]
+        
+        S3_CACHE_REQUESTS.labels(result="miss").inc()
+        if response.get('ContentEncoding') == 'gzip':
+            body = gzip.decompress(body)
+        S3ObjectCache.set(key, response.get('ETag'), body)
+        return body
+    
+    @staticmethod
+    def blob_key(sha256: str) -> str:
+        """S3 key of the text with the given SHA-256 (see store_blob)."""
+        return f"{BLOB_PREFIX}{sha256[:2]}/{sha256}.txt.gz"
+    
+    @staticmethod
+    def _blob_hash(key: str) -> Optional[str]:
+        if not key.startswith(BLOB_PREFIX):
+            return None
+        return key.rsplit("/", 1)[-1].split(".", 1)[0]
+    
+    @staticmethod
+    def _pending(db, name: str) -> List[str]:
+        return db.info.setdefault(name, [])
+    
+    @staticmethod
+    def delete_after_commit(db, keys: List[str]) -> None:
+        """Delete objects once the session's transaction commits (not if it rolls back)."""
+        S3Service._pending(db, PENDING_DELETES).extend(keys)
+    
+    @staticmethod
+    def _discard_uploads(bind, keys: List[str]) -> None:
+        """Remove the objects a rolled-back transaction uploaded."""
+        sha256s = [S3Service._blob_hash(key) for key in keys if S3Service._blob_hash(key) is not None]
+        # Other transactions may reference a text meanwhile: leave it to the sweep
+        if sha256s:
+            try:
+                with bind.begin() as conn:
+                    StoredBlob.mark_unreferenced(conn, sha256s)
+            except Exception as e:
+                print(f"Error recording unreferenced S3 texts: {e}")
+        S3Service.delete_objects([key for key in keys if S3Service._blob_hash(key) is None])
+    
+    @staticmethod
+    def store_blob(db, text: str) -> Optional[str]:
+        """
+        Store a text once, gzip-compressed, under the key of its SHA-256.
+        
+        Storing a text that is already stored only adds a reference to it
+        (see StoredBlob); every reference is dropped with release_blob.
+        Does not commit: the reference is part of the caller's transaction,
+        and an upload is undone if it rolls back.
+        
+        Args:
+            db: Database session
+            text: The text to store
+            
+        Returns:
+            The S3 key of the text, or None if failed
+        """
+        if not S3_BUCKET_NAME:
+            return None
+        
+        raw = text.encode('utf-8')
+        sha256 = hashlib.sha256(raw).hexdigest()
+        body = S3Service._compress(raw)
+        key = S3Service.blob_key(sha256)
+        if not StoredBlob.acquire(db, sha256, len(raw), len(body)):
+            return key
+        
+        try:
+            with S3Service._timed("put"):
+                S3IO.client().put_object(
+                    Bucket=S3_BUCKET_NAME,
+                    Key=key,
+                    Body=body,
+                    ContentType='text/plain; charset=utf-8',
+                    ContentEncoding='gzip'
+                )
+            S3Service._pending(db, PENDING_UPLOADS).append(key)
+            return key
+            
+        except Exception as e:
+            print(f"Error storing text in S3: {e}")
+            StoredBlob.release(db, sha256)
+            return None
+    
+    @staticmethod
+    def release_blobs(db, keys: List[str]) -> bool:
+        """
+        Drop references to texts stored with store_blob. Does not commit.
+        
+        Texts no summary references anymore are deleted by the
+        collect_unreferenced_blobs sweep. Keys outside the blob prefix
+        (texts stored per summary before content addressing) are deleted
+        once the caller commits.
+        
+        Args:
+            db: Database session
+            keys: The S3 keys of the texts
+            
+        Returns:
+            False if S3 is not configured, True otherwise
+        """
+        if not S3_BUCKET_NAME:
+            return False
+        
+        for key in keys:
+            sha256 = S3Service._blob_hash(key)
+            if sha256 is None:
+                S3Service.delete_after_commit(db, [key])
+            else:
+                StoredBlob.release(db, sha256)
+        return True
+    
+    @staticmethod
+    def release_blob(db, key: str) -> bool:
+        """Drop one reference to a text stored with store_blob (see release_blobs)."""
+        if not key:
+            return False
+        return S3Service.release_blobs(db, [key])
+    
+    @staticmethod
+    def collect_unreferenced_blobs(db, limit: int) -> int:
+        """
+        Delete texts no summary references anymore (run by beat).
+        
+        The blobs' rows stay locked until they are deleted with the
+        objects, so a concurrent store_blob of the same text waits and
+        uploads it again.
+        
+        Args:
+            db: Database session
+            limit: Maximum number of texts to delete
+            
+        Returns:
+            Number of texts deleted
+        """
+        sha256s = StoredBlob.lock_unreferenced(db, limit)
+        if not sha256s:
+            db.rollback()
+            return 0
+        if not S3Service.delete_objects([S3Service.blob_key(sha256) for sha256 in sha256s]):
+            # Retried by the next sweep
+            db.rollback()
+            return 0
+        StoredBlob.remove(db, sha256s)
+        db.commit()
+        return len(sha256s)
+    
+    @staticmethod
+    def delete_objects(keys: List[str]) -> bool:
+        """
+        Delete objects with bulk requests of up to 1000 keys each.
+        
+        Args:
+            keys: The S3 keys to delete
+            
+        Returns:
+            True if every object was deleted, False otherwise
+        """
+        if not S3_BUCKET_NAME:
+            return False
+        
+        deleted = True
+        for start in range(0, len(keys), 1000):
+            chunk = keys[start:start + 1000]
+            try:
+                with S3Service._timed("delete"):
+                    response = S3IO.client().delete_objects(
+                        Bucket=S3_BUCKET_NAME,
+                        Delete={'Objects': [{'Key': key} for key in chunk], 'Quiet': True}
+                    )
+                for error in response.get('Errors', []):
+                    print(f"Error deleting {error.get('Key')} from S3: {error.get('Message')}")
+                    deleted = False
+            except Exception as e:
+                print(f"Error deleting objects from S3: {e}")
+                deleted = False
+            for key in chunk:
+                S3ObjectCache.invalidate(key)
+        return deleted
+    
+    @staticmethod
+    def get_text(key: str) -> Optional[str]:
+        """
+        Retrieve a text object from S3.
+        
+        Args:
+            key: The S3 key of the text
+            
+        Returns:
+            The text or None if retrieval failed
+        """
+        if not S3_BUCKET_NAME or not key:
+            return None
+            
+        try:
+            return S3Service._get_object(key).decode('utf-8')
+            
+        except Exception as e:
+            print(f"Error retrieving text from S3: {e}")
+            return None
+    
+    @staticmethod
+    def get_texts(keys: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Retrieve several text objects from S3 concurrently.
+        
+        Args:
+            keys: The S3 keys of the texts
+            
+        Returns:
+            Dictionary of key to text, None where retrieval failed
+        """
+        if len(keys) <= 1:
+            return {key: S3Service.get_text(key) for key in keys}
+        futures = {key: S3IO.submit(S3Service.get_text, key) for key in set(keys)}
+        return {key: future.result() for key, future in futures.items()}
+    
+    @staticmethod
+    def store_summary(summary_id: int, content: Dict[str, Any], db=None) -> Optional[str]:
         """
         Store a summary in S3.
         
+        The summary is stored as gzip-compressed JSON. Given a database
+        session, the original text is stored separately with store_blob, so
+        a text submitted several times is stored once, and the JSON refers
+        to it by original_text_key.
+        
         Args:
             summary_id: The database ID of the summary
             content: Dictionary with summary data to store
+            db: Database session for the original text's reference (optional)
             
         Returns:
             The S3 key where the summary is stored, or None if failed
         """
         if not S3_BUCKET_NAME:
             return None
+        
+        content = dict(content)
+        original_text_key = None
+        if db is not None and content.get("original_text"):
+            original_text_key = S3Service.store_blob(db, content.pop("original_text"))
+            if original_text_key is None:
+                return None
+            content["original_text_key"] = original_text_key
             
         try:
             # Generate a unique key for the summary
             timestamp = int(time.time())
             unique_id = str(uuid.uuid4())[:8]
-            key = f"summaries/{summary_id}/{timestamp}_{unique_id}.json"
+            key = f"summaries/{summary_id}/{timestamp}_{unique_id}.json.gz"
             
-            # Convert content to JSON
-            content_json = json.dumps(content)
+            # Convert content to compressed JSON
+            body = S3Service._compress(json.dumps(content).encode('utf-8'))
             
             # Upload to S3
-            s3_client.put_object(
-                Bucket=S3_BUCKET_NAME,
-                Key=key,
-                Body=content_json,
-                ContentType='application/json'
-            )
+            with S3Service._timed("put"):
+                S3IO.client().put_object(
+                    Bucket=S3_BUCKET_NAME,
+                    Key=key,
+                    Body=body,
+                    ContentType='application/json',
+                    ContentEncoding='gzip'
+                )
+            if db is not None:
+                S3Service._pending(db, PENDING_UPLOADS).append(key)
             
             return key
             
         except Exception as e:
             print(f"Error storing summary in S3: {e}")
+            if original_text_key:
+                S3Service.release_blob(db, original_text_key)
             return None
     
     @staticmethod
-    def get_summary(s3_key: str) -> Optional[Dict[str, Any]]:
+    def store_summary_in_background(summary_id: int, content: Dict[str, Any]) -> Future:
+        """
+        Store a summary in S3 on the I/O executor and record its key.
+        
+        The upload uses its own database session for the original text's
+        reference and sets the summary's s3_location and storage_ms (the
+        upload's duration) when done. If the summary was deleted meanwhile,
+        the stored objects are removed again.
+        
+        Args:
+            summary_id: The database ID of the summary (committed)
+            content: Dictionary with summary data to store
+            
+        Returns:
+            Future of the S3 key, or of None if failed
+        """
+        def upload() -> Optional[str]:
+            from app.db.base import SessionLocal
+            from app.models.summary import Summary
+            
+            db = SessionLocal()
+            try:
+                start = time.perf_counter()
+                key = S3Service.store_summary(summary_id, content, db=db)
+                if key is None:
+                    db.rollback()
+                    return None
+                storage_ms = int((time.perf_counter() - start) * 1000)
+                updated = db.query(Summary).filter(Summary.id == summary_id).update(
+                    {"s3_location": key, "storage_ms": storage_ms}, synchronize_session=False
+                )
+                if not updated:
+                    S3Service.delete_summary(key, db=db)
+                    key = None
+                db.commit()
+                return key
+            except Exception as e:
+                print(f"Error storing summary {summary_id} in S3 in the background: {e}")
+                db.rollback()
+                return None
+            finally:
+                db.close()
+        
+        return S3IO.submit(upload)
+    
+    @staticmethod
+    def get_summary(s3_key: str, include_original_text: bool = True) -> Optional[Dict[str, Any]]:
         """
         Retrieve a summary from S3.
         
         Args:
             s3_key: The S3 key where the summary is stored
+            include_original_text: Also download the original text if it is
+                stored separately (original_text_key)
             
         Returns:
             Dictionary with summary data or None if retrieval failed
@@ -67,18 +433,16 @@ class S3Service:
             return None
             
         try:
-            response = s3_client.get_object(
-                Bucket=S3_BUCKET_NAME,
-                Key=s3_key
-            )
-            
             # Read and parse the JSON content
-            content = response['Body'].read().decode('utf-8')
-            return json.loads(content)
+            content = json.loads(S3Service._get_object(s3_key).decode('utf-8'))
             
         except Exception as e:
             print(f"Error retrieving summary from S3: {e}")
             return None
+        
+        if include_original_text and content.get("original_text_key"):
+            content["original_text"] = S3Service.get_text(content["original_text_key"])
+        return content
     
     @staticmethod
     def generate_presigned_url(s3_key: str, expires_in: int = 3600) -> Optional[str]:
@@ -96,7 +460,7 @@ class S3Service:
             return None
             
         try:
-            url = s3_client.generate_presigned_url(
+            url = S3IO.client().generate_presigned_url(
                 ClientMethod='get_object',
                 Params={
                     'Bucket': S3_BUCKET_NAME,
@@ -112,27 +476,49 @@ class S3Service:
             return None
     
     @staticmethod
-    def delete_summary(s3_key: str) -> bool:
+    def delete_summary(s3_key: str, db=None) -> bool:
         """
         Delete a summary from S3.
         
         Args:
             s3_key: The S3 key where the summary is stored
+            db: Database session; given one, the summary is deleted once it
+                commits and the reference to the original text is dropped
+                too (see store_summary). Does not commit.
             
         Returns:
-            True if deletion successful, False otherwise
+            True if deletion successful (or, given a session, scheduled),
+            False otherwise
         """
         if not S3_BUCKET_NAME or not s3_key:
             return False
-            
-        try:
-            s3_client.delete_object(
-                Bucket=S3_BUCKET_NAME,
-                Key=s3_key
-            )
-            
-            return True
-            
-        except Exception as e:
-            print(f"Error deleting summary from S3: {e}")
-            return False
\ No newline at end of file
+        
+        if db is None:
+            return S3Service.delete_objects([s3_key])
+        
+        content = S3Service.get_summary(s3_key, include_original_text=False)
+        original_text_key = (content or {}).get("original_text_key")
+        if original_text_key:
+            S3Service.release_blob(db, original_text_key)
+        S3Service.delete_after_commit(db, [s3_key])
+        return True
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_s3_changes(session) -> None:
+    session.info.pop(PENDING_UPLOADS, None)
+    keys = session.info.pop(PENDING_DELETES, None)
+    if keys:
+        S3Service.delete_objects(keys)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending_s3_changes(session, transaction) -> None:
+    # Anything still pending when the outermost transaction ends without
+    # committing (rollback or close) belongs to a transaction that is gone
+    if transaction.parent is not None:
+        return
+    session.info.pop(PENDING_DELETES, None)
+    keys = session.info.pop(PENDING_UPLOADS, None)
+    if keys:
+        S3Service._discard_uploads(session.get_bind(), keys)
@@ -0,0 +1,232 @@
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+# Delete the lock only if we still own it
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical summarization requests.
+
+    The first caller for a key takes a Redis lock and does the work; its
+    result is published on a per-key channel and kept briefly under a
+    result key. Concurrent callers with the same key (in any process)
+    wait for that result instead of repeating the inference call. Results
+    handed to waiters are marked with "coalesced": True.
+
+    If Redis is unavailable, every caller simply does its own work.
+    """
+
+    LOCK_PREFIX = "singleflight:lock:"
+    RESULT_PREFIX = "singleflight:result:"
+    CHANNEL_PREFIX = "singleflight:done:"
+
+    _redis: Optional[redis.Redis] = None
+    _async_redis: Optional[aioredis.Redis] = None
+    _inflight: Dict[str, "asyncio.Future"] = {}
+
+    @classmethod
+    def _get_redis(cls) -> Optional[redis.Redis]:
+        if not settings.SINGLE_FLIGHT_ENABLED or not settings.REDIS_URL:
+            return None
+        if cls._redis is None:
+            cls._redis = redis.Redis.from_url(settings.REDIS_URL)
+        return cls._redis
+
+    @classmethod
+    def _get_async_redis(cls) -> Optional[aioredis.Redis]:
+        if not settings.SINGLE_FLIGHT_ENABLED or not settings.REDIS_URL:
+            return None
+        if cls._async_redis is None:
+            cls._async_redis = aioredis.Redis.from_url(settings.REDIS_URL)
+        return cls._async_redis
+
+    @staticmethod
+    def _coalesced(result: Dict[str, Any]) -> Dict[str, Any]:
+        result = dict(result)
+        result["coalesced"] = True
+        return result
+
+    @classmethod
+    def run(cls, key: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run compute() once across all concurrent callers with the same key.
+
+        Args:
+            key: Request key (see HuggingFaceService.request_key)
+            compute: Function producing the summarization result
+
+        Returns:
+            The result, computed here or received from the leader
+        """
+        client = cls._get_redis()
+        if client is None:
+            return compute()
+
+        lock_key = cls.LOCK_PREFIX + key
+        token = uuid.uuid4().hex
+        try:
+            is_leader = client.set(lock_key, token, nx=True, ex=settings.SINGLE_FLIGHT_LOCK_TTL_SECONDS)
+        except Exception as e:
+            print(f"Warning: Single-flight lock unavailable: {e}")
+            return compute()
+
+        if is_leader:
+            try:
+                result = compute()
+                cls._publish(client, key, result)
+                return result
+            finally:
+                try:
+                    client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+                except Exception as e:
+                    print(f"Warning: Could not release single-flight lock: {e}")
+
+        result = cls._wait(client, key)
+        if result is not None:
+            return cls._coalesced(result)
+
+        # The leader died or timed out without a result: do the work ourselves
+        return compute()
+
+    @classmethod
+    def _publish(cls, client: redis.Redis, key: str, result: Dict[str, Any]) -> None:
+        try:
+            payload = json.dumps(result)
+            pipe = client.pipeline()
+            pipe.setex(cls.RESULT_PREFIX + key, settings.SINGLE_FLIGHT_RESULT_TTL_SECONDS, payload)
+            pipe.publish(cls.CHANNEL_PREFIX + key, payload)
+            pipe.execute()
+        except Exception as e:
+            print(f"Warning: Could not publish single-flight result: {e}")
+
+    @classmethod
+    def _wait(cls, client: redis.Redis, key: str) -> Optional[Dict[str, Any]]:
+        """Wait for the leader's result; None if it never arrives."""
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            # Subscribe before checking the result key so a publish between
+            # the two cannot be missed
+            pubsub.subscribe(cls.CHANNEL_PREFIX + key)
+            raw = client.get(cls.RESULT_PREFIX + key)
+            if raw is not None:
+                return json.loads(raw)
+
+            deadline = time.time() + settings.SINGLE_FLIGHT_WAIT_SECONDS
+            while time.time() < deadline:
+                message = pubsub.get_message(timeout=1.0)
+                if message and message["type"] == "message":
+                    return json.loads(message["data"])
+                if not client.exists(cls.LOCK_PREFIX + key):
+                    raw = client.get(cls.RESULT_PREFIX + key)
+                    return json.loads(raw) if raw is not None else None
+            return None
+        except Exception as e:
+            print(f"Warning: Single-flight wait failed: {e}")
+            return None
+        finally:
+            pubsub.close()
+
+    @classmethod
+    async def arun(cls, key: str, compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Async counterpart of run.
+
+        Callers in the same process share one in-flight future; across
+        processes the Redis lock and channel are used.
+        """
+        inflight = cls._inflight.get(key)
+        if inflight is not None:
+            return cls._coalesced(await asyncio.shield(inflight))
+
+        future = asyncio.get_running_loop().create_future()
+        cls._inflight[key] = future
+        try:
+            result = await cls._arun_redis(key, compute)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody was waiting
+            future.exception()
+            raise
+        finally:
+            cls._inflight.pop(key, None)
+
+    @classmethod
+    async def _arun_redis(cls, key: str, compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        client = cls._get_async_redis()
+        if client is None:
+            return await compute()
+
+        lock_key = cls.LOCK_PREFIX + key
+        token = uuid.uuid4().hex
+        try:
+            is_leader = await client.set(lock_key, token, nx=True, ex=settings.SINGLE_FLIGHT_LOCK_TTL_SECONDS)
+        except Exception as e:
+            print(f"Warning: Single-flight lock unavailable: {e}")
+            return await compute()
+
+        if is_leader:
+            try:
+                result = await compute()
+                try:
+                    payload = json.dumps(result)
+                    pipe = client.pipeline()
+                    pipe.setex(cls.RESULT_PREFIX + key, settings.SINGLE_FLIGHT_RESULT_TTL_SECONDS, payload)
+                    pipe.publish(cls.CHANNEL_PREFIX + key, payload)
+                    await pipe.execute()
+                except Exception as e:
+                    print(f"Warning: Could not publish single-flight result: {e}")
+                return result
+            finally:
+                try:
+                    await client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+                except Exception as e:
+                    print(f"Warning: Could not release single-flight lock: {e}")
+
+        result = await cls._await_result(client, key)
+        if result is not None:
+            return cls._coalesced(result)
+        return await compute()
+
+    @classmethod
+    async def _await_result(cls, client: aioredis.Redis, key: str) -> Optional[Dict[str, Any]]:
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(cls.CHANNEL_PREFIX + key)
+            raw = await client.get(cls.RESULT_PREFIX + key)
+            if raw is not None:
+                return json.loads(raw)
+
+            deadline = time.time() + settings.SINGLE_FLIGHT_WAIT_SECONDS
+            while time.time() < deadline:
+                message = await pubsub.get_message(timeout=1.0)
+                if message and message["type"] == "message":
+                    return json.loads(message["data"])
+                if not await client.exists(cls.LOCK_PREFIX + key):
+                    raw = await client.get(cls.RESULT_PREFIX + key)
+                    return json.loads(raw) if raw is not None else None
+            return None
+        except Exception as e:
+            print(f"Warning: Single-flight wait failed: {e}")
+            return None
+        finally:
+            await pubsub.close()
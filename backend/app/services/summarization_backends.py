@@ -0,0 +1,240 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+import random
+import time
+from typing import Dict, Any, Optional
+
+import requests
+
+from app.core.config import settings
+from app.services.extractive_service import ExtractiveSummarizer
+from app.services.http_client import AsyncInferenceHTTPClient, InferenceHTTPClient
+from app.services.text_chunking import split_sentences
+
+# Backend name of models served in process by ExtractiveSummarizer
+LOCAL_BACKEND = "local"
+
+
+class InferenceResponse:
+    """
+    Minimal HTTP-like response produced by in-process backends.
+
+    Exposes the subset of the `requests`/`httpx` response interface used by
+    HuggingFaceService, so every backend goes through the same retry and
+    parsing code.
+    """
+
+    def __init__(self, status_code: int, body: Any):
+        self.status_code = status_code
+        self._body = body
+        self.text = json.dumps(body)
+
+    def json(self) -> Any:
+        return self._body
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error: {self.text}")
+
+
+class SummarizationBackend(ABC):
+    """
+    Interface of a summarization backend.
+
+    A backend runs a single inference request and answers in the Hugging
+    Face inference response format: a list of {"summary_text": ...} on
+    success, or a 503 {"error": "... loading ..."} while the model loads.
+    Retries, chunking, caching and fallback stay in HuggingFaceService.
+
+    A backend that is not remote summarizes in process with summarize();
+    HuggingFaceService calls it directly, without the cache, retries,
+    circuit breaker, batching or warm-up that inference requests get.
+    """
+
+    name = "base"
+    remote = True  # Answers inference requests like an API endpoint
+    billable = False  # Requests are charged by the inference provider
+
+    @abstractmethod
+    def infer(self, url: str, headers: Dict[str, str], payload: Dict[str, Any]):
+        """Run one inference request and return its HTTP(-like) response."""
+
+    async def ainfer(self, url: str, headers: Dict[str, str], payload: Dict[str, Any]):
+        return await asyncio.to_thread(self.infer, url, headers, payload)
+
+    def summarize(self,
+                  text: str,
+                  max_length: int,
+                  min_length: Optional[int] = None,
+                  token_model: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Summarize in process; only implemented by backends that are not remote.
+
+        token_model is the model whose tokens max_length and min_length
+        count (see TokenCounter); the generic approximator by default.
+        """
+        raise NotImplementedError(f"Backend {self.name} only answers inference requests")
+
+
+class HuggingFaceBackend(SummarizationBackend):
+    """Remote Hugging Face inference API over the pooled HTTP clients."""
+
+    name = "huggingface"
+    billable = True
+
+    def infer(self, url, headers, payload):
+        return InferenceHTTPClient.post(url, headers=headers, json=payload)
+
+    async def ainfer(self, url, headers, payload):
+        return await AsyncInferenceHTTPClient.post(url, headers=headers, json=payload)
+
+
+class MockBackend(SummarizationBackend):
+    """
+    Simulated inference endpoint for load tests and offline development.
+
+    Latency, the rate of 503 "loading" responses and the rate of 500
+    errors are configurable. The summary is the leading sentences of the
+    input within max_length, which is cheap to produce.
+    """
+
+    name = "mock"
+
+    def __init__(self,
+                 latency_ms: Optional[int] = None,
+                 loading_rate: Optional[float] = None,
+                 error_rate: Optional[float] = None,
+                 seed: Optional[int] = None,
+                 batch_item_latency_ms: Optional[int] = None):
+        self.latency_ms = settings.MOCK_LATENCY_MS if latency_ms is None else latency_ms
+        self.loading_rate = settings.MOCK_LOADING_RATE if loading_rate is None else loading_rate
+        self.error_rate = settings.MOCK_ERROR_RATE if error_rate is None else error_rate
+        self.batch_item_latency_ms = (
+            settings.MOCK_BATCH_ITEM_LATENCY_MS if batch_item_latency_ms is None else batch_item_latency_ms
+        )
+        self._random = random.Random(seed)
+
+    def sample_delay(self, batch_size: int = 1) -> float:
+        # Each extra input of a batch adds a little on top of the base
+        # latency; +/-20% jitter around the total
+        latency_ms = self.latency_ms + self.batch_item_latency_ms * (batch_size - 1)
+        return latency_ms * self._random.uniform(0.8, 1.2) / 1000
+
+    @staticmethod
+    def batch_size(payload: Dict[str, Any]) -> int:
+        inputs = payload["inputs"]
+        return len(inputs) if isinstance(inputs, list) else 1
+
+    def respond(self, payload: Dict[str, Any]) -> InferenceResponse:
+        """Build the response for a payload without sleeping."""
+        roll = self._random.random()
+        # Like the real API, wait_for_model blocks instead of answering 503
+        wait_for_model = payload.get("options", {}).get("wait_for_model", False)
+        if roll < self.loading_rate and not wait_for_model:
+            return InferenceResponse(503, {
+                "error": "Model mock is currently loading",
+                "estimated_time": 20.0
+            })
+        if roll < self.loading_rate + self.error_rate:
+            return InferenceResponse(500, {"error": "Mock inference error"})
+
+        max_length = payload.get("parameters", {}).get("max_length", 150)
+        inputs = payload["inputs"]
+        if isinstance(inputs, list):
+            # Batched request: one summary per input
+            return InferenceResponse(200, [
+                {"summary_text": self.lead_summary(text, max_length)} for text in inputs
+            ])
+        return InferenceResponse(200, [{"summary_text": self.lead_summary(inputs, max_length)}])
+
+    @staticmethod
+    def lead_summary(text: str, max_length: int) -> str:
+        """Leading sentences of text within max_length tokens."""
+        words = []
+        for sentence in split_sentences(text):
+            sentence_words = sentence.split()
+            if words and len(words) + len(sentence_words) > max_length:
+                break
+            words.extend(sentence_words)
+        return " ".join(words[:max_length])
+
+    def infer(self, url, headers, payload):
+        time.sleep(self.sample_delay(self.batch_size(payload)))
+        return self.respond(payload)
+
+    async def ainfer(self, url, headers, payload):
+        await asyncio.sleep(self.sample_delay(self.batch_size(payload)))
+        return self.respond(payload)
+
+
+class LocalExtractiveBackend(SummarizationBackend):
+    """
+    In-process extractive summarization with ExtractiveSummarizer.
+
+    summarize() returns the summarizer's own result and stats. infer()
+    answers the same payloads as the remote backends, one summary per
+    input, so the backend can also be driven like an endpoint.
+    """
+
+    name = LOCAL_BACKEND
+    remote = False
+
+    def summarize(self, text, max_length, min_length=None, token_model=None):
+        return ExtractiveSummarizer.summarize(text, max_length, min_length, token_model)
+
+    def infer(self, url, headers, payload):
+        parameters = payload.get("parameters", {})
+        inputs = payload["inputs"]
+        summaries = []
+        for text in inputs if isinstance(inputs, list) else [inputs]:
+            result = self.summarize(text, parameters.get("max_length", 150), parameters.get("min_length"))
+            if not result["success"]:
+                return InferenceResponse(400, {"error": result["error"]})
+            summaries.append({"summary_text": result["summary"]})
+        return InferenceResponse(200, summaries)
+
+
+_BACKENDS: Dict[str, SummarizationBackend] = {}
+
+
+def register_backend(backend: SummarizationBackend) -> None:
+    """Register a backend under its name, replacing any existing one."""
+    _BACKENDS[backend.name] = backend
+
+
+def get_backend(name: str) -> SummarizationBackend:
+    """
+    Get a registered backend by name.
+
+    Raises:
+        KeyError: If no backend is registered under that name
+    """
+    return _BACKENDS[name]
+
+
+def get_backend_for_model(model: Dict[str, Any]) -> SummarizationBackend:
+    """
+    Get the backend that serves a model.
+
+    INFERENCE_BACKEND overrides the per-model "backend" key for every
+    Hugging Face model, e.g. to route all traffic to the mock backend.
+    Local models keep their in-process backend.
+
+    Raises:
+        KeyError: If the model's backend is not registered
+    """
+    name = model.get("backend", HuggingFaceBackend.name)
+    if settings.INFERENCE_BACKEND and name == HuggingFaceBackend.name:
+        name = settings.INFERENCE_BACKEND
+    return get_backend(name)
+
+
+def get_available_backends() -> Dict[str, str]:
+    """Names and implementing classes of the registered backends."""
+    return {name: type(backend).__name__ for name, backend in _BACKENDS.items()}
+
+
+register_backend(HuggingFaceBackend())
+register_backend(MockBackend())
+register_backend(LocalExtractiveBackend())
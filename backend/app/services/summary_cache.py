@@ -0,0 +1,206 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+
+class SummaryCache:
+    """
+    Content-addressed cache for summarization results.
+
+    Results are keyed by a hash of the normalized text and the parameters
+    that affect the output (model, max_length, min_length). There are two
+    tiers: a bounded in-process LRU and a shared Redis tier with a TTL and
+    a size bound enforced through a sorted-set index of entry ages.
+    """
+
+    KEY_PREFIX = "summary_cache:"
+    INDEX_KEY = "summary_cache:index"
+
+    _local: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+    _lock = threading.Lock()
+    _redis: Optional[redis.Redis] = None
+    _async_redis: Optional[aioredis.Redis] = None
+
+    @staticmethod
+    def make_key(text: str,
+                 model_id: str,
+                 max_length: Optional[int],
+                 min_length: Optional[int]) -> str:
+        """
+        Build the cache key for a summarization request.
+
+        Whitespace differences in the text do not change the key.
+        """
+        normalized = " ".join(text.split())
+        digest = hashlib.sha256()
+        digest.update(normalized.encode("utf-8"))
+        digest.update(f"\0{model_id}\0{max_length or ''}\0{min_length or ''}".encode("utf-8"))
+        return digest.hexdigest()
+
+    @classmethod
+    def _get_redis(cls) -> Optional[redis.Redis]:
+        if not settings.SUMMARY_CACHE_REDIS_ENABLED or not settings.REDIS_URL:
+            return None
+        if cls._redis is None:
+            cls._redis = redis.Redis.from_url(settings.REDIS_URL)
+        return cls._redis
+
+    @classmethod
+    def _get_async_redis(cls) -> Optional[aioredis.Redis]:
+        if not settings.SUMMARY_CACHE_REDIS_ENABLED or not settings.REDIS_URL:
+            return None
+        if cls._async_redis is None:
+            cls._async_redis = aioredis.Redis.from_url(settings.REDIS_URL)
+        return cls._async_redis
+
+    @classmethod
+    def _get_local(cls, key: str) -> Optional[Dict[str, Any]]:
+        with cls._lock:
+            entry = cls._local.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del cls._local[key]
+                return None
+            cls._local.move_to_end(key)
+            return value
+
+    @classmethod
+    def _set_local(cls, key: str, value: Dict[str, Any]) -> None:
+        with cls._lock:
+            cls._local[key] = (time.time() + settings.SUMMARY_CACHE_TTL_SECONDS, dict(value))
+            cls._local.move_to_end(key)
+            while len(cls._local) > settings.SUMMARY_CACHE_LOCAL_MAXSIZE:
+                cls._local.popitem(last=False)
+
+    @classmethod
+    def get(cls, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result, checking the local tier before Redis.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            The cached result, or None on a miss
+        """
+        if not settings.SUMMARY_CACHE_ENABLED:
+            return None
+
+        value = cls._get_local(key)
+        if value is not None:
+            return value
+
+        client = cls._get_redis()
+        if client is None:
+            return None
+        try:
+            raw = client.get(cls.KEY_PREFIX + key)
+        except Exception as e:
+            print(f"Warning: Summary cache lookup failed: {e}")
+            return None
+        if raw is None:
+            return None
+
+        value = json.loads(raw)
+        cls._set_local(key, value)
+        return value
+
+    @classmethod
+    def set(cls, key: str, value: Dict[str, Any]) -> None:
+        """
+        Store a result in both tiers.
+
+        Args:
+            key: Cache key from make_key
+            value: The summarization result to cache
+        """
+        if not settings.SUMMARY_CACHE_ENABLED:
+            return
+
+        cls._set_local(key, value)
+
+        client = cls._get_redis()
+        if client is None:
+            return
+        try:
+            pipe = client.pipeline()
+            cls._queue_redis_set(pipe, key, value)
+            count = pipe.execute()[-1]
+            if count > settings.SUMMARY_CACHE_REDIS_MAXSIZE:
+                evicted = client.zpopmin(cls.INDEX_KEY, count - settings.SUMMARY_CACHE_REDIS_MAXSIZE)
+                if evicted:
+                    client.delete(*[cls.KEY_PREFIX + member.decode("utf-8") for member, _ in evicted])
+        except Exception as e:
+            print(f"Warning: Summary cache store failed: {e}")
+
+    @classmethod
+    async def aget(cls, key: str) -> Optional[Dict[str, Any]]:
+        """Async counterpart of get."""
+        if not settings.SUMMARY_CACHE_ENABLED:
+            return None
+
+        value = cls._get_local(key)
+        if value is not None:
+            return value
+
+        client = cls._get_async_redis()
+        if client is None:
+            return None
+        try:
+            raw = await client.get(cls.KEY_PREFIX + key)
+        except Exception as e:
+            print(f"Warning: Summary cache lookup failed: {e}")
+            return None
+        if raw is None:
+            return None
+
+        value = json.loads(raw)
+        cls._set_local(key, value)
+        return value
+
+    @classmethod
+    async def aset(cls, key: str, value: Dict[str, Any]) -> None:
+        """Async counterpart of set."""
+        if not settings.SUMMARY_CACHE_ENABLED:
+            return
+
+        cls._set_local(key, value)
+
+        client = cls._get_async_redis()
+        if client is None:
+            return
+        try:
+            pipe = client.pipeline()
+            cls._queue_redis_set(pipe, key, value)
+            count = (await pipe.execute())[-1]
+            if count > settings.SUMMARY_CACHE_REDIS_MAXSIZE:
+                evicted = await client.zpopmin(cls.INDEX_KEY, count - settings.SUMMARY_CACHE_REDIS_MAXSIZE)
+                if evicted:
+                    await client.delete(*[cls.KEY_PREFIX + member.decode("utf-8") for member, _ in evicted])
+        except Exception as e:
+            print(f"Warning: Summary cache store failed: {e}")
+
+    @classmethod
+    def _queue_redis_set(cls, pipe, key: str, value: Dict[str, Any]) -> None:
+        """Queue the SETEX and index update; the last reply is the index size."""
+        pipe.setex(cls.KEY_PREFIX + key, settings.SUMMARY_CACHE_TTL_SECONDS, json.dumps(value))
+        pipe.zadd(cls.INDEX_KEY, {key: time.time()})
+        # Drop index members whose entries have already expired
+        pipe.zremrangebyscore(cls.INDEX_KEY, 0, time.time() - settings.SUMMARY_CACHE_TTL_SECONDS)
+        pipe.zcard(cls.INDEX_KEY)
+
+    @classmethod
+    def clear_local(cls) -> None:
+        """Empty the in-process tier."""
+        with cls._lock:
+            cls._local.clear()
@@ -0,0 +1,208 @@
+from typing import Dict, Any, List, Optional
+
+import redis
+
+from app.core.config import settings
+from app.services.token_counter import TokenCounter
+
+# Add to a user's pending count unless that would exceed the cap (a
+# negative cap means none); returns the previous count, or -1 if refused
+_ACQUIRE_SCRIPT = """
+local pending = tonumber(redis.call('HGET', KEYS[1], ARGV[1]) or '0')
+local count = tonumber(ARGV[2])
+local cap = tonumber(ARGV[3])
+if cap >= 0 and pending + count > cap then
+    return -1
+end
+redis.call('HINCRBY', KEYS[1], ARGV[1], count)
+-- Counts of lost tasks should not linger forever
+redis.call('EXPIRE', KEYS[1], 86400)
+return pending
+"""
+
+# Decrement a user's pending count, dropping the field at zero
+_RELEASE_SCRIPT = """
+local pending = redis.call('HINCRBY', KEYS[1], ARGV[1], -tonumber(ARGV[2]))
+if pending <= 0 then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+end
+return pending
+"""
+
+
+class TaskRouter:
+    """
+    Routes summary tasks to length-aware Celery queues.
+
+    Each task goes to one of three lanes, each with its own worker pool:
+    - fast: short texts (up to QUEUE_FAST_MAX_TOKENS)
+    - standard: texts that fit in a single inference request
+    - long: texts over the model limit (long-document mode)
+
+    Within a lane, a user's tasks are demoted one priority level per
+    QUEUE_FAIR_SHARE tasks they already have waiting, so a heavy user
+    cannot starve the others. A user may have at most
+    QUEUE_USER_MAX_PENDING waiting tasks per lane.
+    """
+
+    FAST = "fast"
+    STANDARD = "standard"
+    LONG = "long"
+    LANES = [FAST, STANDARD, LONG]
+
+    PENDING_KEY_PREFIX = "queue_pending:"
+
+    # Redis broker priorities: 0 is the highest
+    MAX_PRIORITY = 9
+
+    _redis_client: Optional[redis.Redis] = None
+
+    @classmethod
+    def _get_redis(cls) -> Optional[redis.Redis]:
+        if not settings.REDIS_URL:
+            return None
+        if cls._redis_client is None:
+            cls._redis_client = redis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_timeout=0.5,
+                socket_connect_timeout=0.5,
+            )
+        return cls._redis_client
+
+    @classmethod
+    def route(cls, text: str, model: Dict[str, Any], model_id: str) -> str:
+        """
+        Pick the lane for a text and model.
+
+        Args:
+            text: The text to summarize
+            model: The model configuration from HuggingFaceService.MODELS
+            model_id: The model ID
+
+        Returns:
+            The lane (queue) name
+        """
+        tokens = TokenCounter.count(text, model_id)
+        if tokens > model["max_tokens"]:
+            return cls.LONG
+        if tokens <= settings.QUEUE_FAST_MAX_TOKENS:
+            return cls.FAST
+        return cls.STANDARD
+
+    @classmethod
+    def get_pending(cls, lane: str, user_id: int) -> int:
+        """Number of the user's tasks waiting in a lane."""
+        client = cls._get_redis()
+        if client is None:
+            return 0
+        try:
+            return int(client.hget(cls.PENDING_KEY_PREFIX + lane, user_id) or 0)
+        except redis.RedisError:
+            return 0
+
+    @classmethod
+    def _reserve(cls, lane: str, user_id: int, count: int, capped: bool) -> Optional[int]:
+        """
+        Atomically check the user's cap in a lane and count new tasks.
+
+        Returns:
+            The user's pending count before the new tasks, or None if they
+            would exceed QUEUE_USER_MAX_PENDING (nothing is counted then)
+        """
+        client = cls._get_redis()
+        if client is None:
+            return 0
+        try:
+            pending = client.eval(
+                _ACQUIRE_SCRIPT, 1, cls.PENDING_KEY_PREFIX + lane,
+                user_id, count, settings.QUEUE_USER_MAX_PENDING if capped else -1,
+            )
+        except redis.RedisError:
+            return 0
+        return None if pending < 0 else pending
+
+    @classmethod
+    def acquire(cls, lane: str, user_id: int, capped: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Count a task the user is about to enqueue and get its routing options.
+
+        The cap check and the count are one atomic step, so concurrent
+        requests cannot both take the user's last slot.
+
+        Args:
+            lane: The lane the task goes to
+            user_id: The user the task belongs to
+            capped: Whether to refuse the task if the user's lane is full
+
+        Returns:
+            apply_async options (queue and fair-share priority), or None if
+            the user already has QUEUE_USER_MAX_PENDING tasks waiting
+        """
+        pending = cls._reserve(lane, user_id, 1, capped)
+        if pending is None:
+            return None
+        priority = min(pending // settings.QUEUE_FAIR_SHARE, cls.MAX_PRIORITY)
+        return {"queue": lane, "priority": priority}
+
+    @classmethod
+    def acquire_many(cls, lane: str, user_id: int, count: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Count several tasks the user is about to enqueue in one lane at once.
+
+        Returns:
+            apply_async options for each task, in order: the first keeps
+            the priority acquire would give, later ones are demoted as if
+            acquired one by one. None if the tasks do not all fit under
+            the user's cap; then none of them is counted.
+        """
+        pending = cls._reserve(lane, user_id, count, True)
+        if pending is None:
+            return None
+        return [
+            {"queue": lane, "priority": min((pending + i) // settings.QUEUE_FAIR_SHARE, cls.MAX_PRIORITY)}
+            for i in range(count)
+        ]
+
+    @classmethod
+    def release(cls, lane: str, user_id: int, count: int = 1) -> None:
+        """Stop counting tasks once a worker has picked them up (or they were never sent)."""
+        client = cls._get_redis()
+        if client is None:
+            return
+        try:
+            client.eval(_RELEASE_SCRIPT, 1, cls.PENDING_KEY_PREFIX + lane, user_id, count)
+        except redis.RedisError as e:
+            print(f"Warning: Could not release queue slot: {e}")
+
+    @classmethod
+    def get_queue_depths(cls) -> Dict[str, Dict[str, int]]:
+        """
+        Waiting tasks per lane, from the broker's queue lists.
+
+        The Redis broker keeps one list per priority level
+        ("<queue>", "<queue>:1" ... "<queue>:9").
+        """
+        client = cls._get_redis()
+        if client is None:
+            return {}
+
+        try:
+            pipe = client.pipeline(transaction=False)
+            for lane in cls.LANES:
+                for key in cls._priority_keys(lane):
+                    pipe.llen(key)
+                pipe.hlen(cls.PENDING_KEY_PREFIX + lane)
+            replies = pipe.execute()
+        except redis.RedisError:
+            return {}
+
+        depths = {}
+        per_lane = cls.MAX_PRIORITY + 2
+        for index, lane in enumerate(cls.LANES):
+            lane_replies = replies[index * per_lane:(index + 1) * per_lane]
+            depths[lane] = {"depth": sum(lane_replies[:-1]), "users_waiting": lane_replies[-1]}
+        return depths
+
+    @classmethod
+    def _priority_keys(cls, lane: str) -> List[str]:
+        return [lane] + [f"{lane}:{priority}" for priority in range(1, cls.MAX_PRIORITY + 1)]
@@ -0,0 +1,127 @@
+import re
+from typing import Callable, List, Optional, Tuple
+
+# Sentence boundary: terminal punctuation (optionally followed by closing
+# quotes/brackets) and whitespace. Keeps the punctuation with the sentence.
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])["\')\]]*\s+')
+
+
+def count_tokens(text: str) -> int:
+    """
+    Whitespace word count: chunk_text's default when no count_batch is given.
+
+    Not a token count: model limits and token stats use TokenCounter.
+    """
+    return len(text.split())
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences on terminal punctuation.
+
+    Args:
+        text: The text to split
+
+    Returns:
+        List of non-empty, stripped sentences
+    """
+    sentences = []
+    for paragraph in re.split(r'\n\s*\n', text):
+        for sentence in _SENTENCE_BOUNDARY.split(paragraph.strip()):
+            sentence = " ".join(sentence.split())
+            if sentence:
+                sentences.append(sentence)
+    return sentences
+
+
+def _count_batch_whitespace(texts: List[str]) -> List[int]:
+    return [count_tokens(text) for text in texts]
+
+
+def _split_long_sentence(sentence: str,
+                         sentence_tokens: int,
+                         max_tokens: int,
+                         count_batch: Callable[[List[str]], List[int]]) -> Tuple[List[str], List[int]]:
+    """
+    Hard-split a single sentence that does not fit in one chunk.
+
+    Returns:
+        The pieces and their token counts. Every piece fits in max_tokens,
+        except a single word that is longer on its own.
+    """
+    words = sentence.split()
+    # Start from this sentence's tokens-per-word ratio, then shrink the word
+    # budget until the re-counted pieces fit (tokens per word vary)
+    words_per_piece = max(1, int(len(words) * max_tokens / max(sentence_tokens, 1)))
+    while True:
+        pieces = [" ".join(words[i:i + words_per_piece]) for i in range(0, len(words), words_per_piece)]
+        counts = count_batch(pieces)
+        largest = max(counts)
+        if largest <= max_tokens or words_per_piece == 1:
+            return pieces, counts
+        words_per_piece = max(1, min(words_per_piece - 1, int(words_per_piece * max_tokens / largest)))
+
+
+def chunk_text(text: str,
+               max_tokens: int,
+               overlap_sentences: int = 1,
+               count_batch: Optional[Callable[[List[str]], List[int]]] = None) -> List[str]:
+    """
+    Split text into chunks that each fit within max_tokens.
+
+    Chunks are built from whole sentences. Consecutive chunks share the last
+    `overlap_sentences` sentences of the previous chunk so context is not lost
+    at the boundary.
+
+    Args:
+        text: The text to chunk
+        max_tokens: Maximum number of tokens per chunk
+        overlap_sentences: Number of sentences repeated between chunks
+        count_batch: Counts the tokens of a list of texts in one call
+            (e.g. a model tokenizer); defaults to whitespace tokens
+
+    Returns:
+        List of chunk strings, in document order
+    """
+    count_batch = count_batch or _count_batch_whitespace
+
+    sentences = split_sentences(text)
+    counts = count_batch(sentences)
+
+    # Hard-split sentences that cannot fit in a chunk on their own
+    if any(count > max_tokens for count in counts):
+        pieces = []
+        piece_counts = []
+        for sentence, count in zip(sentences, counts):
+            if count > max_tokens:
+                split_pieces, split_counts = _split_long_sentence(sentence, count, max_tokens, count_batch)
+                pieces.extend(split_pieces)
+                piece_counts.extend(split_counts)
+            else:
+                pieces.append(sentence)
+                piece_counts.append(count)
+        sentences = pieces
+        counts = piece_counts
+
+    chunks = []
+    current: List[int] = []  # Indexes into sentences
+    current_tokens = 0
+
+    for index, sentence_tokens in enumerate(counts):
+        if current and current_tokens + sentence_tokens > max_tokens:
+            chunks.append(" ".join(sentences[i] for i in current))
+
+            # Carry the overlap into the next chunk, as long as it leaves room
+            carry = current[-overlap_sentences:] if overlap_sentences > 0 else []
+            while carry and sum(counts[i] for i in carry) + sentence_tokens > max_tokens:
+                carry = carry[1:]
+            current = list(carry)
+            current_tokens = sum(counts[i] for i in current)
+
+        current.append(index)
+        current_tokens += sentence_tokens
+
+    if current:
+        chunks.append(" ".join(sentences[i] for i in current))
+
+    return chunks
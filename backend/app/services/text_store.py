@@ -0,0 +1,244 @@
+import hashlib
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.config import settings
+from app.services.s3_service import S3Service
+
+# Session.info key of the local texts to delete when the transaction commits
+PENDING_DELETES = "text_store_pending_deletes"
+
+class TextStore:
+    """
+    Cold tier for the large texts of completed summaries.
+
+    Summaries keep their texts in the summaries table while they are
+    processed and for TEXT_STORE_OFFLOAD_AFTER_SECONDS after completion.
+    Then the offload sweep moves every text of at least
+    TEXT_STORE_MIN_CHARS characters to the blob store (S3 through
+    S3Service, or a local directory as a stand-in) and leaves a preview,
+    the SHA-256 of the text and the blob key in the row. Reads that need
+    the full text (GET /summaries/{id}) load it back with rehydrate.
+
+    On S3, texts are stored once per content (S3Service.store_blob), so
+    an original text also kept with its S3 summary is not uploaded again;
+    the local backend stores them per summary under
+    texts/<summary_id>/<field>.txt.
+    """
+
+    FIELDS = ("original", "summary")
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return settings.TEXT_STORE_BACKEND in ("s3", "local")
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def preview(text: Optional[str]) -> Optional[str]:
+        """Preview stored with a text: one character more than listings show, to mark truncation."""
+        if text is None:
+            return None
+        return text[:settings.SUMMARY_PREVIEW_CHARS + 1]
+
+    @staticmethod
+    def _local_path(key: str) -> str:
+        root = os.path.abspath(settings.TEXT_STORE_LOCAL_DIR)
+        path = os.path.abspath(os.path.join(root, key))
+        if not path.startswith(root + os.sep):
+            raise ValueError(f"Invalid text store key: {key}")
+        return path
+
+    @classmethod
+    def put(cls, db: Session, key: str, text: str) -> Optional[str]:
+        """
+        Store a text under key (S3: under the key of its content).
+
+        Returns:
+            The key the text is stored under, or None if failed
+        """
+        if settings.TEXT_STORE_BACKEND == "s3":
+            return S3Service.store_blob(db, text)
+
+        try:
+            path = cls._local_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename, so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+            return key
+        except Exception as e:
+            print(f"Error storing text in local text store: {e}")
+            return None
+
+    @classmethod
+    def get(cls, key: str) -> Optional[str]:
+        if settings.TEXT_STORE_BACKEND == "s3":
+            return S3Service.get_text(key)
+
+        try:
+            with open(cls._local_path(key), encoding="utf-8") as f:
+                return f.read()
+        except Exception as e:
+            print(f"Error reading text from local text store: {e}")
+            return None
+
+    @classmethod
+    def get_many(cls, keys: List[str]) -> Dict[str, Optional[str]]:
+        """Read several texts (concurrently on S3); None where a read failed."""
+        if settings.TEXT_STORE_BACKEND == "s3":
+            return S3Service.get_texts(keys)
+        return {key: cls.get(key) for key in keys}
+
+    @classmethod
+    def delete(cls, db: Session, key: str) -> bool:
+        if settings.TEXT_STORE_BACKEND == "s3":
+            return S3Service.release_blob(db, key)
+
+        return cls._remove_local(key)
+    
+    @classmethod
+    def _remove_local(cls, key: str) -> bool:
+        try:
+            os.remove(cls._local_path(key))
+            return True
+        except FileNotFoundError:
+            return True
+        except Exception as e:
+            print(f"Error deleting text from local text store: {e}")
+            return False
+    
+    @staticmethod
+    def delete_after_commit(db: Session, keys: List[str]) -> None:
+        """Delete local texts once the session's transaction commits (not if it rolls back)."""
+        db.info.setdefault(PENDING_DELETES, []).extend(keys)
+
+    @classmethod
+    def offload(cls, summary) -> bool:
+        """
+        Move a summary's large texts to the blob store.
+
+        Every text gets its hash recorded (which also marks the summary as
+        swept); texts shorter than TEXT_STORE_MIN_CHARS stay in the row.
+        If a text cannot be stored, the summary is left unswept, with every
+        text in the row, and the next sweep retries it. Does not commit.
+
+        Returns:
+            Whether any text was moved
+        """
+        db = Session.object_session(summary)
+        keys = {}
+        for field in cls.FIELDS:
+            text = getattr(summary, f"{field}_text")
+            if text is None or len(text) < settings.TEXT_STORE_MIN_CHARS:
+                continue
+            key = cls.put(db, f"texts/{summary.id}/{field}.txt", text)
+            if key is None:
+                # Retried by the next sweep, all texts at once
+                for stored_key in keys.values():
+                    cls.delete(db, stored_key)
+                return False
+            keys[field] = key
+
+        for field in cls.FIELDS:
+            text = getattr(summary, f"{field}_text")
+            if text is None:
+                continue
+            setattr(summary, f"{field}_sha256", cls.content_hash(text))
+            setattr(summary, f"{field}_preview", cls.preview(text))
+            if field in keys:
+                setattr(summary, f"{field}_text_key", keys[field])
+                setattr(summary, f"{field}_text", None)
+        return bool(keys)
+
+    @classmethod
+    def offload_completed(cls, db: Session, limit: int) -> int:
+        """
+        Offload the texts of summaries completed long enough ago.
+
+        Returns:
+            Number of summaries swept
+        """
+        from app.models.summary import Summary
+
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.TEXT_STORE_OFFLOAD_AFTER_SECONDS)
+        summaries = db.query(Summary).filter(
+            Summary.status == "completed",
+            Summary.completed_at < cutoff,
+            Summary.original_sha256.is_(None),
+            Summary.original_text.isnot(None),
+        ).order_by(Summary.completed_at).limit(limit).with_for_update(skip_locked=True).all()
+
+        for summary in summaries:
+            cls.offload(summary)
+        db.commit()
+        return len(summaries)
+
+    @classmethod
+    def rehydrate(cls, summary) -> None:
+        """
+        Load offloaded texts back onto a summary.
+
+        The texts are set as loaded values, so the row is not rewritten
+        if the session commits afterwards. A text that cannot be read or
+        does not match its hash is left empty (its preview remains).
+        """
+        keys = {}
+        for field in cls.FIELDS:
+            key = getattr(summary, f"{field}_text_key")
+            if key and getattr(summary, f"{field}_text") is None:
+                keys[field] = key
+        if not keys:
+            return
+
+        texts = cls.get_many(list(keys.values()))
+        for field, key in keys.items():
+            text = texts.get(key)
+            if text is None:
+                continue
+            if cls.content_hash(text) != getattr(summary, f"{field}_sha256"):
+                print(f"Warning: Stored {field} text of summary {summary.id} does not match its hash")
+                continue
+            set_committed_value(summary, f"{field}_text", text)
+
+    @classmethod
+    def delete_texts(cls, summary) -> None:
+        """
+        Delete a summary's offloaded texts. Does not commit.
+        
+        The texts are only removed when the transaction commits, so a
+        rolled-back delete leaves the summary with its texts.
+        """
+        db = Session.object_session(summary)
+        keys = [
+            getattr(summary, f"{field}_text_key")
+            for field in cls.FIELDS
+            if getattr(summary, f"{field}_text_key")
+        ]
+        if settings.TEXT_STORE_BACKEND == "s3":
+            S3Service.release_blobs(db, keys)
+            return
+        cls.delete_after_commit(db, keys)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_text_deletes(session) -> None:
+    for key in session.info.pop(PENDING_DELETES, None) or []:
+        TextStore._remove_local(key)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending_text_deletes(session, transaction) -> None:
+    # Only the outermost transaction ending without a commit drops them
+    if transaction.parent is None:
+        session.info.pop(PENDING_DELETES, None)
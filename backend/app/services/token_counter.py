@@ -0,0 +1,145 @@
+import os
+import re
+import threading
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+try:
+    from tokenizers import Tokenizer
+except ImportError:  # Fall back to the approximator
+    Tokenizer = None
+
+# Words (letters/digits/underscore) and single punctuation marks, which
+# subword tokenizers almost always emit as separate tokens
+_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+class TokenCounter:
+    """
+    Per-model token counting.
+
+    Uses the model's real tokenizer when its `tokenizer.json` is available
+    under TOKENIZER_DIR/<model_id>/, otherwise a fast approximator
+    calibrated to the model's vocabulary: short words are single tokens
+    in these vocabularies, longer words split into subwords of roughly
+    `chars_per_token` characters, and punctuation is its own token.
+    Tokenizers are loaded once per process and cached.
+    """
+
+    # Approximator calibration per model (BPE for BART, SentencePiece for
+    # T5/Pegasus). special_tokens is what the tokenizer adds per sequence.
+    CALIBRATION: Dict[str, Dict[str, float]] = {
+        "bart-cnn": {"whole_word_max_chars": 7, "chars_per_token": 3.6, "special_tokens": 2},
+        "t5-base": {"whole_word_max_chars": 6, "chars_per_token": 3.3, "special_tokens": 1},
+        "pegasus": {"whole_word_max_chars": 7, "chars_per_token": 3.5, "special_tokens": 1},
+    }
+    DEFAULT_CALIBRATION = {"whole_word_max_chars": 7, "chars_per_token": 3.5, "special_tokens": 0}
+
+    _tokenizers: Dict[str, Any] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_tokenizer(cls, model_id: str) -> Optional[Any]:
+        """
+        Get the cached tokenizer for a model, loading it on first use.
+
+        Returns:
+            The tokenizer, or None if no tokenizer file is available
+        """
+        if model_id in cls._tokenizers:
+            return cls._tokenizers[model_id]
+
+        with cls._lock:
+            if model_id not in cls._tokenizers:
+                cls._tokenizers[model_id] = cls._load_tokenizer(model_id)
+            return cls._tokenizers[model_id]
+
+    @staticmethod
+    def _load_tokenizer(model_id: str) -> Optional[Any]:
+        if Tokenizer is None or not settings.TOKENIZER_DIR:
+            return None
+
+        path = os.path.join(settings.TOKENIZER_DIR, model_id, "tokenizer.json")
+        if not os.path.exists(path):
+            return None
+
+        try:
+            tokenizer = Tokenizer.from_file(path)
+            tokenizer.no_truncation()
+            tokenizer.no_padding()
+            return tokenizer
+        except Exception as e:
+            print(f"Warning: Could not load tokenizer for {model_id}: {e}")
+            return None
+
+    @classmethod
+    def preload(cls, model_ids: List[str]) -> None:
+        """Load tokenizers up front, e.g. once per worker process."""
+        for model_id in model_ids:
+            cls.get_tokenizer(model_id)
+
+    @classmethod
+    def count(cls, text: str, model_id: str, add_special_tokens: bool = True) -> int:
+        """
+        Count the tokens of a text for a model.
+
+        Args:
+            text: The text to count
+            model_id: The model whose tokenizer applies
+            add_special_tokens: Include the tokens the model adds per sequence
+
+        Returns:
+            Number of tokens
+        """
+        return cls.count_batch([text], model_id, add_special_tokens)[0]
+
+    @classmethod
+    def count_batch(cls, texts: List[str], model_id: str, add_special_tokens: bool = True) -> List[int]:
+        """
+        Count the tokens of many texts in one call.
+
+        Args:
+            texts: The texts to count
+            model_id: The model whose tokenizer applies
+            add_special_tokens: Include the tokens the model adds per sequence
+
+        Returns:
+            Number of tokens per text, in order
+        """
+        if not texts:
+            return []
+
+        tokenizer = cls.get_tokenizer(model_id)
+        if tokenizer is not None:
+            encodings = tokenizer.encode_batch(list(texts), add_special_tokens=add_special_tokens)
+            return [len(encoding.ids) for encoding in encodings]
+
+        return cls._approximate_batch(texts, model_id, add_special_tokens)
+
+    @classmethod
+    def _approximate_batch(cls, texts: List[str], model_id: str, add_special_tokens: bool) -> List[int]:
+        """Vectorized approximate count over all pieces of all texts."""
+        calibration = cls.CALIBRATION.get(model_id, cls.DEFAULT_CALIBRATION)
+
+        piece_lengths: List[int] = []
+        pieces_per_text = np.zeros(len(texts), dtype=np.int64)
+        for i, text in enumerate(texts):
+            pieces = _PIECE_PATTERN.findall(text)
+            pieces_per_text[i] = len(pieces)
+            piece_lengths.extend(len(piece) for piece in pieces)
+
+        lengths = np.asarray(piece_lengths, dtype=np.float64)
+        costs = np.where(
+            lengths <= calibration["whole_word_max_chars"],
+            1.0,
+            np.ceil(lengths / calibration["chars_per_token"])
+        )
+        text_index = np.repeat(np.arange(len(texts)), pieces_per_text)
+        counts = np.bincount(text_index, weights=costs, minlength=len(texts))
+
+        if add_special_tokens:
+            counts = counts + calibration["special_tokens"]
+        return [int(count) for count in counts]
@@ -0,0 +1,236 @@
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+import redis
+
+from app.core.config import settings
+from app.models.latency_histogram import LatencyHistogramBin
+from app.models.usage_statistics import UsageStatistics
+from app.services.latency_histogram import LatencyHistogram
+
+# Move a bucket's counters (and its max latency) to a flushing key, so
+# increments that arrive during the flush start a fresh hash
+_ROTATE_SCRIPT = """
+redis.call('SREM', KEYS[2], ARGV[1])
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('RENAME', KEYS[1], KEYS[3])
+local max_latency = redis.call('ZSCORE', KEYS[4], ARGV[1])
+if max_latency then
+    redis.call('HSET', KEYS[3], 'max_latency_ms', max_latency)
+    redis.call('ZREM', KEYS[4], ARGV[1])
+end
+redis.call('HSET', KEYS[3], 'bucket', ARGV[1])
+redis.call('SADD', KEYS[5], KEYS[3])
+return 1
+"""
+
+# Add an infrastructure sample to a bucket: sum the CPU, keep the maxima
+# (ARGV: bucket, cpu percent, then field/value pairs of maxima)
+_INFRA_SAMPLE_SCRIPT = """
+redis.call('HINCRBY', KEYS[1], 'infra_samples', 1)
+redis.call('HINCRBYFLOAT', KEYS[1], 'cpu_percent_sum', ARGV[2])
+for i = 3, #ARGV, 2 do
+    local current = tonumber(redis.call('HGET', KEYS[1], ARGV[i]) or '0')
+    if tonumber(ARGV[i + 1]) > current then
+        redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+    end
+end
+redis.call('SADD', KEYS[2], ARGV[1])
+return 1
+"""
+
+
+class UsageStatsBuffer:
+    """
+    Buffers usage statistics in Redis and flushes them to the database.
+
+    The hot path (record) is one pipelined round-trip of atomic increments
+    on a per-hour hash, plus a ZADD GT for the maximum latency. The
+    flush_usage_statistics beat task moves each hour's counters aside and
+    adds them to its usage_statistics row with a single upsert.
+
+    The same hash holds the hour's per-model latency histograms, as fields
+    "lat:<model_id>:<bin>", flushed to latency_histogram_bins. Counters
+    being flushed stay in Redis until the upsert commits, so a failed
+    flush is retried.
+    """
+
+    KEY_PREFIX = "usage_stats:"
+    BUCKETS_KEY = "usage_stats:buckets"
+    MAX_LATENCY_KEY = "usage_stats:max_latency"
+    FLUSHING_KEY = "usage_stats:flushing"
+
+    INT_FIELDS = ["requests", "successes", "failures", "cache_hits", "tokens", "latency_sum_ms", "infra_samples"]
+    FLOAT_FIELDS = ["cost", "max_latency_ms", "cpu_percent_sum", "memory_mb_max", "peak_concurrent_max", "queue_depth_max"]
+    LATENCY_FIELD_PREFIX = "lat:"
+
+    _redis_client: Optional[redis.Redis] = None
+
+    @classmethod
+    def _get_redis(cls) -> Optional[redis.Redis]:
+        if not settings.REDIS_URL:
+            return None
+        if cls._redis_client is None:
+            cls._redis_client = redis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_timeout=0.5,
+                socket_connect_timeout=0.5,
+            )
+        return cls._redis_client
+
+    @staticmethod
+    def current_bucket() -> str:
+        """Hour bucket of now, as YYYYMMDDHH (UTC)."""
+        return datetime.utcnow().strftime("%Y%m%d%H")
+
+    @staticmethod
+    def bucket_start(bucket: str) -> datetime:
+        return datetime.strptime(bucket, "%Y%m%d%H").replace(tzinfo=timezone.utc)
+
+    @classmethod
+    def record(cls,
+               counters: Dict[str, Any],
+               bucket: Optional[str] = None,
+               model_id: Optional[str] = None,
+               latency_ms: Optional[float] = None) -> bool:
+        """
+        Add one task's counters to the current hour's buffer.
+
+        Args:
+            counters: Counter increments (see UsageStatistics.upsert_hourly)
+            bucket: Hour bucket, defaults to the current hour
+            model_id: Model of the task, for the latency histogram
+            latency_ms: Processing time of the task, for the latency histogram
+
+        Returns:
+            False if Redis is unavailable and the caller must write directly
+        """
+        client = cls._get_redis()
+        if client is None:
+            return False
+
+        bucket = bucket or cls.current_bucket()
+        key = cls.KEY_PREFIX + bucket
+        try:
+            # MULTI/EXEC: still one round-trip, and a flush never sees half of it
+            pipe = client.pipeline(transaction=True)
+            for field in cls.INT_FIELDS:
+                if counters.get(field):
+                    pipe.hincrby(key, field, int(counters[field]))
+            if counters.get("cost"):
+                pipe.hincrbyfloat(key, "cost", float(counters["cost"]))
+            if model_id and latency_ms is not None:
+                pipe.hincrby(key, cls.latency_field(model_id, latency_ms), 1)
+            if counters.get("max_latency_ms"):
+                pipe.zadd(cls.MAX_LATENCY_KEY, {bucket: float(counters["max_latency_ms"])}, gt=True)
+            pipe.sadd(cls.BUCKETS_KEY, bucket)
+            pipe.execute()
+            return True
+        except redis.RedisError as e:
+            print(f"Warning: Could not buffer usage statistics: {e}")
+            return False
+
+    @classmethod
+    def record_infra_sample(cls, sample: Dict[str, Any], bucket: Optional[str] = None) -> bool:
+        """
+        Add an InfraSampler sample to the current hour's buffer.
+
+        Returns:
+            False if Redis is unavailable and the caller must write directly
+        """
+        client = cls._get_redis()
+        if client is None:
+            return False
+
+        bucket = bucket or cls.current_bucket()
+        try:
+            client.eval(
+                _INFRA_SAMPLE_SCRIPT, 2, cls.KEY_PREFIX + bucket, cls.BUCKETS_KEY,
+                bucket, sample["cpu_percent"],
+                "memory_mb_max", sample["memory_mb"],
+                "peak_concurrent_max", sample["peak_concurrent"],
+                "queue_depth_max", sample["queue_depth"],
+            )
+            return True
+        except redis.RedisError as e:
+            print(f"Warning: Could not buffer infrastructure sample: {e}")
+            return False
+
+    @classmethod
+    def infra_counters(cls, sample: Dict[str, Any]) -> Dict[str, Any]:
+        """A single sample as upsert counters, for writing without Redis."""
+        return {
+            "infra_samples": 1,
+            "cpu_percent_sum": sample["cpu_percent"],
+            "memory_mb_max": sample["memory_mb"],
+            "peak_concurrent_max": sample["peak_concurrent"],
+            "queue_depth_max": sample["queue_depth"],
+        }
+
+    @classmethod
+    def latency_field(cls, model_id: str, latency_ms: float) -> str:
+        return f"{cls.LATENCY_FIELD_PREFIX}{model_id}:{LatencyHistogram.bin_index(latency_ms)}"
+
+    @classmethod
+    def flush(cls, db) -> Dict[str, Any]:
+        """
+        Write buffered counters to usage_statistics, one upsert per hour.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Dict with the buckets flushed and requests written
+        """
+        client = cls._get_redis()
+        if client is None:
+            return {"buckets": [], "requests": 0}
+
+        # Rotate every bucket with counters, then flush everything rotated,
+        # including leftovers of earlier failed flushes
+        for bucket in client.smembers(cls.BUCKETS_KEY):
+            bucket = bucket.decode("utf-8")
+            flushing_key = f"{cls.KEY_PREFIX}flushing:{bucket}:{uuid.uuid4().hex}"
+            client.eval(
+                _ROTATE_SCRIPT, 5,
+                cls.KEY_PREFIX + bucket, cls.BUCKETS_KEY, flushing_key, cls.MAX_LATENCY_KEY, cls.FLUSHING_KEY,
+                bucket,
+            )
+
+        flushed: List[str] = []
+        requests = 0
+        for flushing_key in client.smembers(cls.FLUSHING_KEY):
+            raw = client.hgetall(flushing_key)
+            if not raw:
+                client.srem(cls.FLUSHING_KEY, flushing_key)
+                continue
+
+            values = {key.decode("utf-8"): value.decode("utf-8") for key, value in raw.items()}
+            counters: Dict[str, Any] = {field: int(values.get(field, 0)) for field in cls.INT_FIELDS}
+            counters.update({field: float(values.get(field, 0.0)) for field in cls.FLOAT_FIELDS})
+
+            histograms: Dict[str, Dict[int, int]] = {}
+            for field, value in values.items():
+                if field.startswith(cls.LATENCY_FIELD_PREFIX):
+                    model_id, index = field[len(cls.LATENCY_FIELD_PREFIX):].rsplit(":", 1)
+                    histograms.setdefault(model_id, {})[int(index)] = int(value)
+
+            try:
+                bucket_start = cls.bucket_start(values["bucket"])
+                UsageStatistics.upsert_hourly(db, bucket_start, counters)
+                LatencyHistogramBin.upsert_counts(db, bucket_start, histograms)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                print(f"Error flushing usage statistics for {values.get('bucket')}: {e}")
+                continue
+
+            client.delete(flushing_key)
+            client.srem(cls.FLUSHING_KEY, flushing_key)
+            flushed.append(values["bucket"])
+            requests += counters["requests"]
+
+        return {"buckets": flushed, "requests": requests}
@@ -0,0 +1,98 @@
+"""
+Throughput comparison: per-task inference vs micro-batched inference.
+
+Runs a backlog of summaries through HuggingFaceService against the
+in-process mock backend, once with one inference request per summary (the
+per-task mode of process_summary) and once with batched requests (the
+process_summary_batch mode), using the same number of concurrent workers.
+
+Usage:
+    python benchmark_batching.py --summaries 400 --workers 4 --batch-sizes 1 4 8 16
+
+The mock's cost model is MOCK_LATENCY_MS per request plus
+MOCK_BATCH_ITEM_LATENCY_MS per extra input; set them to match measurements
+of the real endpoint (--latency-ms / --batch-item-latency-ms).
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def make_texts(count):
+    return [
+        f"Report {i} describes the quarterly results of the company. "
+        f"Revenue grew in region {i % 7} while costs stayed flat. "
+        f"The board approved plan number {i} for the next year."
+        for i in range(count)
+    ]
+
+
+def run(texts, workers, batch_size):
+    from app.services.huggingface_service import HuggingFaceService
+
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    latencies = []
+
+    def process(batch):
+        start = time.time()
+        if batch_size == 1:
+            results = [HuggingFaceService.get_summary(batch[0], "bart-cnn", use_cache=False)]
+        else:
+            results = HuggingFaceService.get_summary_batch(batch, "bart-cnn")
+        elapsed_ms = (time.time() - start) * 1000
+        return [elapsed_ms] * len(batch), sum(1 for result in results if result.get("success"))
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        succeeded = 0
+        for batch_latencies, batch_succeeded in executor.map(process, batches):
+            latencies.extend(batch_latencies)
+            succeeded += batch_succeeded
+    elapsed = time.time() - start
+
+    return {
+        "throughput": len(texts) / elapsed,
+        "requests": len(batches),
+        "succeeded": succeeded,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-task and micro-batched inference throughput")
+    parser.add_argument("--summaries", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent worker processes to simulate")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--latency-ms", type=int, default=300)
+    parser.add_argument("--batch-item-latency-ms", type=int, default=20)
+    args = parser.parse_args()
+
+    # Configure before the app modules read their settings
+    os.environ.update({
+        "INFERENCE_BACKEND": "mock",
+        "HUGGINGFACE_API_KEY": "benchmark",
+        "REDIS_URL": "",
+        "SUMMARY_CACHE_ENABLED": "False",
+        "MOCK_LATENCY_MS": str(args.latency_ms),
+        "MOCK_BATCH_ITEM_LATENCY_MS": str(args.batch_item_latency_ms),
+    })
+
+    texts = make_texts(args.summaries)
+    print(f"{args.summaries} summaries, {args.workers} workers, "
+          f"{args.latency_ms} ms/request + {args.batch_item_latency_ms} ms/extra input")
+    print(f"{'batch':>5} {'requests':>8} {'summaries/s':>12} {'p50 ms':>8} {'p99 ms':>8} {'speedup':>8}")
+
+    baseline = None
+    for batch_size in args.batch_sizes:
+        result = run(texts, args.workers, batch_size)
+        baseline = baseline or result["throughput"]
+        print(f"{batch_size:>5} {result['requests']:>8} {result['throughput']:>12.1f} "
+              f"{result['p50_ms']:>8.0f} {result['p99_ms']:>8.0f} {result['throughput'] / baseline:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Storage comparison: per-summary JSON objects vs the compressed,
+content-addressed layout of S3Service.
+
+Builds the S3 objects a corpus of summaries produces in both layouts and
+reports the bytes stored and the PUT latency:
+
+- plain: one uncompressed JSON object per summary, original text inline
+- content-addressed: gzip-compressed JSON per summary referring to the
+  original text, stored gzip-compressed once per distinct text
+
+Usage:
+    python benchmark_s3_layout.py --corpus ./texts --summaries 2000 --duplicate-rate 0.2
+    python benchmark_s3_layout.py --summaries 500 --s3
+
+--corpus takes a directory of .txt files (e.g. exported original texts);
+without it a synthetic corpus of article-like texts is generated, which
+compresses less well than real prose. --duplicate-rate is the share of
+summaries whose text was already submitted (resubmissions, the same
+article summarized with several models). Without --s3 only the object
+sizes and the compression time are measured; with --s3 the objects are
+uploaded to S3_BUCKET_NAME under benchmark/<run id>/ and deleted after.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import random
+import time
+import uuid
+
+import numpy as np
+
+WORDS = (
+    "the company reported quarterly revenue growth in its cloud division while operating costs "
+    "rose slightly analysts expected stronger margins after the board approved a new plan to "
+    "expand into european markets and invest in research customers responded to the product "
+    "launch with record orders although supply constraints limited shipments during the period"
+).split()
+
+
+def load_corpus(directory):
+    texts = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".txt"):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                texts.append(f.read())
+    if not texts:
+        raise SystemExit(f"No .txt files in {directory}")
+    return texts
+
+
+def make_corpus(count, rng):
+    texts = []
+    for i in range(count):
+        sentences = []
+        for _ in range(rng.randint(15, 80)):
+            words = rng.choices(WORDS, k=rng.randint(8, 25))
+            sentences.append(" ".join(words).capitalize() + f" ({i}).")
+        texts.append(" ".join(sentences))
+    return texts
+
+
+def make_summaries(texts, count, duplicate_rate, rng):
+    summaries = []
+    for i in range(count):
+        if summaries and rng.random() < duplicate_rate:
+            original = rng.choice(summaries)["original_text"]
+        else:
+            original = texts[i % len(texts)]
+        summaries.append({
+            "id": i + 1,
+            "summary_text": original[:rng.randint(200, 600)],
+            "original_text": original,
+            "model_used": "facebook/bart-large-cnn",
+            "processing_time_ms": rng.randint(800, 4000),
+            "tokens": {"input": len(original) // 4, "output": 100},
+            "timestamp": "2024-01-01T00:00:00",
+        })
+    return summaries
+
+
+def plain_objects(summaries):
+    for summary in summaries:
+        yield f"summaries/{summary['id']}.json", json.dumps(summary).encode("utf-8"), {}
+
+
+def content_addressed_objects(summaries, level):
+    stored = set()
+    for summary in summaries:
+        content = dict(summary)
+        raw = content.pop("original_text").encode("utf-8")
+        sha256 = hashlib.sha256(raw).hexdigest()
+        key = f"blobs/{sha256[:2]}/{sha256}.txt.gz"
+        if sha256 not in stored:
+            stored.add(sha256)
+            yield key, gzip.compress(raw, compresslevel=level, mtime=0), {"ContentEncoding": "gzip"}
+        content["original_text_key"] = key
+        body = gzip.compress(json.dumps(content).encode("utf-8"), compresslevel=level, mtime=0)
+        yield f"summaries/{summary['id']}.json.gz", body, {"ContentEncoding": "gzip"}
+
+
+def run(name, objects, upload, prefix):
+    if upload:
+        from s3_utils import s3_client, S3_BUCKET_NAME
+
+    count = stored_bytes = 0
+    put_latencies = []
+    keys = []
+    start = time.time()
+    for key, body, extra in objects:
+        count += 1
+        stored_bytes += len(body)
+        if upload:
+            put_start = time.time()
+            s3_client.put_object(Bucket=S3_BUCKET_NAME, Key=prefix + key, Body=body, **extra)
+            put_latencies.append((time.time() - put_start) * 1000)
+            keys.append(prefix + key)
+    elapsed = time.time() - start
+
+    if keys:
+        for i in range(0, len(keys), 1000):
+            s3_client.delete_objects(
+                Bucket=S3_BUCKET_NAME,
+                Delete={"Objects": [{"Key": key} for key in keys[i:i + 1000]], "Quiet": True}
+            )
+
+    result = {"name": name, "objects": count, "bytes": stored_bytes, "seconds": elapsed}
+    if put_latencies:
+        result["put_p50_ms"] = float(np.percentile(put_latencies, 50))
+        result["put_p95_ms"] = float(np.percentile(put_latencies, 95))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="Directory of .txt files (default: synthetic texts)")
+    parser.add_argument("--summaries", type=int, default=2000)
+    parser.add_argument("--duplicate-rate", type=float, default=0.2)
+    parser.add_argument("--level", type=int, default=6, help="gzip compression level")
+    parser.add_argument("--s3", action="store_true", help="Upload to S3_BUCKET_NAME and measure PUT latency")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = load_corpus(args.corpus) if args.corpus else make_corpus(args.summaries, rng)
+    summaries = make_summaries(texts, args.summaries, args.duplicate_rate, rng)
+    distinct = len({summary["original_text"] for summary in summaries})
+    print(f"{len(summaries)} summaries, {distinct} distinct original texts")
+
+    prefix = f"benchmark/{uuid.uuid4().hex[:8]}/"
+    results = [
+        run("plain", plain_objects(summaries), args.s3, prefix),
+        run("content-addressed", content_addressed_objects(summaries, args.level), args.s3, prefix),
+    ]
+
+    baseline = results[0]
+    print(f"{'layout':<18} {'objects':>8} {'MB':>9} {'ratio':>7} {'seconds':>8} {'put p50':>8} {'put p95':>8}")
+    for result in results:
+        print(
+            f"{result['name']:<18} {result['objects']:>8} {result['bytes'] / 1e6:>9.2f} "
+            f"{baseline['bytes'] / result['bytes']:>6.1f}x {result['seconds']:>8.2f} "
+            f"{result.get('put_p50_ms', float('nan')):>8.1f} {result.get('put_p95_ms', float('nan')):>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,33 @@
 import os
 import time
 import json
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Dict, Any, List
 from celery import Celery
+from kombu import Queue
+from celery.signals import task_postrun, task_prerun, worker_init, worker_process_init, worker_process_shutdown
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.metrics import CELERY_TASK_DURATION, mark_process_dead, start_metrics_server
+from app.core.tracing import current_trace, record_span, span, start_trace
 from app.db.base import SessionLocal
 from app.models.summary import Summary
+from app.models.latency_histogram import LatencyHistogramBin
 from app.models.usage_statistics import UsageStatistics
+from app.models.user_summary_counts import UserSummaryCounts
+from app.services.http_client import InferenceHTTPClient
 from app.services.huggingface_service import HuggingFaceService
+from app.services.inference_batcher import InferenceBatcher
+from app.services.infra_sampler import InfraSampler
+from app.services.latency_histogram import LatencyHistogram
+from app.services.resilience import RetryBudget, backoff_delay
+from app.services.s3_io import S3IO
 from app.services.s3_service import S3Service
+from app.services.single_flight import SingleFlight
+from app.services.task_router import TaskRouter
+from app.services.text_store import TextStore
+from app.services.usage_stats_buffer import UsageStatsBuffer
 
 # Initialize Celery
 celery = Celery(__name__)
@@ -29,21 +46,153 @@ celery.conf.update(
     task_reject_on_worker_lost=True,
     task_soft_time_limit=300,  # 5 minutes
     task_time_limit=600,  # 10 minutes
+    # Length-aware lanes, each served by its own worker pool (see TaskRouter)
+    task_queues=[Queue(lane, routing_key=lane) for lane in TaskRouter.LANES],
+    task_default_queue=TaskRouter.STANDARD,
+    task_routes={
+        # The warmer blocks on wait_for_model while a model loads: keep it
+        # with the long-running tasks, off the short-inference fast lane
+        "warm_idle_models": {"queue": TaskRouter.LONG},
+        "flush_usage_statistics": {"queue": TaskRouter.FAST},
+    },
+    # Priorities 0 (highest) to 9, one broker list per level: "<queue>:<n>"
+    broker_transport_options={
+        "priority_steps": list(range(TaskRouter.MAX_PRIORITY + 1)),
+        "sep": ":",
+        "queue_order_strategy": "priority",
+    },
 )
 
+celery.conf.beat_schedule = {
+    "flush-usage-statistics": {
+        "task": "flush_usage_statistics",
+        "schedule": settings.USAGE_STATS_FLUSH_INTERVAL_SECONDS,
+        "options": {"expires": settings.USAGE_STATS_FLUSH_INTERVAL_SECONDS},
+    },
+    "reconcile-summary-counts": {
+        "task": "reconcile_summary_counts",
+        "schedule": settings.SUMMARY_COUNTS_RECONCILE_INTERVAL_SECONDS,
+        "options": {"expires": settings.SUMMARY_COUNTS_RECONCILE_INTERVAL_SECONDS},
+    },
+}
+
+if TextStore.is_enabled():
+    celery.conf.beat_schedule["offload-summary-texts"] = {
+        "task": "offload_summary_texts",
+        "schedule": settings.TEXT_STORE_SWEEP_INTERVAL_SECONDS,
+        "options": {"expires": settings.TEXT_STORE_SWEEP_INTERVAL_SECONDS},
+    }
+
+if settings.S3_BUCKET_NAME:
+    celery.conf.beat_schedule["collect-unreferenced-blobs"] = {
+        "task": "collect_unreferenced_blobs",
+        "schedule": settings.S3_BLOB_GC_INTERVAL_SECONDS,
+        "options": {"expires": settings.S3_BLOB_GC_INTERVAL_SECONDS},
+    }
+
+if settings.MODEL_WARMER_ENABLED:
+    celery.conf.beat_schedule["warm-idle-models"] = {
+        "task": "warm_idle_models",
+        "schedule": settings.MODEL_WARM_INTERVAL_SECONDS,
+        # A keep-alive that waits past the next run is pointless
+        "options": {"expires": settings.MODEL_WARM_INTERVAL_SECONDS},
+    }
+
+@worker_init.connect
+def init_worker(**kwargs):
+    """Serve the metrics of all worker processes from the main process."""
+    try:
+        start_metrics_server(settings.CELERY_METRICS_PORT)
+    except OSError as e:
+        print(f"Warning: Could not start metrics server on port {settings.CELERY_METRICS_PORT}: {e}")
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Set up per-process inference resources once per worker process."""
+    InferenceHTTPClient.init()
+    HuggingFaceService.preload_tokenizers()
+    InfraSampler.start()
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    """Close pooled connections when a worker process exits, after pending S3 uploads."""
+    InfraSampler.stop()
+    InferenceHTTPClient.close()
+    S3IO.shutdown(wait=True)
+    mark_process_dead(os.getpid())
+
+# Start times of the tasks running in this process, by task id
+_task_started_at: Dict[str, float] = {}
+
+@task_prerun.connect
+def count_task_started(task_id=None, **kwargs):
+    InfraSampler.request_started()
+    _task_started_at[task_id] = time.perf_counter()
+
+@task_postrun.connect
+def count_task_finished(task_id=None, task=None, state=None, **kwargs):
+    InfraSampler.request_finished()
+    started_at = _task_started_at.pop(task_id, None)
+    if started_at is not None and task is not None:
+        CELERY_TASK_DURATION.labels(task=task.name, state=state or "UNKNOWN").observe(
+            time.perf_counter() - started_at
+        )
+
+@celery.task(name="inference_http_stats")
+def inference_http_stats():
+    """Report connection-reuse counters of the worker process that runs it."""
+    return InferenceHTTPClient.get_stats()
+
+@celery.task(name="warm_idle_models")
+def warm_idle_models():
+    """Send keep-alive inferences to models close to their idle timeout (run by beat)."""
+    return HuggingFaceService.warm_idle_models()
+
 @celery.task(name="process_summary", bind=True, max_retries=3)
-def process_summary(self, summary_id: int):
+def process_summary(self, summary_id: int, batchable: bool = True, lane: str = None, user_id: int = None):
     """
     Process a summary task asynchronously.
     
+    When inference batching is enabled, summaries that fit in a single
+    request are handed to the batching stage instead (see
+    process_summary_batch) and this task returns right away.
+    
     Args:
         summary_id: The ID of the summary to process
+        batchable: Whether the summary may be processed in a batch
+        lane: The TaskRouter lane the task was routed to, if any
+        user_id: The user whose lane slot the task holds, if any
     
     Returns:
         Dict with status and summary information
     """
+    # Continue the trace of the request that created the summary
+    with start_trace(_task_header(self.request, "trace_id"), name="process_summary") as trace:
+        return _process_summary(self, trace, summary_id, batchable, lane, user_id)
+
+def _task_header(request, name: str):
+    """A custom message header of the running task (see enqueue_summary)."""
+    value = getattr(request, name, None)
+    if value is None:
+        # Eagerly applied tasks keep custom headers apart
+        value = (getattr(request, "headers", None) or {}).get(name)
+    return value
+
+def _elapsed_ms_since(moment: datetime) -> int:
+    """Milliseconds from a (naive UTC or aware) datetime until now."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return max(0, int((datetime.utcnow() - moment).total_seconds() * 1000))
+
+def _process_summary(self, trace, summary_id: int, batchable: bool, lane: str, user_id: int):
+    # The task has left its queue: free the user's fair-share slot before
+    # anything can return early or fail. Retries of the task hold no slot.
+    if lane and user_id is not None and self.request.retries == 0:
+        TaskRouter.release(lane, user_id)
+    
     db = SessionLocal()
     start_time = time.time()
+    summary = None
     
     try:
         # Get the summary from the database
@@ -51,102 +200,66 @@ def process_summary(self, summary_id: int):
         if not summary:
             return {"error": "Summary not found", "summary_id": summary_id}
         
+        # Cancelled (a batch that could not be fully enqueued) or already done
+        if summary.status in ("completed", "failed"):
+            return {"status": summary.status, "summary_id": summary.id}
+        
+        # Tasks re-sent without headers still belong to the summary's trace
+        if summary.trace_id and not _task_header(self.request, "trace_id"):
+            trace.trace_id = summary.trace_id
+        
+        # Time spent waiting in the queue
+        if self.request.retries == 0:
+            enqueued_at = _task_header(self.request, "enqueued_at")
+            if enqueued_at:
+                record_span("queued", enqueued_at)
+                summary.queued_ms = max(0, int((time.time() - enqueued_at) * 1000))
+        
         # Update processing start time
         summary.processing_started_at = datetime.utcnow()
-        summary.status = "processing"
-        db.commit()
+        UserSummaryCounts.set_status(db, summary, "processing")
+        with span("db", operation="start"):
+            db.commit()
         
         # Get model configuration
         model_id = summary.model_used if summary.model_used in HuggingFaceService.MODELS else HuggingFaceService.DEFAULT_MODEL
         
-        # Call Hugging Face API for text summarization
-        result = HuggingFaceService.get_summary(
-            text=summary.original_text,
-            model_id=model_id,
-            max_length=summary.max_length,
-            min_length=summary.min_length
-        )
-        
-        # Calculate processing time
-        processing_time_ms = int((time.time() - start_time) * 1000)
-        
-        # Update the summary in the database
-        if not result.get("success"):
-            summary.status = "failed"
-            summary.error_message = result.get("error", "Unknown error")
-        else:
-            # Get the summary text
-            summary_text = result.get("summary", "")
-            summary.summary_text = summary_text
-            summary.status = "completed"
-            summary.completed_at = datetime.utcnow()
-            
-            # Update statistics
-            if "stats" in result:
-                stats = result["stats"]
-                summary.processing_time_ms = stats.get("processing_time_ms", processing_time_ms)
-                summary.original_tokens = stats.get("input_tokens", 0)
-                summary.summary_tokens = stats.get("output_tokens", 0)
-                
-                # Estimate cost (placeholder - adjust based on your actual pricing model)
-                cost_per_1k_tokens = 0.0004  # Example cost
-                total_tokens = (summary.original_tokens or 0) + (summary.summary_tokens or 0)
-                summary.processing_cost = (total_tokens / 1000) * cost_per_1k_tokens
-            else:
-                summary.processing_time_ms = processing_time_ms
-                
-            # Store the full summary in S3 for better scalability
-            if summary_text:
-                try:
-                    # Prepare summary data for S3
-                    summary_data = {
-                        "id": summary.id,
-                        "summary_text": summary_text,
-                        "original_text": summary.original_text,
-                        "model_used": summary.model_used,
-                        "processing_time_ms": summary.processing_time_ms,
-                        "tokens": {
-                            "input": summary.original_tokens,
-                            "output": summary.summary_tokens
-                        },
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
-                    
-                    # Upload to S3
-                    s3_key = S3Service.store_summary(summary.id, summary_data)
-                    
-                    # Save the S3 reference in the database
-                    if s3_key:
-                        summary.s3_location = s3_key
-                except Exception as s3_error:
-                    print(f"Warning: Could not store summary in S3: {s3_error}")
-        
-        # Update usage statistics
-        try:
-            update_usage_statistics(db, summary, result.get("success", False))
-        except Exception as stats_error:
-            print(f"Error updating statistics: {stats_error}")
-        
-        # Save changes
-        db.commit()
+        # Micro-batching: queue the summary and let the batch task run it
+        if batchable and InferenceBatcher.is_enabled() and HuggingFaceService.is_batchable(summary.original_text, model_id):
+            batch_key = InferenceBatcher.batch_key(model_id, summary.max_length, summary.min_length)
+            flush_in_ms = InferenceBatcher.enqueue(batch_key, summary.id)
+            if flush_in_ms is not None:
+                if flush_in_ms >= 0:
+                    process_summary_batch.apply_async(
+                        args=[batch_key], countdown=flush_in_ms / 1000, queue=lane or TaskRouter.STANDARD
+                    )
+                return {"status": "batched", "summary_id": summary.id, "batch_key": batch_key}
         
-        # Return result
-        return {
-            "status": summary.status,
-            "summary_id": summary.id,
-            "processing_time_ms": summary.processing_time_ms,
-            "success": result.get("success", False)
-        }
+        # Call Hugging Face API for text summarization. Concurrent tasks for
+        # the same text and parameters share a single inference call.
+        request_key = HuggingFaceService.request_key(
+            summary.original_text, model_id, summary.max_length, summary.min_length
+        )
+        with span("inference", model=model_id):
+            result = SingleFlight.run(request_key, lambda: HuggingFaceService.get_summary(
+                text=summary.original_text,
+                model_id=model_id,
+                max_length=summary.max_length,
+                min_length=summary.min_length
+            ))
+        return apply_summary_result(db, summary, model_id, result, start_time)
         
     except Exception as e:
         # Handle exceptions and retry logic
-        if self.request.retries < self.max_retries:
-            self.retry(exc=e, countdown=5 * (self.request.retries + 1))
+        # Inference failures are retried inside HuggingFaceService; this only
+        # covers task-level errors, and draws on the same retry budget
+        if self.request.retries < self.max_retries and RetryBudget.try_acquire_retry():
+            self.retry(exc=e, countdown=backoff_delay(self.request.retries, settings.TASK_RETRY_BACKOFF_SECONDS))
         
         # Final failure after retries
         try:
             if summary:
-                summary.status = "failed"
+                UserSummaryCounts.set_status(db, summary, "failed")
                 summary.error_message = f"Process error: {str(e)}"
                 summary.completed_at = datetime.utcnow()
                 db.commit()
@@ -158,47 +271,282 @@ def process_summary(self, summary_id: int):
     finally:
         db.close()
 
-def update_usage_statistics(db: Session, summary: Summary, success: bool):
+@celery.task(name="process_summary_batch", bind=True)
+def process_summary_batch(self, batch_key: str):
     """
-    Update usage statistics for monitoring and billing.
+    Flush one batch of queued summaries through a single inference request.
+    
+    Args:
+        batch_key: The InferenceBatcher queue to take the batch from
+    
+    Returns:
+        Dict with the batch size and per-summary results
+    """
+    summary_ids, remaining = InferenceBatcher.pop_batch(batch_key)
+    if remaining:
+        # Stay in the lane this batch was routed to
+        queue = (self.request.delivery_info or {}).get("routing_key") or TaskRouter.STANDARD
+        process_summary_batch.apply_async(args=[batch_key], queue=queue)
+    if not summary_ids:
+        return {"batch_key": batch_key, "batch_size": 0, "results": []}
+    
+    with start_trace(name=f"process_summary_batch {batch_key}"):
+        return _process_summary_batch(batch_key, summary_ids)
+
+def _process_summary_batch(batch_key: str, summary_ids: List[int]):
+    db = SessionLocal()
+    start_time = time.time()
+    # Summaries whose result is already committed
+    applied_ids = set()
+    
+    try:
+        summaries = db.query(Summary).filter(Summary.id.in_(summary_ids)).all()
+        if not summaries:
+            return {"batch_key": batch_key, "batch_size": 0, "results": []}
+        
+        for summary in summaries:
+            # Waiting for the batch to fill counts as queueing
+            if summary.processing_started_at is not None:
+                summary.queued_ms = (summary.queued_ms or 0) + _elapsed_ms_since(summary.processing_started_at)
+            summary.processing_started_at = datetime.utcnow()
+            UserSummaryCounts.set_status(db, summary, "processing")
+        with span("db", operation="start"):
+            db.commit()
+        
+        # Every summary in a queue has the same model and length parameters
+        first = summaries[0]
+        model_id = first.model_used if first.model_used in HuggingFaceService.MODELS else HuggingFaceService.DEFAULT_MODEL
+        with span("inference", model=model_id, batch_size=len(summaries)):
+            results = HuggingFaceService.get_summary_batch(
+                texts=[summary.original_text for summary in summaries],
+                model_id=model_id,
+                max_length=first.max_length,
+                min_length=first.min_length
+            )
+        
+        applied = []
+        for summary, result in zip(summaries, results):
+            applied.append(apply_summary_result(db, summary, model_id, result, start_time))
+            applied_ids.add(summary.id)
+        
+        return {
+            "batch_key": batch_key,
+            "batch_size": len(summaries),
+            "results": applied
+        }
+        
+    except Exception as e:
+        # Fall back to processing the rest of the summaries one by one
+        print(f"Error processing batch {batch_key}: {e}")
+        db.rollback()
+        remaining_ids = [summary_id for summary_id in summary_ids if summary_id not in applied_ids]
+        for summary_id in remaining_ids:
+            process_summary.apply_async(args=[summary_id], kwargs={"batchable": False})
+        return {"batch_key": batch_key, "error": str(e), "summary_ids": remaining_ids}
+        
+    finally:
+        db.close()
+
+def apply_summary_result(db: Session,
+                         summary: Summary,
+                         model_id: str,
+                         result: Dict[str, Any],
+                         start_time: float) -> Dict[str, Any]:
+    """
+    Store an inference result on its summary row, in S3 and in the usage statistics.
     
     Args:
         db: Database session
-        summary: The summary that was processed
-        success: Whether the processing was successful
+        summary: The summary the result belongs to
+        model_id: The model that was requested
+        result: Result dict from HuggingFaceService
+        start_time: When processing of the summary started
+    
+    Returns:
+        Dict with status and summary information
     """
-    # Get or create hourly stats record
-    stats = UsageStatistics.get_or_create_hourly_record(db)
+    served_without_api = result.get("cached", False) or result.get("coalesced", False)
+    s3_summary_data = None
+    is_billable = not (
+        served_without_api
+        or result.get("fallback", False)
+        or not HuggingFaceService.is_billable_model(model_id)
+    )
     
-    # Update statistics
-    stats.total_requests += 1
+    # Calculate processing time
+    processing_time_ms = int((time.time() - start_time) * 1000)
     
-    if success:
-        stats.successful_requests += 1
+    # Update the summary in the database
+    if not result.get("success"):
+        UserSummaryCounts.set_status(db, summary, "failed")
+        summary.error_message = result.get("error", "Unknown error")
     else:
-        stats.failed_requests += 1
-    
-    # Update performance metrics if available
-    if summary.processing_time_ms:
-        # Calculate rolling average
-        if stats.avg_processing_time_ms > 0:
-            total_time = stats.avg_processing_time_ms * (stats.total_requests - 1)
-            stats.avg_processing_time_ms = (total_time + summary.processing_time_ms) / stats.total_requests
-        else:
-            stats.avg_processing_time_ms = summary.processing_time_ms
+        # Get the summary text
+        summary_text = result.get("summary", "")
+        summary.summary_text = summary_text
+        summary.summary_preview = TextStore.preview(summary_text)
+        UserSummaryCounts.set_status(db, summary, "completed")
+        summary.completed_at = datetime.utcnow()
         
-        # Update max processing time
-        if summary.processing_time_ms > stats.max_processing_time_ms:
-            stats.max_processing_time_ms = summary.processing_time_ms
+        # Update statistics
+        if "stats" in result:
+            stats = result["stats"]
+            summary.processing_time_ms = stats.get("processing_time_ms", processing_time_ms)
+            summary.original_tokens = stats.get("input_tokens", 0)
+            summary.summary_tokens = stats.get("output_tokens", 0)
+            
+            # Estimate cost (placeholder - adjust based on your actual pricing model)
+            # Cache hits, coalesced duplicates and local summaries made
+            # no API call, so they cost nothing
+            cost_per_1k_tokens = 0.0004  # Example cost
+            total_tokens = (summary.original_tokens or 0) + (summary.summary_tokens or 0)
+            if is_billable:
+                summary.processing_cost = (total_tokens / 1000) * cost_per_1k_tokens
+            else:
+                summary.processing_cost = 0.0
+        else:
+            summary.processing_time_ms = processing_time_ms
+            
+        # Store the full summary in S3 for better scalability
+        if summary_text:
+            # Prepare summary data for S3
+            s3_summary_data = {
+                "id": summary.id,
+                "summary_text": summary_text,
+                "original_text": summary.original_text,
+                "model_used": summary.model_used,
+                "processing_time_ms": summary.processing_time_ms,
+                "tokens": {
+                    "input": summary.original_tokens,
+                    "output": summary.summary_tokens
+                },
+                "timestamp": datetime.utcnow().isoformat()
+            }
+            
+            # Background uploads start once the result is committed (below)
+            if not settings.S3_BACKGROUND_UPLOADS:
+                try:
+                    # Upload to S3; the original text is stored once per content
+                    with span("storage", summary_id=summary.id):
+                        s3_key = S3Service.store_summary(summary.id, s3_summary_data, db=db)
+                    
+                    # Save the S3 reference in the database
+                    if s3_key:
+                        summary.s3_location = s3_key
+                except Exception as s3_error:
+                    print(f"Warning: Could not store summary in S3: {s3_error}")
     
-    # Update token counts
-    if summary.original_tokens and summary.summary_tokens:
-        stats.total_tokens_processed += (summary.original_tokens + summary.summary_tokens)
+    # Update usage statistics
+    try:
+        with span("stats", summary_id=summary.id):
+            update_usage_statistics(db, summary, result.get("success", False), cache_hit=served_without_api)
+    except Exception as stats_error:
+        print(f"Error updating statistics: {stats_error}")
     
-    # Update API cost
-    if summary.processing_cost:
-        stats.huggingface_api_cost += summary.processing_cost
+    # Latency breakdown of the stages run in this task
+    trace = current_trace()
+    if trace is not None:
+        summary.db_ms = trace.total_ms("db", summary.id)
+        summary.inference_ms = trace.total_ms("inference", summary.id)
+        # A background upload records its own duration when it is done
+        if s3_summary_data is None or not settings.S3_BACKGROUND_UPLOADS:
+            summary.storage_ms = trace.total_ms("storage", summary.id)
+        summary.stats_ms = trace.total_ms("stats", summary.id)
     
     # Save changes
-    db.add(stats)
     db.commit()
+    
+    # Upload off the task's latency; the upload records s3_location and storage_ms itself
+    if s3_summary_data is not None and settings.S3_BACKGROUND_UPLOADS:
+        S3Service.store_summary_in_background(summary.id, s3_summary_data)
+    
+    # Return result
+    task_result = {
+        "status": summary.status,
+        "summary_id": summary.id,
+        "processing_time_ms": summary.processing_time_ms,
+        "success": result.get("success", False),
+        "cached": result.get("cached", False),
+        "coalesced": result.get("coalesced", False)
+    }
+    
+    # Long-document mode: report per-chunk timings
+    if "chunks" in result.get("stats", {}):
+        task_result["chunks"] = result["stats"]["chunks"]
+    if "batch_size" in result.get("stats", {}):
+        task_result["batch_size"] = result["stats"]["batch_size"]
+        
+    return task_result
+
+def update_usage_statistics(db: Session, summary: Summary, success: bool, cache_hit: bool = False):
+    """
+    Update usage statistics for monitoring and billing.
+    
+    Counters and the per-model latency histogram are buffered in Redis (one
+    pipelined round-trip) and written to the database by the
+    flush_usage_statistics beat task. Without Redis they are upserted
+    into the hour's rows directly.
+    
+    Args:
+        db: Database session
+        summary: The summary that was processed
+        success: Whether the processing was successful
+        cache_hit: Whether the result was served from the summary cache
+    """
+    counters = {
+        "requests": 1,
+        "successes": 1 if success else 0,
+        "failures": 0 if success else 1,
+        "cache_hits": 1 if cache_hit else 0,
+        "latency_sum_ms": summary.processing_time_ms or 0,
+        "max_latency_ms": summary.processing_time_ms or 0,
+        "cost": summary.processing_cost or 0.0,
+    }
+    if summary.original_tokens and summary.summary_tokens:
+        counters["tokens"] = summary.original_tokens + summary.summary_tokens
+    
+    latency_ms = summary.processing_time_ms
+    if not UsageStatsBuffer.record(counters, model_id=summary.model_used, latency_ms=latency_ms):
+        bucket_start = UsageStatsBuffer.bucket_start(UsageStatsBuffer.current_bucket())
+        UsageStatistics.upsert_hourly(db, bucket_start, counters)
+        if latency_ms is not None:
+            LatencyHistogramBin.upsert_counts(
+                db, bucket_start, {summary.model_used: {LatencyHistogram.bin_index(latency_ms): 1}}
+            )
+        db.commit()
+
+@celery.task(name="flush_usage_statistics")
+def flush_usage_statistics():
+    """Write buffered usage statistics to the database (run by beat)."""
+    db = SessionLocal()
+    try:
+        return UsageStatsBuffer.flush(db)
+    finally:
+        db.close()
+
+@celery.task(name="offload_summary_texts")
+def offload_summary_texts():
+    """Move the large texts of older completed summaries to the text store (run by beat)."""
+    db = SessionLocal()
+    try:
+        return {"swept": TextStore.offload_completed(db, settings.TEXT_STORE_SWEEP_BATCH_SIZE)}
+    finally:
+        db.close()
+
+@celery.task(name="collect_unreferenced_blobs")
+def collect_unreferenced_blobs():
+    """Delete S3 texts no summary references anymore (run by beat)."""
+    db = SessionLocal()
+    try:
+        return {"deleted": S3Service.collect_unreferenced_blobs(db, settings.S3_BLOB_GC_BATCH_SIZE)}
+    finally:
+        db.close()
+
+@celery.task(name="reconcile_summary_counts")
+def reconcile_summary_counts():
+    """Recount every user's summaries and correct drifted counters (run by beat)."""
+    db = SessionLocal()
+    try:
+        return {"corrected_users": UserSummaryCounts.reconcile(db)}
+    finally:
+        db.close()
@@ -0,0 +1,149 @@
+"""
+Query plan regression check for the hot per-user summary queries.
+
+Seeds users and summaries into the DATABASE_URL database inside a
+transaction, runs ANALYZE and EXPLAIN on the queries behind the summary
+listing, /home and /users/me/stats, and checks that each is served by
+the expected index (see migration 7 in app/db/migrations.py) without a
+sequential scan of summaries or a sort. The SQL is compiled from the
+same ORM queries the endpoints run, so the check follows them as they
+change. The transaction is rolled back, so nothing is left behind.
+
+Usage:
+    python check_query_plans.py --users 200 --summaries-per-user 200
+
+Exits with status 1 if any plan regressed.
+"""
+import argparse
+import json
+import sys
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+STATUSES = ["completed", "completed", "completed", "failed", "pending", "processing"]
+
+
+def seed(conn, users, per_user):
+    user_ids = [row[0] for row in conn.execute(text("""
+        INSERT INTO users (email, username)
+        SELECT 'plan-check-' || g || '@example.com', 'plan-check-' || g
+        FROM generate_series(1, :users) g
+        RETURNING id
+    """), {"users": users})]
+    conn.execute(text("""
+        INSERT INTO summaries (user_id, original_text, summary_text, status, created_at)
+        SELECT u.id,
+               repeat('Original text of a seeded summary. ', 20),
+               repeat('Seeded summary. ', 5),
+               (:statuses)[1 + (g % 6)],
+               NOW() - (g * INTERVAL '1 minute') - (u.id * INTERVAL '1 second')
+        FROM unnest(CAST(:user_ids AS INTEGER[])) AS u(id), generate_series(1, :per_user) g
+    """), {"user_ids": user_ids, "per_user": per_user, "statuses": STATUSES})
+    conn.execute(text("""
+        INSERT INTO user_summary_counts (user_id, total, pending, processing, completed, failed)
+        SELECT user_id, COUNT(*),
+               COUNT(*) FILTER (WHERE status = 'pending'),
+               COUNT(*) FILTER (WHERE status = 'processing'),
+               COUNT(*) FILTER (WHERE status = 'completed'),
+               COUNT(*) FILTER (WHERE status = 'failed')
+        FROM summaries WHERE user_id = ANY(CAST(:user_ids AS INTEGER[]))
+        GROUP BY user_id
+        ON CONFLICT (user_id) DO NOTHING
+    """), {"user_ids": user_ids})
+    conn.execute(text("ANALYZE users"))
+    conn.execute(text("ANALYZE summaries"))
+    conn.execute(text("ANALYZE user_summary_counts"))
+    return user_ids[len(user_ids) // 2]
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def queries(db, user_id):
+    """
+    (name, statement, indexes of which one must be used) of the checked
+    queries. No indexes means the query must not read summaries at all.
+    """
+    from app import models
+    from app.api.v1.api import recent_summaries_query
+    from app.api.v1.endpoints.summaries import summary_listing_query
+
+    # Keyset position of the user's 50th newest summary
+    position = summary_listing_query(db, user_id).offset(49).limit(1).one()[0]
+    after = (position.created_at, position.id)
+
+    return [
+        ("listing first page", summary_listing_query(db, user_id).limit(20).statement,
+         ("ix_summaries_user_created",)),
+        ("listing keyset page", summary_listing_query(db, user_id, after=after).limit(20).statement,
+         ("ix_summaries_user_created",)),
+        ("home recent summaries", recent_summaries_query(db, user_id).statement,
+         ("ix_summaries_user_created",)),
+        # read_user_stats: UserSummaryCounts.get, a primary-key lookup
+        ("stats counters", select(models.UserSummaryCounts).where(models.UserSummaryCounts.user_id == user_id),
+         ()),
+    ]
+
+
+def check(conn, name, statement, indexes):
+    compiled = statement.compile(dialect=conn.dialect)
+    sql = str(compiled)
+    plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql, compiled.params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    nodes = list(plan_nodes(plan[0]["Plan"]))
+
+    problems = []
+    if indexes and not any(node.get("Index Name") in indexes for node in nodes):
+        problems.append(f"does not use {' or '.join(indexes)}")
+    if not indexes and any(node.get("Relation Name") == "summaries" for node in nodes):
+        problems.append("reads summaries")
+    if any(node["Node Type"] == "Seq Scan" and node.get("Relation Name") == "summaries" for node in nodes):
+        problems.append("scans summaries sequentially")
+    if "ORDER BY" in sql and any(node["Node Type"] in ("Sort", "Incremental Sort") for node in nodes):
+        problems.append("sorts instead of reading the index in order")
+
+    steps = " -> ".join(
+        node["Node Type"] + (f" using {node['Index Name']}" if "Index Name" in node else "")
+        for node in nodes
+    )
+    print(f"{'FAIL' if problems else 'ok  '} {name}: {steps}")
+    for problem in problems:
+        print(f"     {problem}")
+    return not problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--summaries-per-user", type=int, default=200)
+    args = parser.parse_args()
+
+    from app.db.base import Base, engine
+    from app.db.migrations import run_migrations
+    import app.models  # noqa: F401  (registers the tables)
+
+    # Same schema set-up as the applications
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        try:
+            user_id = seed(conn, args.users, args.summaries_per_user)
+            db = Session(bind=conn)
+            results = [check(conn, name, statement, indexes) for name, statement, indexes in queries(db, user_id)]
+        finally:
+            transaction.rollback()
+
+    if not all(results):
+        sys.exit(1)
+    print("All query plans use their indexes")
+
+
+if __name__ == "__main__":
+    main()
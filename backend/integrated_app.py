@@ -1,7 +1,7 @@
 import uvicorn
 import os
 import time
-from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi import FastAPI, Depends, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, FileResponse
@@ -11,7 +11,12 @@ from pathlib import Path
 from app.db.base import Base, engine, get_db
 from app.db.init_db import init_db
 from app.core.config import settings
+from app.core.metrics import CONTENT_TYPE_LATEST, MetricsMiddleware, render_latest
+from app.core.tracing import TracingMiddleware
 from app.api.v1.api import api_router
+from app.services.http_client import AsyncInferenceHTTPClient, InferenceHTTPClient
+from app.services.huggingface_service import HuggingFaceService
+from app.services.infra_sampler import InFlightRequestsMiddleware, InfraSampler
 import app.models as models
 
 # Create tables
@@ -32,6 +37,10 @@ app = FastAPI(
 )
 
 # Add CORS middleware
+app.add_middleware(InFlightRequestsMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -48,11 +57,27 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 async def startup_event():
     db = next(get_db())
     init_db(db)
+    InferenceHTTPClient.init()
+    AsyncInferenceHTTPClient.init()
+    HuggingFaceService.preload_tokenizers()
+    InfraSampler.start()
+
+# Close pooled inference connections on shutdown
+@app.on_event("shutdown")
+async def shutdown_event():
+    InfraSampler.stop()
+    InferenceHTTPClient.close()
+    await AsyncInferenceHTTPClient.close()
 
 # Mount the frontend static files directory
 app.mount("/static", StaticFiles(directory=str(FRONTEND_DIR)), name="static")
 
 # Serve the HTML files
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics (aggregated across workers if PROMETHEUS_MULTIPROC_DIR is set)."""
+    return Response(render_latest(), media_type=CONTENT_TYPE_LATEST)
+
 @app.get("/", response_class=HTMLResponse)
 async def serve_index():
     return FileResponse(FRONTEND_DIR / "index.html")
@@ -1,7 +1,7 @@
 import uvicorn
 import os
 import time
-from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi import FastAPI, Depends, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, FileResponse
@@ -12,7 +12,15 @@ from s3_utils import s3_client, S3_BUCKET_NAME
 from app.db.base import Base, engine, get_db
 from app.db.init_db import init_db
 from app.core.config import settings
+from app.core.metrics import CONTENT_TYPE_LATEST, MetricsMiddleware, render_latest
+from app.core.tracing import TracingMiddleware
 from app.api.v1.api import api_router
+from app.services.http_client import AsyncInferenceHTTPClient, InferenceHTTPClient
+from app.services.huggingface_service import HuggingFaceService
+from app.services.infra_sampler import InFlightRequestsMiddleware, InfraSampler
+from app.services.model_warmer import ModelWarmer
+from app.services.resilience import CircuitBreaker, RetryBudget
+from app.services.task_router import TaskRouter
 import app.models as models
 
 # Create all tables in database
@@ -24,6 +32,10 @@ app = FastAPI(
     version="0.1.0"
 )
 
+app.add_middleware(InFlightRequestsMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -45,6 +57,16 @@ app.mount("/static", StaticFiles(directory=str(FRONTEND_DIR)), name="static")
 async def startup_event():
     db = next(get_db())
     init_db(db)
+    InferenceHTTPClient.init()
+    AsyncInferenceHTTPClient.init()
+    HuggingFaceService.preload_tokenizers()
+    InfraSampler.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    InfraSampler.stop()
+    InferenceHTTPClient.close()
+    await AsyncInferenceHTTPClient.close()
 
 @app.get("/api")
 async def api_root():
@@ -55,6 +77,11 @@ async def api_root():
         "openapi_url": "/openapi.json"
     }
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics (aggregated across workers if PROMETHEUS_MULTIPROC_DIR is set)."""
+    return Response(render_latest(), media_type=CONTENT_TYPE_LATEST)
+
 @app.get("/health")
 async def health_check(db: Session = Depends(get_db)):
     try:
@@ -66,7 +93,13 @@ async def health_check(db: Session = Depends(get_db)):
     return {
         "status": "ok",
         "database": db_status,
-        "api_version": app.version
+        "api_version": app.version,
+        "inference_http_pool": InferenceHTTPClient.get_stats(),
+        "circuit_breakers": CircuitBreaker.get_all_states(HuggingFaceService.get_remote_model_ids()),
+        "retry_budget": RetryBudget.get_stats(),
+        "model_warmth": ModelWarmer.get_stats(HuggingFaceService.get_remote_model_ids()),
+        "task_queues": TaskRouter.get_queue_depths(),
+        "infra_sampler": InfraSampler.get_stats()
     }
 
 @app.get("/test-s3")
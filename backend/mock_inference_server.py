@@ -0,0 +1,97 @@
+"""
+Local stand-in for the Hugging Face inference API.
+
+Answers POST /models/<model path> with the inference response format, with
+configurable latency, 503 "loading" responses and error rates, so the API
+and Celery workers can be exercised end to end without the real service.
+
+Usage:
+    python mock_inference_server.py --port 8001 --latency-ms 300 --loading-rate 0.05
+
+Then run the API/worker with:
+    HUGGINGFACE_API_BASE_URL=http://localhost:8001/models
+    HUGGINGFACE_API_KEY=mock
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.services.summarization_backends import MockBackend
+
+
+class MockInferenceHandler(BaseHTTPRequestHandler):
+    backend: MockBackend = None
+    lock = threading.Lock()
+
+    def do_POST(self):
+        if not self.path.startswith("/models/"):
+            self._send(404, {"error": "Not found"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            inputs = payload.get("inputs")
+            if not (isinstance(inputs, str)
+                    or (isinstance(inputs, list) and inputs and all(isinstance(text, str) for text in inputs))):
+                raise ValueError("inputs must be a string or a list of strings")
+        except ValueError as e:
+            self._send(400, {"error": f"Invalid request: {e}"})
+            return
+
+        # The backend's random generator is not thread-safe
+        with self.lock:
+            delay = self.backend.sample_delay(self.backend.batch_size(payload))
+            response = self.backend.respond(payload)
+
+        # Sleep outside the lock so concurrent requests overlap
+        time.sleep(delay)
+        self._send(response.status_code, response.json())
+
+    def _send(self, status_code, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Keep load tests quiet
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Hugging Face inference server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=int, default=300)
+    parser.add_argument("--loading-rate", type=float, default=0.0, help="Fraction of 503 loading responses")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 500 error responses")
+    parser.add_argument("--batch-item-latency-ms", type=int, default=20,
+                        help="Extra latency per additional input of a batched request")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    MockInferenceHandler.backend = MockBackend(
+        latency_ms=args.latency_ms,
+        loading_rate=args.loading_rate,
+        error_rate=args.error_rate,
+        seed=args.seed,
+        batch_item_latency_ms=args.batch_item_latency_ms,
+    )
+
+    server = ThreadingHTTPServer((args.host, args.port), MockInferenceHandler)
+    print(f"Mock inference server listening on http://{args.host}:{args.port}/models")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
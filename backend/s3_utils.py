@@ -1,5 +1,6 @@
 import os
 import boto3
+from botocore.config import Config
 from dotenv import load_dotenv
 from app.core.config import settings
 
@@ -7,13 +8,27 @@ from app.core.config import settings
 dotenv_path = os.path.join(os.path.dirname(__file__), '.env')
 load_dotenv(dotenv_path)
 
-# Initialize S3 client with credentials from settings or environment
-s3_client = boto3.client(
-    's3',
-    aws_access_key_id=settings.AWS_ACCESS_KEY_ID or os.getenv("AWS_ACCESS_KEY_ID"),
-    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY or os.getenv("AWS_SECRET_ACCESS_KEY"),
-    region_name=settings.AWS_REGION or os.getenv("AWS_REGION")
-)
+def make_s3_client():
+    """
+    Create an S3 client with the connection pool size, retries and
+    timeouts from settings, and credentials from settings or environment.
+    """
+    return boto3.client(
+        's3',
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID or os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY or os.getenv("AWS_SECRET_ACCESS_KEY"),
+        region_name=settings.AWS_REGION or os.getenv("AWS_REGION"),
+        config=Config(
+            max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+            retries={"max_attempts": settings.S3_MAX_ATTEMPTS, "mode": "standard"},
+            connect_timeout=settings.S3_CONNECT_TIMEOUT_SECONDS,
+            read_timeout=settings.S3_READ_TIMEOUT_SECONDS,
+        ),
+    )
+
+# Default client of the upload routes (app.services.s3_io.S3IO holds the
+# per-process client of S3Service)
+s3_client = make_s3_client()
 
 # Get bucket name from settings or environment
 S3_BUCKET_NAME = settings.S3_BUCKET_NAME or os.getenv("S3_BUCKET_NAME")
@@ -0,0 +1,28 @@
+import os
+import sys
+import tempfile
+
+# Settings are read on import: point the app at a throwaway SQLite
+# database and keep Redis and the inference API out of the tests
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+os.environ["REDIS_URL"] = ""
+os.environ["INFERENCE_BACKEND"] = "mock"
+os.environ["MOCK_LATENCY_MS"] = "0"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture
+def db():
+    """A session on freshly created tables, dropped after the test."""
+    import app.models  # noqa: F401 - registers the tables
+    from app.db.base import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
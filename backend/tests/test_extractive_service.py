@@ -0,0 +1,40 @@
+import random
+import time
+import tracemalloc
+
+from app.services.extractive_service import ExtractiveSummarizer
+
+
+def _sentences(count, vocabulary_size, seed=7):
+    rng = random.Random(seed)
+    words = [f"term{i}" for i in range(vocabulary_size)]
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(5, 25))) + "." for _ in range(count)]
+
+
+def test_central_sentence_ranks_first():
+    sentences = [
+        "Solar panels convert sunlight into electricity.",
+        "Solar electricity from panels powers homes.",
+        "Panels on homes produce solar electricity.",
+        "The cat slept on the sofa.",
+    ]
+    scores = ExtractiveSummarizer.rank_sentences(sentences)
+
+    assert abs(scores.sum() - 1.0) < 1e-9
+    assert scores.argmin() == 3
+
+
+def test_ranking_a_large_input_stays_sparse():
+    # Dense TF-IDF would be 20k sentences x 4096 terms (over 300 MB)
+    sentences = _sentences(20_000, 10_000)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    scores = ExtractiveSummarizer.rank_sentences(sentences)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(scores) == len(sentences)
+    assert peak < 64 * 1024 * 1024
+    assert elapsed < 30
@@ -0,0 +1,40 @@
+from app.services.huggingface_service import HuggingFaceService
+from app.services.summarization_backends import LOCAL_BACKEND, LocalExtractiveBackend, get_backend_for_model
+
+TEXT = (
+    "The river flooded the valley after a week of rain. "
+    "Farmers moved their animals to higher ground. "
+    "The water receded slowly over the following month. "
+    "Most of the crops in the valley were lost."
+)
+
+
+def test_local_models_have_a_registered_backend():
+    model = HuggingFaceService.MODELS["textrank-local"]
+    backend = get_backend_for_model(model)
+
+    assert isinstance(backend, LocalExtractiveBackend)
+    assert backend.name == LOCAL_BACKEND
+    assert not backend.remote
+
+
+def test_local_models_are_dispatched_through_the_backend():
+    assert "textrank-local" not in HuggingFaceService.get_remote_model_ids()
+    assert not HuggingFaceService.is_billable_model("textrank-local")
+    assert not HuggingFaceService.is_batchable(TEXT, "textrank-local")
+
+    result = HuggingFaceService.get_summary(TEXT, "textrank-local", max_length=20)
+    assert result["success"]
+    assert result["model"] == "TextRank (local)"
+
+    batch = HuggingFaceService.get_summary_batch([TEXT, TEXT], "textrank-local", max_length=20)
+    assert [item["summary"] for item in batch] == [result["summary"]] * 2
+
+
+def test_local_backend_answers_inference_payloads():
+    backend = LocalExtractiveBackend()
+    response = backend.infer(None, {}, {"inputs": [TEXT, TEXT], "parameters": {"max_length": 20}})
+
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert all(item["summary_text"] for item in response.json())
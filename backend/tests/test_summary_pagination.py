@@ -0,0 +1,51 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from app import models
+from app.api.v1.endpoints.summaries import read_summaries
+
+
+def _read_all_pages(db, user_id, limit):
+    current_user = SimpleNamespace(id=user_id, role="user")
+    ids, cursor = [], None
+    for _ in range(50):
+        page = read_summaries(
+            db=db, cursor=cursor, skip=0, limit=limit, status=None,
+            sort_by="created_at", sort_desc=True, current_user=current_user,
+        )
+        ids.extend(item.id for item in page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            return ids
+    raise AssertionError(f"Paging did not end: {ids[:20]}")
+
+
+def test_cursor_pages_return_every_summary_once(db):
+    user = models.User(email="pager@example.com")
+    db.add(user)
+    db.commit()
+    summaries = [models.Summary(user_id=user.id, original_text=f"Text {i}", status="completed") for i in range(7)]
+    db.add_all(summaries)
+    db.commit()
+
+    ids = _read_all_pages(db, user.id, limit=2)
+
+    assert sorted(ids) == sorted(summary.id for summary in summaries)
+    assert len(ids) == len(set(ids))
+
+
+def test_cursor_breaks_created_at_ties_by_id(db):
+    user = models.User(email="ties@example.com")
+    db.add(user)
+    db.commit()
+    created_at = datetime(2024, 1, 1, 12, 0, 0)
+    summaries = [
+        models.Summary(user_id=user.id, original_text=f"Text {i}", status="completed", created_at=created_at)
+        for i in range(5)
+    ]
+    db.add_all(summaries)
+    db.commit()
+
+    ids = _read_all_pages(db, user.id, limit=2)
+
+    assert ids == sorted((summary.id for summary in summaries), reverse=True)
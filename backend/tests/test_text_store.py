@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from app.core.config import settings
+from app.models.summary import Summary
+from app.services.text_store import TextStore
+
+
+@pytest.fixture
+def local_store(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "TEXT_STORE_BACKEND", "local")
+    monkeypatch.setattr(settings, "TEXT_STORE_LOCAL_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _offloaded_summary(db):
+    key = TextStore.put(db, "texts/1/original.txt", "An offloaded original text.")
+    summary = Summary(user_id=1, status="completed", model_used="bart-cnn", original_text_key=key)
+    db.add(summary)
+    db.commit()
+    return summary, TextStore._local_path(key)
+
+
+def test_local_texts_are_deleted_when_the_delete_commits(db, local_store):
+    summary, path = _offloaded_summary(db)
+
+    TextStore.delete_texts(summary)
+    db.delete(summary)
+    assert os.path.exists(path)
+
+    db.commit()
+    assert not os.path.exists(path)
+
+
+def test_local_texts_survive_a_rolled_back_delete(db, local_store):
+    summary, path = _offloaded_summary(db)
+
+    TextStore.delete_texts(summary)
+    db.delete(summary)
+    db.rollback()
+    assert os.path.exists(path)
+
+    # Nothing left queued for a later commit of the same session
+    db.commit()
+    assert os.path.exists(path)
+    assert TextStore.get(summary.original_text_key) == "An offloaded original text."
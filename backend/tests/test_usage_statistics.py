@@ -0,0 +1,82 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.models.latency_histogram import LatencyHistogramBin
+from app.models.usage_statistics import UsageStatistics
+from app.services.usage_stats_buffer import UsageStatsBuffer
+
+BUCKET_START = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+
+
+def test_upsert_hourly_merges_into_one_row(db):
+    UsageStatistics.upsert_hourly(db, BUCKET_START, {
+        "requests": 2, "successes": 2, "latency_sum_ms": 300, "max_latency_ms": 200,
+        "infra_samples": 1, "cpu_percent_sum": 10.0, "memory_mb_max": 500.0, "queue_depth_max": 3,
+    })
+    UsageStatistics.upsert_hourly(db, BUCKET_START, {
+        "requests": 1, "failures": 1, "latency_sum_ms": 600, "max_latency_ms": 600,
+        "infra_samples": 1, "cpu_percent_sum": 30.0, "memory_mb_max": 400.0, "queue_depth_max": 5,
+    })
+    db.commit()
+
+    row = db.query(UsageStatistics).one()
+    assert row.total_requests == 3
+    assert row.successful_requests == 2
+    assert row.failed_requests == 1
+    assert row.avg_processing_time_ms == pytest.approx(300.0)
+    assert row.max_processing_time_ms == 600
+    assert row.cpu_usage_percent == pytest.approx(20.0)
+    assert row.memory_usage_mb == 500
+    assert row.queue_depth == 5
+
+
+def test_update_usage_statistics_writes_directly_without_redis(db):
+    from celery_worker import update_usage_statistics
+
+    summary = SimpleNamespace(
+        processing_time_ms=120, processing_cost=0.001, original_tokens=100, summary_tokens=20,
+        model_used="bart-cnn",
+    )
+    update_usage_statistics(db, summary, success=True)
+    update_usage_statistics(db, summary, success=False)
+
+    row = db.query(UsageStatistics).one()
+    assert (row.total_requests, row.successful_requests, row.failed_requests) == (2, 1, 1)
+    assert row.max_processing_time_ms == 120
+    assert sum(bin.count for bin in db.query(LatencyHistogramBin)) == 2
+
+
+@pytest.fixture
+def buffer(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    monkeypatch.setattr(settings, "REDIS_URL", "redis://buffer")
+    monkeypatch.setattr(UsageStatsBuffer, "_redis_client", fakeredis.FakeRedis())
+    return UsageStatsBuffer
+
+
+def test_flush_writes_buffered_counters(db, buffer):
+    buffer.record({"requests": 1, "successes": 1, "max_latency_ms": 80}, bucket="2024010112")
+    buffer.record({"requests": 1, "successes": 1, "max_latency_ms": 50}, bucket="2024010112")
+
+    assert buffer.flush(db) == {"buckets": ["2024010112"], "requests": 2}
+    row = db.query(UsageStatistics).one()
+    assert row.total_requests == 2
+    assert row.max_processing_time_ms == 80
+
+
+def test_failed_flush_keeps_the_counters(db, buffer, monkeypatch):
+    buffer.record({"requests": 3, "successes": 3}, bucket="2024010112")
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(UsageStatistics, "upsert_hourly", fail)
+        assert buffer.flush(db) == {"buckets": [], "requests": 0}
+    assert db.query(UsageStatistics).count() == 0
+
+    assert buffer.flush(db) == {"buckets": ["2024010112"], "requests": 3}
+    assert db.query(UsageStatistics).one().total_requests == 3